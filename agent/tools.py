@@ -1,16 +1,33 @@
 """
 MCP Server integration tools
 """
+import json
 import requests
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional, Tuple
+
+
+# Read tools the server answers with ETag / 304 Not Modified
+CONDITIONAL_TOOLS = frozenset({
+    "get_phase", "get_project_status", "list_project_phases", "get_current_phase",
+})
 
 
 class MCPTools:
     """
     Tools for interacting with MCP Server (Render).
     Wraps HTTP calls to the MCP API.
+    
+    Read tools are sent with If-None-Match; on 304 Not Modified the cached
+    response body is returned instead of downloading it again.
+    
+    Requests share one keep-alive session that advertises the compressed
+    encodings it can decode (gzip, deflate, and br when brotli is
+    installed); the server compresses large responses accordingly.
     """
     
+    # Maximum number of cached read responses
+    cache_size = 256
+    
     def __init__(self, server_url: str = "https://mcp-aidev.onrender.com"):
         """
         Initialize MCP tools.
@@ -19,6 +36,9 @@ class MCPTools:
             server_url: Base URL of the MCP server
         """
         self.server_url = server_url.rstrip("/")
+        self.session = requests.Session()
+        self.session.headers["Accept-Encoding"] = requests.utils.DEFAULT_ACCEPT_ENCODING
+        self._etag_cache: Dict[str, Tuple[str, Dict[str, Any]]] = {}
     
     def _execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -37,7 +57,49 @@ class MCPTools:
             "arguments": arguments
         }
         
-        response = requests.post(url, json=payload, timeout=30)
+        if tool_name not in CONDITIONAL_TOOLS:
+            response = self.session.post(url, json=payload, timeout=30)
+            response.raise_for_status()
+            return response.json()
+        
+        key = json.dumps(payload, sort_keys=True)
+        cached = self._etag_cache.get(key)
+        headers = {"If-None-Match": cached[0]} if cached else {}
+        
+        response = self.session.post(url, json=payload, headers=headers, timeout=30)
+        if response.status_code == 304 and cached:
+            return cached[1]
+        response.raise_for_status()
+        
+        body = response.json()
+        etag = response.headers.get("ETag")
+        if etag:
+            self._etag_cache.pop(key, None)
+            if len(self._etag_cache) >= self.cache_size:
+                # Drop the oldest entry (dicts keep insertion order)
+                self._etag_cache.pop(next(iter(self._etag_cache)))
+            self._etag_cache[key] = (etag, body)
+        return body
+    
+    def execute_batch(self, calls: List[Dict[str, Any]], transactional: bool = False) -> Dict[str, Any]:
+        """
+        Execute several tools on the MCP server in one request.
+        
+        Args:
+            calls: List of {"tool": name, "arguments": {...}}; string
+                arguments like "$0.project_id" refer to an earlier call's data
+            transactional: If True, all calls succeed or none are kept
+            
+        Returns:
+            MCP server response with one result per call
+        """
+        url = f"{self.server_url}/mcp/execute/batch"
+        payload = {
+            "calls": calls,
+            "transactional": transactional
+        }
+        
+        response = self.session.post(url, json=payload, timeout=30)
         response.raise_for_status()
         
         return response.json()
@@ -64,7 +126,8 @@ class MCPTools:
         project_id: str,
         phase_number: int,
         title: str,
-        specs: Dict[str, Any]
+        specs: Dict[str, Any],
+        expected_version: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Save phase specifications to MCP.
@@ -74,18 +137,37 @@ class MCPTools:
             phase_number: Phase number
             title: Phase title
             specs: Phase specifications
+            expected_version: Optional phase version the write is based on
+                (0 to only create the phase)
             
         Returns:
             Response with phase_id
         """
+        args = {
+            "project_id": project_id,
+            "phase_number": phase_number,
+            "title": title,
+            "specs": specs
+        }
+        if expected_version is not None:
+            args["expected_version"] = expected_version
+        
+        return self._execute_tool("save_phase", args)
+    
+    def save_phases(self, project_id: str, phases: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Save a whole plan of phases to MCP in one call.
+        
+        Args:
+            project_id: UUID of the project
+            phases: List of {"phase_number", "title", "specs"} dictionaries
+            
+        Returns:
+            Response with the saved phases
+        """
         return self._execute_tool(
-            "save_phase",
-            {
-                "project_id": project_id,
-                "phase_number": phase_number,
-                "title": title,
-                "specs": specs
-            }
+            "save_phases",
+            {"project_id": project_id, "phases": phases}
         )
     
     def get_phase(self, project_id: str, phase_number: int) -> Dict[str, Any]:
@@ -109,7 +191,8 @@ class MCPTools:
         project_id: str,
         phase_number: int,
         status: str,
-        progress_data: Optional[Dict[str, Any]] = None
+        progress_data: Optional[Dict[str, Any]] = None,
+        expected_version: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Update phase progress in MCP.
@@ -119,6 +202,7 @@ class MCPTools:
             phase_number: Phase number
             status: New status (in_progress, completed)
             progress_data: Optional progress information
+            expected_version: Optional phase version the update is based on
             
         Returns:
             Updated phase info
@@ -130,6 +214,8 @@ class MCPTools:
         }
         if progress_data:
             args["progress_data"] = progress_data
+        if expected_version is not None:
+            args["expected_version"] = expected_version
         
         return self._execute_tool("update_progress", args)
     
@@ -141,7 +227,7 @@ class MCPTools:
             True if server is healthy
         """
         try:
-            response = requests.get(f"{self.server_url}/health", timeout=10)
+            response = self.session.get(f"{self.server_url}/health", timeout=10)
             return response.status_code == 200
         except Exception:
             return False
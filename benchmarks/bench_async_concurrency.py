@@ -0,0 +1,126 @@
+"""
+Benchmark: /health latency while heavy project listings run concurrently
+
+Runs the FastAPI app in-process (httpx ASGI transport, one event loop) with
+several clients hammering GET /projects?limit=500 while a prober measures
+/health latency. Three modes are compared:
+
+    inline      listing executed synchronously on the event loop (the old
+                behaviour, reproduced by a benchmark-only route)
+    threadpool  default mode: sync Session offloaded to a worker thread
+    async       DATABASE_ASYNC mode: AsyncSession on aiosqlite
+
+Usage:
+    python benchmarks/bench_async_concurrency.py --projects 5000 --heavy-clients 4
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import httpx
+from fastapi import Depends
+from sqlalchemy import insert
+
+from database import connection
+from database.connection import init_db, init_async_db, dispose_async_db
+from database.models import Project, Phase
+from main import app, get_database
+from services.project_service import ProjectService
+
+
+@app.get("/bench/inline-projects")
+async def inline_projects(limit: int = 500, db=Depends(get_database)):
+    """Old code path: synchronous ORM work directly on the event loop"""
+    return ProjectService(db).list_projects_page(limit=limit)
+
+
+def populate(projects: int, phases_per_project: int) -> None:
+    """Bulk insert projects with phases"""
+    now = datetime.now(timezone.utc)
+    with connection._engine.begin() as conn:
+        conn.execute(insert(Project), [
+            {"id": f"p{i:06d}", "name": f"project {i}", "status": "active",
+             "created_at": now, "updated_at": now}
+            for i in range(projects)
+        ])
+        conn.execute(insert(Phase), [
+            {"id": f"p{i:06d}-{n}", "project_id": f"p{i:06d}", "phase_number": n,
+             "title": f"Phase {n}", "specs": {"instructions": "x" * 500},
+             "status": "completed" if n < 3 else "planned",
+             "created_at": now, "updated_at": now}
+            for i in range(projects) for n in range(1, phases_per_project + 1)
+        ])
+
+
+async def scenario(client: httpx.AsyncClient, path: str, heavy_clients: int, probes: int) -> dict:
+    """Measure /health latency while heavy clients loop on `path`"""
+    stop = asyncio.Event()
+    listings = 0
+
+    async def heavy():
+        nonlocal listings
+        while not stop.is_set():
+            await client.get(path, params={"limit": 500})
+            listings += 1
+            # The in-memory transport never suspends on its own; a real
+            # socket would, so give other tasks a turn between requests
+            await asyncio.sleep(0)
+
+    workers = [asyncio.create_task(heavy()) for _ in range(heavy_clients)]
+    await asyncio.sleep(0.2)
+
+    latencies = []
+    for _ in range(probes):
+        start = time.perf_counter()
+        await client.get("/health")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+
+    stop.set()
+    await asyncio.gather(*workers)
+    latencies.sort()
+    return {
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1],
+        "listings": listings,
+    }
+
+
+async def main_async(args) -> None:
+    with tempfile.TemporaryDirectory() as tmp:
+        url = f"sqlite:///{tmp}/bench.db"
+        init_db(url)
+        populate(args.projects, args.phases)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            print(f"{'mode':<12} {'health p50 (ms)':>16} {'health p99 (ms)':>16} {'listings':>9}")
+            for mode in ("inline", "threadpool", "async"):
+                if mode == "async":
+                    init_async_db(url)
+                else:
+                    await dispose_async_db()
+                path = "/bench/inline-projects" if mode == "inline" else "/projects"
+                result = await scenario(client, path, args.heavy_clients, args.probes)
+                print(f"{mode:<12} {result['p50_ms']:>16.1f} {result['p99_ms']:>16.1f} {result['listings']:>9}")
+            await dispose_async_db()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--projects", type=int, default=5_000)
+    parser.add_argument("--phases", type=int, default=10)
+    parser.add_argument("--heavy-clients", type=int, default=4)
+    parser.add_argument("--probes", type=int, default=200)
+    asyncio.run(main_async(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
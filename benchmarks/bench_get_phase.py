@@ -0,0 +1,111 @@
+"""
+Benchmark: ProjectService.get_phase latency vs. number of stored phases
+
+Populates a file-backed SQLite database with N phases (100 per project) and
+measures the median/p99 latency of get_phase at each size. With the
+(project_id, phase_number) index the latency stays flat; pass --no-index to
+drop it and watch lookups degrade into full table scans.
+
+Usage:
+    python benchmarks/bench_get_phase.py
+    python benchmarks/bench_get_phase.py --sizes 1000 10000 100000 1000000
+"""
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from sqlalchemy import insert, text
+
+from database import connection
+from database.connection import init_db, get_db
+from database.models import Project, Phase
+from services.project_service import ProjectService
+
+
+PHASES_PER_PROJECT = 100
+BATCH_SIZE = 10_000
+
+
+def populate(total_phases: int) -> list:
+    """Insert projects and phases with bulk executemany; return project ids"""
+    now = datetime.now(timezone.utc)
+    project_count = max(1, total_phases // PHASES_PER_PROJECT)
+    project_ids = [f"bench-{i:07d}" for i in range(project_count)]
+
+    with connection._engine.begin() as conn:
+        conn.execute(insert(Project), [
+            {"id": pid, "name": pid, "status": "active", "created_at": now, "updated_at": now}
+            for pid in project_ids
+        ])
+        rows = []
+        for n in range(total_phases):
+            rows.append({
+                "id": f"phase-{n:08d}",
+                "project_id": project_ids[n // PHASES_PER_PROJECT],
+                "phase_number": n % PHASES_PER_PROJECT + 1,
+                "title": f"Phase {n}",
+                "specs": {"instructions": "benchmark"},
+                "status": "planned",
+                "created_at": now,
+                "updated_at": now,
+            })
+            if len(rows) >= BATCH_SIZE:
+                conn.execute(insert(Phase), rows)
+                rows = []
+        if rows:
+            conn.execute(insert(Phase), rows)
+    return project_ids
+
+
+def run(total_phases: int, lookups: int, drop_index: bool) -> dict:
+    """Build a fresh database of the given size and time get_phase calls"""
+    with tempfile.TemporaryDirectory() as tmp:
+        init_db(f"sqlite:///{tmp}/bench.db")
+        if drop_index:
+            with connection._engine.begin() as conn:
+                conn.execute(text("DROP INDEX ix_phases_project_phase"))
+        project_ids = populate(total_phases)
+
+        db = next(get_db())
+        service = ProjectService(db)
+        rng = random.Random(42)
+        timings = []
+        for _ in range(lookups):
+            project_id = rng.choice(project_ids)
+            phase_number = rng.randint(1, min(PHASES_PER_PROJECT, total_phases))
+            start = time.perf_counter()
+            service.get_phase(project_id, phase_number)
+            timings.append((time.perf_counter() - start) * 1e6)
+        db.close()
+        connection._engine.dispose()
+
+    timings.sort()
+    return {
+        "phases": total_phases,
+        "median_us": statistics.median(timings),
+        "p99_us": timings[int(len(timings) * 0.99) - 1],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000, 1_000_000])
+    parser.add_argument("--lookups", type=int, default=2_000)
+    parser.add_argument("--no-index", action="store_true", help="drop the composite index")
+    args = parser.parse_args()
+
+    print(f"{'phases':>10} {'median (us)':>12} {'p99 (us)':>10}")
+    for size in args.sizes:
+        result = run(size, args.lookups, args.no_index)
+        print(f"{result['phases']:>10} {result['median_us']:>12.1f} {result['p99_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: POST /import versus one tool call per project
+
+Starts the server with uvicorn on a temporary SQLite database and loads the
+same projects twice: once as a single NDJSON upload to POST /import, and
+once the way a client without the endpoint would, with create_project and
+save_phases calls on /mcp/execute (save_phases already writes all phases of
+a project in one statement).
+
+Usage:
+    python benchmarks/bench_import.py --projects 200 --phases 10
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import requests
+import uvicorn
+
+from bench_response_compression import free_port
+
+
+def make_projects(count: int, phases: int) -> list:
+    """Projects with phases carrying ~1 KB specs"""
+    return [
+        {
+            "name": f"Projeto {n}",
+            "phases": [
+                {
+                    "phase_number": number,
+                    "title": f"Fase {number}",
+                    "specs": {"files_to_create": [f"src/modulo_{number}.py"], "instructions": "implementar " * 80},
+                }
+                for number in range(1, phases + 1)
+            ],
+        }
+        for n in range(count)
+    ]
+
+
+def to_ndjson(projects: list) -> bytes:
+    lines = [{"type": "export", "version": 1}]
+    for project in projects:
+        project_id = str(uuid.uuid4())
+        lines.append({"type": "project", "project_id": project_id, "name": project["name"]})
+        lines.extend({"type": "phase", "project_id": project_id, **phase} for phase in project["phases"])
+    return b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--projects", type=int, default=200)
+    parser.add_argument("--phases", type=int, default=10, help="Phases per project")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/bench.db"
+    from main import app
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    base = f"http://127.0.0.1:{port}"
+    session = requests.Session()
+    projects = make_projects(args.projects, args.phases)
+    rows = args.projects * (args.phases + 1)
+
+    body = to_ndjson(projects)
+    start = time.perf_counter()
+    response = session.post(f"{base}/import", data=body)
+    response.raise_for_status()
+    bulk = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for project in projects:
+        project_id = session.post(f"{base}/mcp/execute", json={
+            "tool": "create_project", "arguments": {"name": project["name"]}
+        }).json()["data"]["project_id"]
+        session.post(f"{base}/mcp/execute", json={
+            "tool": "save_phases", "arguments": {"project_id": project_id, "phases": project["phases"]}
+        })
+    calls = time.perf_counter() - start
+
+    print(f"{rows:,} rows ({args.projects} projects x {args.phases} phases, {len(body) / 1e6:.1f} MB NDJSON)")
+    print(f"{'POST /import':<28}{bulk:>8.2f} s{rows / bulk:>12,.0f} rows/s")
+    print(f"{'create_project+save_phases':<28}{calls:>8.2f} s{rows / calls:>12,.0f} rows/s")
+
+    server.should_exit = True
+    thread.join()
+
+
+if __name__ == "__main__":
+    main()
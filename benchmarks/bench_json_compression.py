@@ -0,0 +1,77 @@
+"""
+Benchmark: compressed JSON storage of phase payloads
+
+For specs of growing size, reports the stored size and the encode/decode
+cost of the compressed column type (database.compression) against plain
+JSON text, which is what the JSON column type stored. The specs mimic LLM
+output: prose instructions plus lists of paths, built from a fixed word
+list so runs are repeatable.
+
+Usage:
+    python benchmarks/bench_json_compression.py --repeat 200
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from database.compression import decode_json, encode_json
+
+
+WORDS = (
+    "implementar endpoint validar teste usuário autenticação token banco dados "
+    "migração serviço cache resposta erro requisição fase projeto módulo função "
+    "classe retorno parâmetro configuração deploy integração contrato esquema"
+).split()
+
+SIZES = [1_000, 5_000, 10_000, 50_000]
+
+
+def make_specs(size: int, rng: random.Random) -> dict:
+    """Phase specs whose JSON text is roughly `size` characters"""
+    specs = {"files_to_create": [], "tests_to_write": [], "dependencies": ["fastapi", "sqlalchemy"], "instructions": ""}
+    while len(json.dumps(specs)) < size:
+        sentence = " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20)))
+        specs["instructions"] += sentence.capitalize() + ". "
+        if rng.random() < 0.2:
+            name = "_".join(rng.sample(WORDS, 2))
+            specs["files_to_create"].append(f"src/{name}.py")
+            specs["tests_to_write"].append(f"tests/test_{name}.py")
+    return specs
+
+
+def per_call(fn, repeat: int) -> float:
+    """Mean microseconds per call"""
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--repeat", type=int, default=200, help="Calls per measurement")
+    args = parser.parse_args()
+    rng = random.Random(42)
+
+    print(f"{'json':>7}  {'stored':>7}  {'ratio':>5}  {'enc plain':>9}  {'enc zlib':>8}  {'dec plain':>9}  {'dec zlib':>8}  (us)")
+    for size in SIZES:
+        specs = make_specs(size, rng)
+        plain = json.dumps(specs)
+        stored = encode_json(specs)
+        assert decode_json(stored) == specs
+        print(
+            f"{len(plain.encode()):>7}  {len(stored):>7}  {len(plain.encode()) / len(stored):>4.1f}x  "
+            f"{per_call(lambda: json.dumps(specs), args.repeat):>9.1f}  "
+            f"{per_call(lambda: encode_json(specs), args.repeat):>8.1f}  "
+            f"{per_call(lambda: json.loads(plain), args.repeat):>9.1f}  "
+            f"{per_call(lambda: decode_json(stored), args.repeat):>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Benchmark: mixed read/write load on 1 worker versus N workers (SQLite)
+
+Starts `manage.py serve` on a temporary SQLite database in three modes and
+drives the same closed-loop load against each: concurrent clients issuing
+get_phase/get_project_status reads and update_progress writes.
+
+    1 worker          a single process serves everything
+    N workers         every worker writes to SQLite itself (--no-writer)
+    N workers+writer  workers forward writes to the single writer, which
+                      group-commits them (the serve default)
+
+Usage:
+    python benchmarks/bench_multiworker.py --workers 4 --clients 16 --seconds 10
+"""
+import argparse
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+import requests
+
+SRC = Path(__file__).parent.parent / "src"
+sys.path.insert(0, str(SRC))
+
+from bench_response_compression import free_port
+
+
+def start_server(db_url: str, workers: int, writer: bool) -> tuple:
+    """Run manage.py serve and wait for /health"""
+    port, writer_port = free_port(), free_port()
+    command = [
+        sys.executable, str(SRC / "manage.py"), "--database-url", db_url,
+        "serve", "--host", "127.0.0.1", "--port", str(port),
+        "--workers", str(workers), "--writer-port", str(writer_port),
+    ]
+    if not writer:
+        command.append("--no-writer")
+    process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 60
+    while True:
+        try:
+            requests.get(f"{base}/health", timeout=1).raise_for_status()
+            return process, base
+        except requests.RequestException:
+            if time.monotonic() > deadline:
+                process.kill()
+                raise RuntimeError("server did not start")
+            time.sleep(0.2)
+
+
+def execute(session: requests.Session, base: str, tool: str, arguments: dict) -> dict:
+    """Call one tool and return the decoded result"""
+    response = session.post(f"{base}/mcp/execute", json={"tool": tool, "arguments": arguments}, timeout=60)
+    response.raise_for_status()
+    return response.json()
+
+
+def seed(base: str, projects: int, phases: int) -> list:
+    """Create projects with planned phases; return their ids"""
+    session = requests.Session()
+    ids = []
+    for i in range(projects):
+        project_id = execute(session, base, "create_project", {"name": f"load {i}"})["data"]["project_id"]
+        execute(session, base, "save_phases", {"project_id": project_id, "phases": [
+            {"phase_number": n, "title": f"Phase {n}", "specs": {"instructions": "x" * 2000}}
+            for n in range(1, phases + 1)
+        ]})
+        ids.append(project_id)
+    return ids
+
+
+def load(base: str, project_ids: list, phases: int, clients: int, seconds: float, write_ratio: float) -> dict:
+    """Closed-loop load: each client sends its next request when the last returns"""
+    stop = time.monotonic() + seconds
+    reads, writes, errors = [], [], []
+    lock = threading.Lock()
+
+    def client(seed_value: int):
+        rng = random.Random(seed_value)
+        session = requests.Session()
+        while time.monotonic() < stop:
+            project_id = rng.choice(project_ids)
+            number = rng.randint(1, phases)
+            if rng.random() < write_ratio:
+                kind, tool, arguments = writes, "update_progress", {
+                    "project_id": project_id, "phase_number": number,
+                    "status": rng.choice(["in_progress", "completed"]),
+                    "progress_data": {"notes": f"client {seed_value}", "tests_passed": rng.randint(0, 50)},
+                }
+            else:
+                kind = reads
+                tool = rng.choice(["get_phase", "get_project_status"])
+                arguments = {"project_id": project_id}
+                if tool == "get_phase":
+                    arguments["phase_number"] = number
+            start = time.perf_counter()
+            try:
+                ok = execute(session, base, tool, arguments)["success"]
+            except requests.RequestException:
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                (kind if ok else errors).append(elapsed)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {"reads": reads, "writes": writes, "errors": errors}
+
+
+def percentile(values: list, fraction: float) -> float:
+    """Latency percentile in milliseconds"""
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--write-ratio", type=float, default=0.2, help="Fraction of requests that write")
+    parser.add_argument("--projects", type=int, default=20)
+    parser.add_argument("--phases", type=int, default=10, help="Phases per project")
+    args = parser.parse_args()
+
+    modes = [
+        ("1 worker", 1, False),
+        (f"{args.workers} workers", args.workers, False),
+        (f"{args.workers} workers+writer", args.workers, True),
+    ]
+    print(f"{args.clients} clients, {args.seconds:.0f} s, {args.write_ratio:.0%} writes, {os.cpu_count()} CPU(s)")
+    print(f"{'mode':<22}{'req/s':>8}{'writes/s':>10}{'read p50':>10}{'read p99':>10}"
+          f"{'write p50':>11}{'write p99':>11}{'errors':>8}")
+    for label, workers, writer in modes:
+        tmp = tempfile.mkdtemp()
+        process, base = start_server(f"sqlite:///{tmp}/bench.db", workers, writer)
+        try:
+            project_ids = seed(base, args.projects, args.phases)
+            result = load(base, project_ids, args.phases, args.clients, args.seconds, args.write_ratio)
+        finally:
+            process.terminate()
+            process.wait()
+        total = len(result["reads"]) + len(result["writes"])
+        print(
+            f"{label:<22}{total / args.seconds:>8.0f}{len(result['writes']) / args.seconds:>10.0f}"
+            f"{percentile(result['reads'], 0.5):>8.1f}ms{percentile(result['reads'], 0.99):>8.1f}ms"
+            f"{percentile(result['writes'], 0.5):>9.1f}ms{percentile(result['writes'], 0.99):>9.1f}ms"
+            f"{len(result['errors']):>8}"
+        )
+
+
+if __name__ == "__main__":
+    main()
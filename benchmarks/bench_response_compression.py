@@ -0,0 +1,110 @@
+"""
+Benchmark: bytes on the wire and latency with response compression
+
+Starts the server with uvicorn on a temporary SQLite database, stores a
+20-phase project with LLM-like specs and fetches it through the endpoints
+clients use, once without compression (Accept-Encoding: identity) and once
+with each encoding the server supports. Latency is measured over loopback
+with a keep-alive session; "at N Mbit/s" adds the transfer time of the
+wire bytes on a link of that bandwidth, which is what dominates between
+Render and a developer machine.
+
+Usage:
+    python benchmarks/bench_response_compression.py --requests 50 --mbps 20
+"""
+import argparse
+import os
+import random
+import socket
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+import requests
+import uvicorn
+
+WORDS = (
+    "implementar endpoint validar teste usuário autenticação token banco dados "
+    "migração serviço cache resposta erro requisição fase projeto módulo função "
+    "classe retorno parâmetro configuração deploy integração contrato esquema"
+).split()
+
+
+def make_specs(rng: random.Random, sentences: int = 120) -> dict:
+    """Phase specs of roughly 10 KB"""
+    names = ["_".join(rng.sample(WORDS, 2)) for _ in range(12)]
+    return {
+        "files_to_create": [f"src/{name}.py" for name in names],
+        "tests_to_write": [f"tests/test_{name}.py" for name in names],
+        "dependencies": ["fastapi", "sqlalchemy"],
+        "instructions": " ".join(
+            " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 20))).capitalize() + "."
+            for _ in range(sentences)
+        ),
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--requests", type=int, default=50, help="Requests per measurement")
+    parser.add_argument("--mbps", type=float, default=20.0, help="Link bandwidth for the transfer estimate")
+    args = parser.parse_args()
+
+    tmp = tempfile.mkdtemp()
+    os.environ["DATABASE_URL"] = f"sqlite:///{tmp}/bench.db"
+    from main import app
+    from services.response_compression import supported_encodings
+
+    port = free_port()
+    server = uvicorn.Server(uvicorn.Config(app, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+
+    base = f"http://127.0.0.1:{port}"
+    session = requests.Session()
+    execute = lambda tool, arguments: session.post(f"{base}/mcp/execute", json={"tool": tool, "arguments": arguments}).json()
+    rng = random.Random(42)
+    project_id = execute("create_project", {"name": "bench"})["data"]["project_id"]
+    execute("save_phases", {
+        "project_id": project_id,
+        "phases": [{"phase_number": n, "title": f"Fase {n}", "specs": make_specs(rng)} for n in range(1, 21)],
+    })
+
+    targets = [
+        ("GET /projects/{id}", "GET", f"{base}/projects/{project_id}", None),
+        ("get_phase", "POST", f"{base}/mcp/execute", {"tool": "get_phase", "arguments": {"project_id": project_id, "phase_number": 1}}),
+        ("list_project_phases", "POST", f"{base}/mcp/execute", {"tool": "list_project_phases", "arguments": {"project_id": project_id}}),
+        ("GET /projects", "GET", f"{base}/projects", None),
+    ]
+
+    print(f"{'endpoint':<22}{'encoding':>9}{'wire bytes':>12}{'loopback ms':>13}{f'at {args.mbps:g} Mbit/s ms':>20}")
+    for label, method, url, body in targets:
+        for encoding in ("identity", *supported_encodings()):
+            headers = {"Accept-Encoding": encoding}
+            response = session.request(method, url, json=body, headers=headers, stream=True)
+            wire = len(response.raw.read(decode_content=False))
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                session.request(method, url, json=body, headers=headers).content
+            loopback = (time.perf_counter() - start) / args.requests * 1000
+            transfer = wire * 8 / (args.mbps * 1_000_000) * 1000
+            print(f"{label:<22}{encoding:>9}{wire:>12,}{loopback:>13.2f}{loopback + transfer:>20.2f}")
+
+    server.should_exit = True
+    thread.join()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: encoding /mcp/execute results of growing size
+
+Compares, through the ASGI stack and without database work, the old
+response path (ExecuteToolResponse(**result) returned from a route with
+response_model, so Pydantic validates and serializes the result and FastAPI
+encodes it with the stdlib json) against the current one (the result dict
+encoded straight to bytes by mcp.encoding). Payloads are phase listings
+whose specs add up to 1 KB .. 5 MB.
+
+Usage:
+    python benchmarks/bench_response_encoding.py --seconds 2
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from main import EncodedJSONResponse, ExecuteToolResponse
+from mcp.encoding import dumps, dumps_tool_result, orjson
+
+
+SIZES = [1_000, 10_000, 100_000, 1_000_000, 5_000_000]
+
+
+def make_result(size: int) -> dict:
+    """A list_project_phases-like result of roughly `size` encoded bytes"""
+    phase = {
+        "phase_number": 0,
+        "title": "Implementação do módulo",
+        "status": "planned",
+        "specs": {
+            "files_to_create": [f"src/module_{i}.py" for i in range(5)],
+            "tests_to_write": [f"tests/test_module_{i}.py" for i in range(5)],
+            "dependencies": ["fastapi", "sqlalchemy"],
+            "instructions": "Implementar a lógica conforme o plano. " * 4,
+        },
+    }
+    per_phase = len(dumps(phase))
+    phases = [dict(phase, phase_number=n + 1) for n in range(max(1, round(size / per_phase)))]
+    return {"success": True, "data": {"project_id": "p", "phases": phases, "next_cursor": None}}
+
+
+def build_app(result: dict) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/old", response_model=ExecuteToolResponse)
+    async def old():
+        return ExecuteToolResponse(**result)
+
+    @app.post("/new", response_model=ExecuteToolResponse)
+    async def new():
+        return EncodedJSONResponse(dumps_tool_result(result))
+
+    return app
+
+
+def measure(client: TestClient, path: str, seconds: float) -> float:
+    """Mean milliseconds per request"""
+    client.post(path)
+    count = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds or count < 3:
+        client.post(path)
+        count += 1
+    return (time.perf_counter() - start) / count * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--seconds", type=float, default=1.0, help="Time per measurement")
+    args = parser.parse_args()
+
+    print(f"encoder: {'orjson' if orjson is not None else 'json'}")
+    print(f"{'payload':>10}  {'old ms':>9}  {'new ms':>9}  {'speedup':>7}")
+    for size in SIZES:
+        result = make_result(size)
+        with TestClient(build_app(result)) as client:
+            assert client.post("/old").json() == client.post("/new").json()
+            old = measure(client, "/old", args.seconds)
+            new = measure(client, "/new", args.seconds)
+        print(f"{len(dumps(result)):>10}  {old:>9.2f}  {new:>9.2f}  {old / new:>6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
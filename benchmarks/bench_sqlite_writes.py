@@ -0,0 +1,98 @@
+"""
+Benchmark: concurrent update_progress throughput per SQLite profile
+
+Several writer threads call ProjectService.update_progress while reader
+threads call get_project_status, all against one file database. Compares the
+"default" profile (rollback journal, synchronous=FULL) with the
+"performance" profile (WAL, synchronous=NORMAL, busy_timeout, mmap, cache).
+
+Usage:
+    python benchmarks/bench_sqlite_writes.py --writers 4 --readers 4 --seconds 5
+"""
+import argparse
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from sqlalchemy.exc import OperationalError
+
+from database.connection import init_db, get_db
+from database.sqlite import SQLiteTuning
+from services.project_service import ProjectService
+
+
+def run(profile: str, writers: int, readers: int, seconds: float) -> dict:
+    """Run the mixed workload for one profile"""
+    with tempfile.TemporaryDirectory() as tmp:
+        init_db(f"sqlite:///{tmp}/bench.db", sqlite_tuning=SQLiteTuning(profile=profile))
+        setup = ProjectService(next(get_db()))
+        project_ids = []
+        for i in range(writers):
+            project = setup.create_project(name=f"bench-{i}")
+            for number in range(1, 11):
+                setup.save_phase(project["project_id"], number, f"Phase {number}", {"instructions": "x"})
+            project_ids.append(project["project_id"])
+        setup.db.close()
+
+        counters = {"writes": 0, "reads": 0, "errors": 0}
+        lock = threading.Lock()
+        deadline = time.perf_counter() + seconds
+
+        def writer(project_id: str):
+            service = ProjectService(next(get_db()))
+            n = 0
+            while time.perf_counter() < deadline:
+                try:
+                    service.update_progress(project_id, n % 10 + 1, "in_progress", {"notes": str(n)})
+                    key = "writes"
+                except OperationalError:
+                    service.db.rollback()
+                    key = "errors"
+                with lock:
+                    counters[key] += 1
+                n += 1
+            service.db.close()
+
+        def reader(project_id: str):
+            service = ProjectService(next(get_db()))
+            while time.perf_counter() < deadline:
+                try:
+                    service.get_project_status(project_id)
+                    service.db.rollback()
+                    key = "reads"
+                except OperationalError:
+                    service.db.rollback()
+                    key = "errors"
+                with lock:
+                    counters[key] += 1
+            service.db.close()
+
+        threads = [threading.Thread(target=writer, args=(pid,)) for pid in project_ids]
+        threads += [threading.Thread(target=reader, args=(project_ids[i % writers],)) for i in range(readers)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return {k: v / seconds if k != "errors" else v for k, v in counters.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    args = parser.parse_args()
+
+    print(f"{'profile':<12} {'writes/s':>10} {'reads/s':>10} {'lock errors':>12}")
+    for profile in ("default", "performance"):
+        result = run(profile, args.writers, args.readers, args.seconds)
+        print(f"{profile:<12} {result['writes']:>10.0f} {result['reads']:>10.0f} {result['errors']:>12}")
+
+
+if __name__ == "__main__":
+    main()
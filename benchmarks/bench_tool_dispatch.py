@@ -0,0 +1,80 @@
+"""
+Benchmark: per-call MCP dispatch overhead without database work
+
+Measures what /mcp/tools and /mcp/execute cost before any query runs:
+building the protocol handler, looking up the tool and validating the
+arguments, and producing the /mcp/tools body. "rebuild" reproduces the
+per-call work done before the process-wide registry (rebuilding every
+schema and validator, serializing the listing); "registry" is the current
+path.
+
+Usage:
+    python benchmarks/bench_tool_dispatch.py --calls 100000
+"""
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp.protocol import MCPProtocol
+from mcp.tools import MCPTools
+from mcp.validation import compile_validator
+
+
+CALLS = [
+    ("create_project", {"name": "bench", "description": "x"}),
+    ("save_phase", {"project_id": "p", "phase_number": 1, "title": "t", "specs": {"instructions": "x"}}),
+    ("get_phase", {"project_id": "p", "phase_number": 1}),
+    ("update_progress", {"project_id": "p", "phase_number": 1, "status": "completed"}),
+]
+
+
+def execute_rebuild(tool_name: str, arguments: dict):
+    """Per-call work of the old path"""
+    tools = MCPTools._define_tools()
+    tool_def = tools[tool_name]
+    return compile_validator(tool_def["input_schema"])(arguments)
+
+
+def execute_registry(tool_name: str, arguments: dict):
+    """Per-call work of the current path"""
+    protocol = MCPProtocol(None)
+    tool_def = protocol.tools.get_tool(tool_name)
+    return protocol._validate_arguments(tool_def, arguments)
+
+
+def list_rebuild():
+    return json.dumps({"tools": list(MCPTools._define_tools().values())}).encode()
+
+
+def list_registry():
+    return MCPTools().tools_json()
+
+
+def per_call_us(fn, calls: int, *args) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn(*args)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=100000)
+    args = parser.parse_args()
+
+    print(f"{'operation':<26} {'rebuild µs':>12} {'registry µs':>12}")
+    for tool_name, arguments in CALLS:
+        rebuild = per_call_us(execute_rebuild, args.calls, tool_name, arguments)
+        registry = per_call_us(execute_registry, args.calls, tool_name, arguments)
+        print(f"{'execute ' + tool_name:<26} {rebuild:>12.2f} {registry:>12.2f}")
+    rebuild = per_call_us(list_rebuild, args.calls // 10)
+    registry = per_call_us(list_registry, args.calls)
+    print(f"{'GET /mcp/tools body':<26} {rebuild:>12.2f} {registry:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
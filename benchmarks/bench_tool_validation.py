@@ -0,0 +1,84 @@
+"""
+Benchmark: argument validation cost per tool call
+
+Times the precompiled validators on realistic arguments, including nested
+specs and whole plans for save_phases. When the jsonschema package is
+installed, its validator (also built once per schema) is shown for
+comparison.
+
+Usage:
+    python benchmarks/bench_tool_validation.py --calls 20000
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from mcp.tools import MCPTools
+
+try:
+    import jsonschema
+except ImportError:
+    jsonschema = None
+
+
+SPECS = {
+    "files_to_create": [f"src/module_{i}.py" for i in range(10)],
+    "tests_to_write": [f"tests/test_module_{i}.py" for i in range(10)],
+    "dependencies": ["fastapi", "sqlalchemy"],
+    "instructions": "Implement the modules and their tests. " * 20,
+}
+
+CASES = [
+    ("get_phase", {"project_id": "p", "phase_number": 1}),
+    ("update_progress", {
+        "project_id": "p", "phase_number": 1, "status": "completed",
+        "progress_data": {"files_created": ["a.py", "b.py"], "tests_passed": 12, "tests_failed": 0, "notes": "ok"},
+    }),
+    ("save_phase", {"project_id": "p", "phase_number": 1, "title": "Setup", "specs": SPECS}),
+    ("save_phases x10", {
+        "project_id": "p",
+        "phases": [{"phase_number": n, "title": f"Phase {n}", "specs": SPECS} for n in range(1, 11)],
+    }),
+    ("save_phases x100", {
+        "project_id": "p",
+        "phases": [{"phase_number": n, "title": f"Phase {n}", "specs": SPECS} for n in range(1, 101)],
+    }),
+]
+
+
+def per_call_us(fn, calls: int, arguments: dict) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        fn(arguments)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--calls", type=int, default=20000)
+    args = parser.parse_args()
+
+    tools = MCPTools()
+    header = f"{'tool':<20} {'compiled µs':>12}"
+    if jsonschema is not None:
+        header += f" {'jsonschema µs':>14}"
+    print(header)
+    for label, arguments in CASES:
+        name = label.split()[0]
+        calls = max(args.calls // (10 if "x100" in label else 1), 1)
+        validate = tools.get_validator(name)
+        assert validate(arguments) is None
+        line = f"{label:<20} {per_call_us(validate, calls, arguments):>12.2f}"
+        if jsonschema is not None:
+            validator = jsonschema.validators.validator_for(tools.get_tool(name)["input_schema"])(
+                tools.get_tool(name)["input_schema"]
+            )
+            line += f" {per_call_us(validator.validate, max(calls // 10, 1), arguments):>14.2f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
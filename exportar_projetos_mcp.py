@@ -0,0 +1,64 @@
+"""
+Script para exportar todos os projetos e fases do servidor MCP (NDJSON)
+
+Uso:
+    python exportar_projetos_mcp.py                      # salva em mcp-aidev-export.ndjson
+    python exportar_projetos_mcp.py -o backup.ndjson
+    python exportar_projetos_mcp.py -o - | jq .          # escreve na saída padrão
+    python exportar_projetos_mcp.py --server http://localhost:8000
+
+O servidor envia o arquivo linha a linha (GET /export); o script grava cada
+bloco assim que chega, então a memória usada não depende do tamanho da base.
+"""
+import argparse
+import os
+import sys
+
+import requests
+
+
+DEFAULT_SERVER = os.getenv("MCP_SERVER_URL", "https://mcp-aidev.onrender.com")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Exporta projetos e fases do MCP-AIDev em NDJSON")
+    parser.add_argument("--server", default=DEFAULT_SERVER, help=f"URL do servidor (padrão: {DEFAULT_SERVER})")
+    parser.add_argument("-o", "--output", default="mcp-aidev-export.ndjson", help="Arquivo de saída ('-' para stdout)")
+    args = parser.parse_args()
+
+    url = f"{args.server.rstrip('/')}/export"
+    # Mensagens vão para stderr para não misturar com o NDJSON em "-o -"
+    log = lambda message: print(message, file=sys.stderr)
+    log(f"Exportando de {url} ...")
+
+    counts = {"project": 0, "phase": 0}
+    pending = b""
+    try:
+        with requests.get(url, stream=True, timeout=(10, 300)) as response:
+            response.raise_for_status()
+            output = sys.stdout.buffer if args.output == "-" else open(args.output, "wb")
+            try:
+                for chunk in response.iter_content(chunk_size=64 * 1024):
+                    output.write(chunk)
+                    # Conta registros pelas linhas completas recebidas
+                    lines = (pending + chunk).split(b"\n")
+                    pending = lines.pop()
+                    for line in lines:
+                        if line.startswith(b'{"type":"project"'):
+                            counts["project"] += 1
+                        elif line.startswith(b'{"type":"phase"'):
+                            counts["phase"] += 1
+            finally:
+                if output is not sys.stdout.buffer:
+                    output.close()
+    except requests.RequestException as e:
+        log(f"[ERRO] Falha na exportação: {e}")
+        sys.exit(1)
+
+    log(f"[OK] {counts['project']} projeto(s) e {counts['phase']} fase(s) exportados")
+    if args.output != "-":
+        log(f"     Arquivo: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
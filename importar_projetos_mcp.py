@@ -0,0 +1,73 @@
+"""
+Script para importar projetos e fases no servidor MCP (NDJSON)
+
+Uso:
+    python importar_projetos_mcp.py backup.ndjson
+    python importar_projetos_mcp.py backup.ndjson --upsert   # atualiza os existentes
+    python exportar_projetos_mcp.py -o - | python importar_projetos_mcp.py - --server http://localhost:8000
+
+O arquivo deve estar no formato do GET /export. Ele é enviado em partes
+(POST /import) sem ser carregado inteiro na memória; o servidor grava em
+lotes e confirma a cada 2 mil registros.
+"""
+import argparse
+import os
+import sys
+
+import requests
+
+
+DEFAULT_SERVER = os.getenv("MCP_SERVER_URL", "https://mcp-aidev.onrender.com")
+
+
+def read_chunks(file, chunk_size: int = 64 * 1024):
+    """Lê o arquivo em blocos (upload com Transfer-Encoding: chunked)"""
+    while True:
+        chunk = file.read(chunk_size)
+        if not chunk:
+            return
+        yield chunk
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Importa projetos e fases no MCP-AIDev a partir de NDJSON")
+    parser.add_argument("input", help="Arquivo NDJSON gerado pelo exportar_projetos_mcp.py ('-' para stdin)")
+    parser.add_argument("--server", default=DEFAULT_SERVER, help=f"URL do servidor (padrão: {DEFAULT_SERVER})")
+    parser.add_argument("--upsert", action="store_true", help="Atualiza projetos e fases que já existem")
+    args = parser.parse_args()
+
+    url = f"{args.server.rstrip('/')}/import"
+    print(f"Importando para {url} ...")
+
+    source = sys.stdin.buffer if args.input == "-" else open(args.input, "rb")
+    try:
+        response = requests.post(
+            url,
+            params={"upsert": "true"} if args.upsert else None,
+            data=read_chunks(source),
+            headers={"Content-Type": "application/x-ndjson"},
+            timeout=(10, 600)
+        )
+    except requests.RequestException as e:
+        print(f"[ERRO] Falha na importação: {e}")
+        sys.exit(1)
+    finally:
+        if source is not sys.stdin.buffer:
+            source.close()
+
+    if response.status_code == 400:
+        detail = response.json()["detail"]
+        imported = detail["imported"]
+        print(f"[ERRO] {detail['error']}")
+        print(f"       Já importados: {imported['projects']} projeto(s) e {imported['phases']} fase(s)")
+        sys.exit(1)
+    if not response.ok:
+        print(f"[ERRO] HTTP {response.status_code}: {response.text}")
+        sys.exit(1)
+
+    imported = response.json()["imported"]
+    print(f"[OK] {imported['projects']} projeto(s) e {imported['phases']} fase(s) importados")
+
+
+if __name__ == "__main__":
+    main()
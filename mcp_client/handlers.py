@@ -131,10 +131,19 @@ class MCPHandler:
             },
             {
                 "name": "list_projects",
-                "description": "List all projects in MCP server",
+                "description": "List projects in MCP server. Results are paginated: pass the returned next_cursor to fetch the following page.",
                 "inputSchema": {
                     "type": "object",
-                    "properties": {},
+                    "properties": {
+                        "limit": {
+                            "type": "integer",
+                            "description": "Maximum number of projects to return (default: 100, max: 500)"
+                        },
+                        "cursor": {
+                            "type": "string",
+                            "description": "Opaque next_cursor returned by the previous page"
+                        }
+                    },
                     "required": []
                 }
             },
@@ -160,6 +169,10 @@ class MCPHandler:
                         "progress_data": {
                             "type": "object",
                             "description": "Optional progress information"
+                        },
+                        "expected_version": {
+                            "type": "integer",
+                            "description": "Optional phase 'version' this update is based on; fails with a version conflict if the phase has changed since"
                         }
                     },
                     "required": ["project_id", "phase_number", "status"]
@@ -202,13 +215,21 @@ class MCPHandler:
             },
             {
                 "name": "get_project_status",
-                "description": "Get comprehensive project status including total phases, completed phases, in-progress phases, current phase, and progress percentage",
+                "description": "Get comprehensive project status including total phases, completed phases, in-progress phases, current phase, progress percentage and version. With wait_since, waits for the project to change before answering.",
                 "inputSchema": {
                     "type": "object",
                     "properties": {
                         "project_id": {
                             "type": "string",
                             "description": "UUID of the project"
+                        },
+                        "wait_since": {
+                            "type": "integer",
+                            "description": "Wait until the project's version is greater than this value (the 'version' of a previous result), then return the current state"
+                        },
+                        "timeout": {
+                            "type": "number",
+                            "description": "Seconds to wait with wait_since (default: 30, max: 60)"
                         }
                     },
                     "required": ["project_id"]
@@ -216,13 +237,21 @@ class MCPHandler:
             },
             {
                 "name": "list_project_phases",
-                "description": "List all phases for a project with their status (planned, in_progress, completed)",
+                "description": "List the phases of a project with their status (planned, in_progress, completed). Results are paginated: pass the returned next_cursor to fetch the following page.",
                 "inputSchema": {
                     "type": "object",
                     "properties": {
                         "project_id": {
                             "type": "string",
                             "description": "UUID of the project"
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Maximum number of phases to return (default: 100, max: 500)"
+                        },
+                        "cursor": {
+                            "type": "string",
+                            "description": "Opaque next_cursor returned by the previous page"
                         }
                     },
                     "required": ["project_id"]
@@ -230,18 +259,52 @@ class MCPHandler:
             },
             {
                 "name": "get_current_phase",
-                "description": "Get the current phase (first non-completed phase) for a project. Returns None if all phases are completed.",
+                "description": "Get the current phase (first non-completed phase) for a project. Returns None if all phases are completed. With wait_since, waits for the project to change before answering.",
                 "inputSchema": {
                     "type": "object",
                     "properties": {
                         "project_id": {
                             "type": "string",
                             "description": "UUID of the project"
+                        },
+                        "wait_since": {
+                            "type": "integer",
+                            "description": "Wait until the project's version is greater than this value (the 'version' of a previous result), then return the current state"
+                        },
+                        "timeout": {
+                            "type": "number",
+                            "description": "Seconds to wait with wait_since (default: 30, max: 60)"
                         }
                     },
                     "required": ["project_id"]
                 }
             },
+            {
+                "name": "search_phases",
+                "description": "Full-text search over phase titles, instructions, files to create and project names/descriptions, across all projects. Results are ranked by relevance and paginated: pass the returned next_cursor to fetch the following page.",
+                "inputSchema": {
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "Words to look for, e.g. 'auth module' or 'redis'"
+                        },
+                        "project_id": {
+                            "type": "string",
+                            "description": "Optional UUID of a project to search in"
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Maximum number of results to return (default: 20, max: 500)"
+                        },
+                        "cursor": {
+                            "type": "string",
+                            "description": "Opaque next_cursor returned by the previous page"
+                        }
+                    },
+                    "required": ["query"]
+                }
+            },
             {
                 "name": "execute_agent_command",
                 "description": "Execute agent commands from any directory. Runs Python agent commands without needing to change directories.",
@@ -283,7 +346,7 @@ class MCPHandler:
         elif tool_name == "get_phase":
             result = self._call_get_phase(arguments)
         elif tool_name == "list_projects":
-            result = self._call_list_projects()
+            result = self._call_list_projects(arguments)
         elif tool_name == "update_progress":
             result = self._call_update_progress(arguments)
         elif tool_name == "health_check":
@@ -294,6 +357,8 @@ class MCPHandler:
             result = self._call_list_project_phases(arguments)
         elif tool_name == "get_current_phase":
             result = self._call_get_current_phase(arguments)
+        elif tool_name == "search_phases":
+            result = self._call_search_phases(arguments)
         elif tool_name == "execute_agent_command":
             result = self._call_execute_agent_command(arguments)
         elif tool_name == "dictate_text":
@@ -339,10 +404,10 @@ class MCPHandler:
             args["phase_number"]
         )
     
-    def _call_list_projects(self) -> Dict[str, Any]:
-        """List all projects"""
-        import requests
-        response = requests.get(f"{config.mcp_server_url}/projects")
+    def _call_list_projects(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """List one page of projects"""
+        params = {key: args[key] for key in ("limit", "cursor") if args.get(key) is not None}
+        response = self.mcp_tools.session.get(f"{config.mcp_server_url}/projects", params=params)
         return response.json()
     
     def _call_update_progress(self, args: Dict[str, Any]) -> Dict[str, Any]:
@@ -351,7 +416,8 @@ class MCPHandler:
             args["project_id"],
             args["phase_number"],
             args["status"],
-            args.get("progress_data", {})
+            args.get("progress_data", {}),
+            args.get("expected_version")
         )
     
     def _call_health_check(self) -> Dict[str, Any]:
@@ -364,13 +430,15 @@ class MCPHandler:
     
     def _call_get_project_status(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Get comprehensive project status"""
-        import requests
-        project_id = args["project_id"]
-        response = requests.post(
+        arguments = {"project_id": args["project_id"]}
+        for key in ("wait_since", "timeout"):
+            if args.get(key) is not None:
+                arguments[key] = args[key]
+        response = self.mcp_tools.session.post(
             f"{config.mcp_server_url}/mcp/execute",
             json={
                 "tool": "get_project_status",
-                "arguments": {"project_id": project_id}
+                "arguments": arguments
             }
         )
         result = response.json()
@@ -381,13 +449,34 @@ class MCPHandler:
     
     def _call_list_project_phases(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """List all phases for a project"""
-        import requests
-        project_id = args["project_id"]
-        response = requests.post(
+        arguments = {"project_id": args["project_id"]}
+        for key in ("limit", "cursor"):
+            if args.get(key) is not None:
+                arguments[key] = args[key]
+        response = self.mcp_tools.session.post(
             f"{config.mcp_server_url}/mcp/execute",
             json={
                 "tool": "list_project_phases",
-                "arguments": {"project_id": project_id}
+                "arguments": arguments
+            }
+        )
+        result = response.json()
+        if result.get("success"):
+            return result.get("data", {})
+        else:
+            raise ValueError(result.get("error", "Unknown error"))
+    
+    def _call_search_phases(self, args: Dict[str, Any]) -> Dict[str, Any]:
+        """Search phases of all projects"""
+        arguments = {"query": args["query"]}
+        for key in ("project_id", "limit", "cursor"):
+            if args.get(key) is not None:
+                arguments[key] = args[key]
+        response = self.mcp_tools.session.post(
+            f"{config.mcp_server_url}/mcp/execute",
+            json={
+                "tool": "search_phases",
+                "arguments": arguments
             }
         )
         result = response.json()
@@ -429,13 +518,15 @@ class MCPHandler:
     
     def _call_get_current_phase(self, args: Dict[str, Any]) -> Dict[str, Any]:
         """Get current phase for a project"""
-        import requests
-        project_id = args["project_id"]
-        response = requests.post(
+        arguments = {"project_id": args["project_id"]}
+        for key in ("wait_since", "timeout"):
+            if args.get(key) is not None:
+                arguments[key] = args[key]
+        response = self.mcp_tools.session.post(
             f"{config.mcp_server_url}/mcp/execute",
             json={
                 "tool": "get_current_phase",
-                "arguments": {"project_id": project_id}
+                "arguments": arguments
             }
         )
         result = response.json()
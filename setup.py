@@ -13,6 +13,8 @@ setup(
         "pydantic>=2.5.0",
         "sqlalchemy>=2.0.23",
         "aiosqlite>=0.19.0",
+        "psycopg2-binary>=2.9.9",
+        "asyncpg>=0.29.0",
         "pytest>=7.4.3",
         "pytest-asyncio>=0.21.1",
         "httpx>=0.25.2",
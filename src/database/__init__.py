@@ -2,7 +2,14 @@
 Database module for MCP-AIDev
 """
 
-from .connection import init_db, get_db, clear_db
+from .connection import (
+    init_db, get_db, clear_db,
+    init_async_db, get_async_db, dispose_async_db, run_in_session,
+)
 from .models import Base, Project, Phase
 
-__all__ = ["init_db", "get_db", "clear_db", "Base", "Project", "Phase"]
+__all__ = [
+    "init_db", "get_db", "clear_db",
+    "init_async_db", "get_async_db", "dispose_async_db", "run_in_session",
+    "Base", "Project", "Phase",
+]
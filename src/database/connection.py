@@ -1,31 +1,44 @@
 """
 Database connection management for MCP-AIDev
 """
+import asyncio
 import os
 from pathlib import Path
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker, Session, close_all_sessions
 from sqlalchemy.pool import StaticPool
-from typing import Generator
+from typing import AsyncGenerator, Callable, Generator, Optional, TypeVar, Union
 
 from .models import Base
+from .migrations import run_migrations
+from .sqlite import SQLiteTuning, install_pragmas
+from .postgres import PostgresSettings, normalize_url, is_postgres_url
 
 # Global engine and session factory
 _engine = None
 _SessionLocal = None
 
+# Optional async engine (aiosqlite), enabled with DATABASE_ASYNC=1
+_async_engine = None
+_AsyncSessionLocal = None
 
-def init_db(database_url: str = None) -> None:
+T = TypeVar("T")
+
+
+def init_db(database_url: str = None, sqlite_tuning: Optional[SQLiteTuning] = None) -> None:
     """
     Initialize database connection and create tables.
     
     Args:
-        database_url: SQLite database URL. Defaults to env variable or local file.
+        database_url: SQLite or PostgreSQL URL. Defaults to env variable or local file.
+        sqlite_tuning: PRAGMA profile for SQLite. Defaults to SQLITE_* env variables.
     """
     global _engine, _SessionLocal
     
     if database_url is None:
         database_url = os.getenv("DATABASE_URL", "sqlite:///./data/mcp_aidev.db")
+    database_url = normalize_url(database_url)
     
     # Special handling for in-memory database (testing)
     if database_url == ":memory:" or "mode=memory" in database_url:
@@ -34,6 +47,8 @@ def init_db(database_url: str = None) -> None:
             connect_args={"check_same_thread": False},
             poolclass=StaticPool,
         )
+    elif is_postgres_url(database_url):
+        _engine = create_engine(database_url, **PostgresSettings.from_env().engine_options())
     else:
         # Ensure directory exists for SQLite file
         if database_url.startswith("sqlite:///"):
@@ -48,10 +63,108 @@ def init_db(database_url: str = None) -> None:
             connect_args={"check_same_thread": False},
         )
     
-    _SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_engine)
+    if _engine.dialect.name == "sqlite":
+        install_pragmas(_engine, sqlite_tuning or SQLiteTuning.from_env())
+    
+    # Objects stay loaded after commit, so writes need no refresh SELECT
+    _SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=_engine)
     
-    # Create all tables
+    # Create all tables and upgrade databases created by older versions
     Base.metadata.create_all(bind=_engine)
+    run_migrations(_engine)
+
+
+def _async_url(database_url: str) -> str:
+    """Map a sync SQLAlchemy URL to its async driver equivalent"""
+    if database_url.startswith("sqlite://"):
+        return database_url.replace("sqlite://", "sqlite+aiosqlite://", 1)
+    if is_postgres_url(database_url):
+        return "postgresql+asyncpg://" + database_url.split("://", 1)[1]
+    return database_url
+
+
+def async_mode_requested() -> bool:
+    """Whether DATABASE_ASYNC asks for the async session mode"""
+    return os.getenv("DATABASE_ASYNC", "").lower() in ("1", "true", "yes")
+
+
+def init_async_db(database_url: str = None, sqlite_tuning: Optional[SQLiteTuning] = None) -> None:
+    """
+    Initialize the async engine and session factory.
+    
+    Tables and migrations are handled by init_db, which should run first on
+    the same database. In-memory databases are not shared between the sync
+    and async engines, so async mode needs a file (or server) database.
+    
+    Args:
+        database_url: Database URL. Defaults to env variable or local file.
+        sqlite_tuning: PRAGMA profile for SQLite. Defaults to SQLITE_* env variables.
+    """
+    global _async_engine, _AsyncSessionLocal
+    
+    if database_url is None:
+        database_url = os.getenv("DATABASE_URL", "sqlite:///./data/mcp_aidev.db")
+    database_url = normalize_url(database_url)
+    
+    if is_postgres_url(database_url):
+        _async_engine = create_async_engine(
+            _async_url(database_url),
+            **PostgresSettings.from_env().engine_options(async_driver=True)
+        )
+    else:
+        _async_engine = create_async_engine(_async_url(database_url))
+    if _async_engine.dialect.name == "sqlite":
+        install_pragmas(_async_engine.sync_engine, sqlite_tuning or SQLiteTuning.from_env())
+    _AsyncSessionLocal = async_sessionmaker(_async_engine, autoflush=False, expire_on_commit=False)
+
+
+async def dispose_async_db() -> None:
+    """
+    Close the async engine and leave async mode.
+    """
+    global _async_engine, _AsyncSessionLocal
+    if _async_engine is not None:
+        await _async_engine.dispose()
+    _async_engine = None
+    _AsyncSessionLocal = None
+
+
+def async_enabled() -> bool:
+    """Whether the async engine has been initialized"""
+    return _AsyncSessionLocal is not None
+
+
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    """
+    Get async database session.
+    
+    Yields:
+        AsyncSession that auto-closes after use.
+    """
+    if _AsyncSessionLocal is None:
+        init_async_db()
+    
+    async with _AsyncSessionLocal() as db:
+        yield db
+
+
+async def run_in_session(db: Union[Session, AsyncSession], fn: Callable[[Session], T]) -> T:
+    """
+    Run synchronous ORM code without blocking the event loop.
+    
+    With an AsyncSession the function runs through `run_sync`, so every query
+    awaits the async driver. With a plain Session it runs in a worker thread.
+    
+    Args:
+        db: Sync or async database session
+        fn: Function receiving a sync Session
+        
+    Returns:
+        Whatever fn returns
+    """
+    if isinstance(db, AsyncSession):
+        return await db.run_sync(fn)
+    return await asyncio.to_thread(fn, db)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -77,5 +190,7 @@ def clear_db() -> None:
     """
     global _engine
     if _engine is not None:
+        # Open sessions keep locks that would block DROP TABLE on PostgreSQL
+        close_all_sessions()
         Base.metadata.drop_all(bind=_engine)
         Base.metadata.create_all(bind=_engine)
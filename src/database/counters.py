@@ -0,0 +1,94 @@
+"""
+Denormalized per-project phase counters.
+
+Project rows carry phase counts and the current phase number so status reads
+never aggregate phases. Writers refresh them with `refresh_counters` in the
+same transaction that changes a phase.
+
+Every refresh also bumps Project.version (and, through onupdate,
+updated_at), which is what conditional GETs compare.
+
+Both statements use synchronize_session="fetch": on sessions, the matched
+projects come back through RETURNING and their loaded counters are expired,
+so long-lived sessions never read stale values.
+"""
+from typing import Collection, Optional
+
+from sqlalchemy import select, func, update, or_
+from sqlalchemy.sql.dml import Update
+
+from .models import Project, Phase
+
+
+def _phase_count(*conditions):
+    """Correlated COUNT(*) of the project's phases matching conditions"""
+    return (
+        select(func.count())
+        .where(Phase.project_id == Project.id, *conditions)
+        .scalar_subquery()
+    )
+
+
+def _computed_counters() -> dict:
+    """Counter values computed from the phases table"""
+    return {
+        "phases_total": _phase_count(),
+        "phases_completed": _phase_count(Phase.status == "completed"),
+        "phases_in_progress": _phase_count(Phase.status == "in_progress"),
+        "phases_planned": _phase_count(Phase.status == "planned"),
+        "current_phase_number": (
+            select(func.min(Phase.phase_number))
+            .where(Phase.project_id == Project.id, Phase.status != "completed")
+            .scalar_subquery()
+        ),
+    }
+
+
+def refresh_counters(
+    project_id: Optional[str] = None,
+    project_ids: Optional[Collection[str]] = None
+) -> Update:
+    """
+    Build an UPDATE that recomputes counters from phases.
+
+    Args:
+        project_id: Project to refresh
+        project_ids: Projects to refresh (e.g. after a bulk import)
+
+    With neither argument every project is refreshed.
+
+    Returns:
+        UPDATE statement to execute on a session or connection
+    """
+    stmt = (
+        update(Project)
+        .values(**_computed_counters(), version=Project.version + 1)
+        .execution_options(synchronize_session="fetch")
+    )
+    if project_id is not None:
+        stmt = stmt.where(Project.id == project_id)
+    if project_ids is not None:
+        stmt = stmt.where(Project.id.in_(project_ids))
+    return stmt
+
+
+def repair_counters() -> Update:
+    """
+    Build an UPDATE that fixes only projects whose counters drifted.
+
+    The statement's rowcount is the number of repaired projects.
+
+    Returns:
+        UPDATE statement to execute on a session or connection
+    """
+    computed = _computed_counters()
+    drifted = or_(*(
+        getattr(Project, name).is_distinct_from(value)
+        for name, value in computed.items()
+    ))
+    return (
+        update(Project)
+        .where(drifted)
+        .values(**computed, version=Project.version + 1)
+        .execution_options(synchronize_session="fetch")
+    )
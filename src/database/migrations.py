@@ -0,0 +1,175 @@
+"""
+Lightweight schema migrations for MCP-AIDev
+
+`Base.metadata.create_all` only creates missing tables, so databases created
+by older versions never receive new indexes or columns. Each migration here
+is idempotent and runs on every `init_db`.
+"""
+from typing import List
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+from sqlalchemy.schema import CreateColumn
+
+from .counters import refresh_counters
+from .models import Project, Phase
+from .search import SEARCH_TABLE, create_search_index, rebuild_search_index
+
+
+PHASE_INDEX_NAME = "ix_phases_project_phase"
+
+COUNTER_COLUMNS = frozenset({
+    "phases_total", "phases_completed", "phases_in_progress",
+    "phases_planned", "current_phase_number",
+})
+
+
+def _drop_duplicate_phases(engine: Engine) -> int:
+    """
+    Remove duplicate (project_id, phase_number) rows, keeping the newest one.
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        Number of rows deleted
+    """
+    with engine.begin() as conn:
+        result = conn.execute(text(
+            """
+            DELETE FROM phases
+            WHERE EXISTS (
+                SELECT 1 FROM phases AS newer
+                WHERE newer.project_id = phases.project_id
+                  AND newer.phase_number = phases.phase_number
+                  AND (
+                      newer.updated_at > phases.updated_at
+                      OR (newer.updated_at = phases.updated_at AND newer.id > phases.id)
+                  )
+            )
+            """
+        ))
+        return result.rowcount or 0
+
+
+def _ensure_phase_index(engine: Engine) -> List[str]:
+    """
+    Create the unique (project_id, phase_number) index on existing databases.
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        List of applied migration steps
+    """
+    indexes = {ix["name"] for ix in inspect(engine).get_indexes("phases")}
+    if PHASE_INDEX_NAME in indexes:
+        return []
+
+    applied = []
+    removed = _drop_duplicate_phases(engine)
+    if removed:
+        applied.append(f"removed {removed} duplicate phase rows")
+
+    index = next(ix for ix in Phase.__table__.indexes if ix.name == PHASE_INDEX_NAME)
+    index.create(bind=engine, checkfirst=True)
+    applied.append(f"created index {PHASE_INDEX_NAME}")
+    return applied
+
+
+def _add_missing_columns(engine: Engine, table) -> List[str]:
+    """
+    Add columns declared on a model but missing from the database table.
+
+    Args:
+        engine: SQLAlchemy engine
+        table: Table object of the model
+
+    Returns:
+        Names of the columns added
+    """
+    existing = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    added = []
+    with engine.begin() as conn:
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            ddl = CreateColumn(column).compile(dialect=engine.dialect)
+            conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {ddl}"))
+            added.append(column.name)
+    return added
+
+
+def _ensure_project_columns(engine: Engine) -> List[str]:
+    """
+    Add new projects columns and fill the denormalized counters from phases.
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        List of applied migration steps
+    """
+    added = _add_missing_columns(engine, Project.__table__)
+    if not added:
+        return []
+
+    applied = [f"added projects columns {', '.join(added)}"]
+    if COUNTER_COLUMNS.intersection(added):
+        with engine.begin() as conn:
+            conn.execute(refresh_counters())
+        applied.append("computed project counters")
+    return applied
+
+
+def _ensure_phase_columns(engine: Engine) -> List[str]:
+    """
+    Add new phases columns (existing rows get their server defaults).
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        List of applied migration steps
+    """
+    added = _add_missing_columns(engine, Phase.__table__)
+    return [f"added phases columns {', '.join(added)}"] if added else []
+
+
+def _ensure_search_index(engine: Engine) -> List[str]:
+    """
+    Create and fill the full-text search index on existing databases.
+
+    Args:
+        engine: SQLAlchemy engine
+
+    Returns:
+        List of applied migration steps
+    """
+    if inspect(engine).has_table(SEARCH_TABLE):
+        return []
+
+    with Session(engine) as session:
+        create_search_index(session)
+        indexed = rebuild_search_index(session)
+        session.commit()
+    return [f"created search index ({indexed} phases)"]
+
+
+def run_migrations(engine: Engine) -> List[str]:
+    """
+    Bring an existing database schema up to date.
+
+    Args:
+        engine: SQLAlchemy engine with tables already created
+
+    Returns:
+        List of human-readable descriptions of the steps applied
+    """
+    applied = []
+    applied.extend(_ensure_phase_index(engine))
+    applied.extend(_ensure_project_columns(engine))
+    applied.extend(_ensure_phase_columns(engine))
+    applied.extend(_ensure_search_index(engine))
+    return applied
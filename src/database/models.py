@@ -2,19 +2,57 @@
 SQLAlchemy models for MCP-AIDev
 """
 
-from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, JSON
-from sqlalchemy.orm import relationship, declarative_base
+from datetime import datetime, timezone
+from sqlalchemy import Column, String, Integer, Text, DateTime, ForeignKey, JSON, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import relationship, declarative_base, deferred
 from sqlalchemy.sql import func
+from sqlalchemy.types import TypeDecorator
 import uuid
 
+from .compression import CompressedJSON
+
 Base = declarative_base()
 
+# Deferred group of the large JSON columns; load it with undefer_group(PAYLOAD)
+PAYLOAD = "payload"
+
+# JSON everywhere, stored as binary JSONB on PostgreSQL
+JSONType = JSON().with_variant(JSONB(), "postgresql")
+
 
 def generate_uuid() -> str:
     """Generate a UUID string for primary keys"""
     return str(uuid.uuid4())
 
 
+def utcnow() -> datetime:
+    """Current time in UTC, used for client-side timestamps"""
+    return datetime.now(timezone.utc)
+
+
+class UTCDateTime(TypeDecorator):
+    """
+    Timezone-aware UTC datetime on every backend.
+    
+    SQLite has no timezone support: values are stored as naive UTC and read
+    back with tzinfo=UTC, so timestamps set in Python and timestamps loaded
+    from the database serialize the same way.
+    """
+    impl = DateTime(timezone=True)
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        if value is not None and value.tzinfo is not None and dialect.name == "sqlite":
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return value
+    
+    def process_result_value(self, value, dialect):
+        if value is not None and value.tzinfo is None:
+            value = value.replace(tzinfo=timezone.utc)
+        return value
+
+
 class Project(Base):
     """
     Project model - represents a development project being orchestrated.
@@ -25,9 +63,19 @@ class Project(Base):
     name = Column(String(255), nullable=False)
     description = Column(Text, nullable=True)
     status = Column(String(50), default="active")
-    preferences = Column(JSON, nullable=True)  # PRP: Project preferences and requirements
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    preferences = Column(JSONType, nullable=True)  # PRP: Project preferences and requirements
+    
+    # Denormalized phase statistics, refreshed on every phase write
+    phases_total = Column(Integer, nullable=False, default=0, server_default="0")
+    phases_completed = Column(Integer, nullable=False, default=0, server_default="0")
+    phases_in_progress = Column(Integer, nullable=False, default=0, server_default="0")
+    phases_planned = Column(Integer, nullable=False, default=0, server_default="0")
+    current_phase_number = Column(Integer, nullable=True)  # First non-completed phase
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Bumped on every phase write; part of the ETag
+    
+    # Set in Python so writes need no read-back; server defaults cover raw SQL
+    created_at = Column(UTCDateTime, default=utcnow, server_default=func.now())
+    updated_at = Column(UTCDateTime, default=utcnow, server_default=func.now(), onupdate=utcnow)
     
     # Relationship to phases
     phases = relationship("Phase", back_populates="project", cascade="all, delete-orphan")
@@ -41,16 +89,26 @@ class Phase(Base):
     Phase model - represents a development phase within a project.
     """
     __tablename__ = "phases"
+    __table_args__ = (
+        # Every phase lookup filters by (project_id, phase_number); the unique
+        # index serves those queries and prevents duplicate phase numbers.
+        Index("ix_phases_project_phase", "project_id", "phase_number", unique=True),
+    )
     
     id = Column(String(36), primary_key=True, default=generate_uuid)
     project_id = Column(String(36), ForeignKey("projects.id"), nullable=False)
     phase_number = Column(Integer, nullable=False)
     title = Column(String(255), nullable=False)
-    specs = Column(JSON, nullable=False)  # Specifications for this phase
+    # specs and progress_data can be tens of KB each; they are only loaded
+    # by queries that return them (undefer_group(PAYLOAD)) and large values
+    # are stored compressed on SQLite (see database.compression)
+    specs = deferred(Column(CompressedJSON, nullable=False), group=PAYLOAD)  # Specifications for this phase
     status = Column(String(50), default="planned")  # planned, in_progress, completed
-    progress_data = Column(JSON, nullable=True)  # Progress info from implementation
-    created_at = Column(DateTime(timezone=True), server_default=func.now())
-    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    progress_data = deferred(Column(CompressedJSON, nullable=True), group=PAYLOAD)  # Progress info from implementation
+    version = Column(Integer, nullable=False, default=1, server_default="1")  # Bumped on every write; checked by expected_version
+    # Set in Python so writes need no read-back; server defaults cover raw SQL
+    created_at = Column(UTCDateTime, default=utcnow, server_default=func.now())
+    updated_at = Column(UTCDateTime, default=utcnow, server_default=func.now(), onupdate=utcnow)
     
     # Relationship to project
     project = relationship("Project", back_populates="phases")
@@ -0,0 +1,76 @@
+"""
+PostgreSQL settings for MCP-AIDev
+
+Connection pooling and per-statement timeout for running several server
+replicas against one PostgreSQL database.
+"""
+import os
+from dataclasses import dataclass
+from typing import Any, Dict
+
+
+@dataclass
+class PostgresSettings:
+    """Pool and session settings for PostgreSQL engines"""
+
+    pool_size: int = 5
+    max_overflow: int = 10
+    pool_pre_ping: bool = True
+    pool_recycle: int = 1800  # seconds
+    statement_timeout_ms: int = 30000
+
+    @classmethod
+    def from_env(cls) -> "PostgresSettings":
+        """Build settings from DB_* environment variables"""
+        defaults = cls()
+        return cls(
+            pool_size=int(os.getenv("DB_POOL_SIZE", defaults.pool_size)),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", defaults.max_overflow)),
+            pool_pre_ping=os.getenv("DB_POOL_PRE_PING", str(defaults.pool_pre_ping)).lower() in ("1", "true", "yes"),
+            pool_recycle=int(os.getenv("DB_POOL_RECYCLE", defaults.pool_recycle)),
+            statement_timeout_ms=int(os.getenv("DB_STATEMENT_TIMEOUT_MS", defaults.statement_timeout_ms)),
+        )
+
+    def engine_options(self, async_driver: bool = False) -> Dict[str, Any]:
+        """
+        Keyword arguments for create_engine / create_async_engine.
+
+        Args:
+            async_driver: True for asyncpg, False for psycopg2
+
+        Returns:
+            Engine keyword arguments
+        """
+        timeout = str(int(self.statement_timeout_ms))
+        if async_driver:
+            connect_args = {"server_settings": {"statement_timeout": timeout}}
+        else:
+            connect_args = {"options": f"-c statement_timeout={timeout}"}
+
+        return {
+            "pool_size": self.pool_size,
+            "max_overflow": self.max_overflow,
+            "pool_pre_ping": self.pool_pre_ping,
+            "pool_recycle": self.pool_recycle,
+            "connect_args": connect_args,
+        }
+
+
+def normalize_url(database_url: str) -> str:
+    """
+    Accept the postgres:// scheme used by Render and Heroku.
+
+    Args:
+        database_url: Database URL from configuration
+
+    Returns:
+        URL SQLAlchemy understands
+    """
+    if database_url.startswith("postgres://"):
+        return database_url.replace("postgres://", "postgresql://", 1)
+    return database_url
+
+
+def is_postgres_url(database_url: str) -> bool:
+    """Whether a URL points to PostgreSQL"""
+    return database_url.startswith("postgresql")
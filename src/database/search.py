@@ -0,0 +1,266 @@
+"""
+Full-text search index over phases for MCP-AIDev
+
+Each phase is indexed with four weighted fields: its title, the
+`instructions` and `files_to_create` of its specs, and the name and
+description of its project. SQLite uses an FTS5 table whose rowid is the
+phase's rowid; PostgreSQL uses a table of weighted tsvectors with a GIN
+index.
+
+Specs may be stored compressed (see compression.py), so the database cannot
+extract the fields itself: ProjectService writes the documents of the
+phases it saves with write_documents, in the same transaction, from the
+values it already holds. Text is normalized in Python
+(lowercase, accents and punctuation removed) so both databases tokenize
+documents and queries the same way.
+"""
+import re
+import unicodedata
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import DDL, event, select, text
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from .models import Project, Phase
+from .upsert import UPSERT_CHUNK_SIZE
+
+
+SEARCH_TABLE = "phase_search"
+
+# BM25 weights of title, instructions, files and project (SQLite)
+COLUMN_WEIGHTS = (10.0, 4.0, 2.0, 1.0)
+
+_CREATE = {
+    "sqlite": [
+        f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} "
+        "USING fts5(title, instructions, files, project)",
+    ],
+    "postgresql": [
+        f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} ("
+        "phase_id VARCHAR(36) PRIMARY KEY REFERENCES phases (id) ON DELETE CASCADE, "
+        "document TSVECTOR NOT NULL)",
+        f"CREATE INDEX IF NOT EXISTS ix_{SEARCH_TABLE}_document ON {SEARCH_TABLE} USING GIN (document)",
+    ],
+}
+
+# The index lives and dies with the phases table (create_all / drop_all)
+for _dialect, _statements in _CREATE.items():
+    for _statement in _statements:
+        event.listen(Phase.__table__, "after_create", DDL(_statement).execute_if(dialect=_dialect))
+event.listen(Phase.__table__, "before_drop", DDL(f"DROP TABLE IF EXISTS {SEARCH_TABLE}"))
+
+# Insert or replace the entry of one phase
+_WRITE = {
+    "sqlite": (
+        f"INSERT OR REPLACE INTO {SEARCH_TABLE} (rowid, title, instructions, files, project) "
+        "SELECT rowid, :title, :instructions, :files, :project FROM phases WHERE id = :phase_id"
+    ),
+    "postgresql": (
+        f"INSERT INTO {SEARCH_TABLE} (phase_id, document) VALUES (:phase_id, "
+        "setweight(to_tsvector('simple', :title), 'A') || "
+        "setweight(to_tsvector('simple', :instructions), 'B') || "
+        "setweight(to_tsvector('simple', :files), 'C') || "
+        "setweight(to_tsvector('simple', :project), 'D')) "
+        "ON CONFLICT (phase_id) DO UPDATE SET document = EXCLUDED.document"
+    ),
+}
+
+# Ranking expression (lower is better) and FROM/WHERE clause per dialect
+_SORT_KEY = {
+    "sqlite": f"bm25({SEARCH_TABLE}, {', '.join(map(str, COLUMN_WEIGHTS))})",
+    "postgresql": f"-CAST(ts_rank({SEARCH_TABLE}.document, query) AS FLOAT8)",
+}
+_MATCH = {
+    "sqlite": (
+        f"FROM {SEARCH_TABLE} JOIN phases ON phases.rowid = {SEARCH_TABLE}.rowid "
+        f"JOIN projects ON projects.id = phases.project_id "
+        f"WHERE {SEARCH_TABLE} MATCH :query"
+    ),
+    "postgresql": (
+        f"FROM {SEARCH_TABLE} JOIN phases ON phases.id = {SEARCH_TABLE}.phase_id "
+        f"JOIN projects ON projects.id = phases.project_id, to_tsquery('simple', :query) AS query "
+        f"WHERE {SEARCH_TABLE}.document @@ query"
+    ),
+}
+
+
+def normalize_words(value: Any) -> List[str]:
+    """
+    Split text into lowercase words without accents or punctuation.
+
+    "src/auth_login.py" becomes ["src", "auth", "login", "py"] and "Migração"
+    becomes ["migracao"].
+
+    Args:
+        value: Text to split; anything else yields no words
+
+    Returns:
+        List of words
+    """
+    if not isinstance(value, str):
+        return []
+    decomposed = unicodedata.normalize("NFKD", value.lower())
+    stripped = "".join(char for char in decomposed if not unicodedata.combining(char))
+    return re.findall(r"[^\W_]+", stripped)
+
+
+def phase_document(title: str, specs: Any, project_name: str, description: Optional[str]) -> Dict[str, str]:
+    """
+    Build the indexed fields of a phase.
+
+    Args:
+        title: Phase title
+        specs: Phase specs; only instructions and files_to_create are used
+        project_name: Project name
+        description: Project description
+
+    Returns:
+        Dictionary with title, instructions, files and project text
+    """
+    specs = specs if isinstance(specs, dict) else {}
+    files = specs.get("files_to_create")
+    files = files if isinstance(files, list) else []
+    return {
+        "title": " ".join(normalize_words(title)),
+        "instructions": " ".join(normalize_words(specs.get("instructions"))),
+        "files": " ".join(word for path in files for word in normalize_words(path)),
+        "project": " ".join(normalize_words(project_name) + normalize_words(description)),
+    }
+
+
+def create_search_index(session: Session) -> None:
+    """Create the index table of the session's dialect if it is missing"""
+    for statement in _CREATE[session.get_bind().dialect.name]:
+        session.execute(text(statement))
+
+
+def write_documents(session: Session, documents: List[Dict[str, Any]]) -> None:
+    """
+    Insert or replace index entries with one executemany (not committed).
+
+    Args:
+        session: Database session
+        documents: phase_document() fields plus the "phase_id" of each phase
+    """
+    if documents:
+        session.execute(text(_WRITE[session.get_bind().dialect.name]), documents)
+
+
+def _chunks(values: List[str]) -> Iterable[List[str]]:
+    """Split values for IN (...) lists"""
+    for start in range(0, len(values), UPSERT_CHUNK_SIZE):
+        yield values[start:start + UPSERT_CHUNK_SIZE]
+
+
+def index_phases(
+    session: Session,
+    phase_ids: Optional[Iterable[str]] = None,
+    project_ids: Optional[Iterable[str]] = None
+) -> int:
+    """
+    (Re)index phases, reading their current values from the database.
+
+    Used when the written values are not at hand, e.g. after a bulk import
+    that may also have changed project descriptions. Nothing is committed.
+
+    Args:
+        session: Database session
+        phase_ids: Phases to index
+        project_ids: Projects whose phases are indexed (e.g. after a bulk
+            import or a description change)
+
+    Returns:
+        Number of phases indexed
+    """
+    stmt = select(
+        Phase.id, Phase.title, Phase.specs, Project.name, Project.description
+    ).join(Project, Project.id == Phase.project_id)
+
+    filters = []
+    if phase_ids is not None:
+        filters.extend(Phase.id.in_(chunk) for chunk in _chunks(list(phase_ids)))
+    if project_ids is not None:
+        filters.extend(Phase.project_id.in_(chunk) for chunk in _chunks(list(project_ids)))
+
+    indexed = 0
+    for where in filters:
+        documents = [
+            {"phase_id": row.id, **phase_document(row.title, row.specs, row.name, row.description)}
+            for row in session.execute(stmt.where(where))
+        ]
+        write_documents(session, documents)
+        indexed += len(documents)
+    return indexed
+
+
+def rebuild_search_index(session: Session) -> int:
+    """
+    Empty the index and index every phase again (not committed).
+
+    Needed after anything that bypasses ProjectService, and on SQLite after
+    VACUUM, which may renumber the phases rowids the index refers to.
+
+    Args:
+        session: Database session
+
+    Returns:
+        Number of phases indexed
+    """
+    session.execute(text(f"DELETE FROM {SEARCH_TABLE}"))
+    phase_ids = session.scalars(select(Phase.id)).all()
+    return index_phases(session, phase_ids=phase_ids)
+
+
+def match_phases(
+    session: Session,
+    query: str,
+    project_id: Optional[str] = None,
+    limit: int = 20,
+    after: Optional[Tuple[float, str]] = None
+) -> List[Row]:
+    """
+    Find phases matching every word of a query, best matches first.
+
+    Words match as prefixes: "auth" finds "authentication".
+
+    Args:
+        session: Database session
+        query: Free text
+        project_id: Only search this project's phases
+        limit: Maximum rows
+        after: (sort_key, phase_id) of the last row of the previous page
+
+    Returns:
+        Rows with phase_id, project_id, project_name, phase_number, title,
+        status, version and sort_key (lower is better)
+
+    Raises:
+        ValueError: If the query has no words
+    """
+    words = normalize_words(query)
+    if not words:
+        raise ValueError("Search query has no words")
+
+    dialect = session.get_bind().dialect.name
+    if dialect == "sqlite":
+        match = " ".join(f'"{word}"*' for word in words)
+    else:
+        match = " & ".join(f"{word}:*" for word in words)
+    sort_key = _SORT_KEY[dialect]
+    params = {"query": match, "limit": limit}
+
+    sql = (
+        "SELECT phases.id AS phase_id, phases.project_id, projects.name AS project_name, "
+        "phases.phase_number, phases.title, phases.status, phases.version, "
+        f"{sort_key} AS sort_key {_MATCH[dialect]}"
+    )
+    if project_id is not None:
+        sql += " AND phases.project_id = :project_id"
+        params["project_id"] = project_id
+    if after is not None:
+        sql += f" AND ({sort_key} > :after_key OR ({sort_key} = :after_key AND phases.id > :after_id))"
+        params["after_key"], params["after_id"] = after
+    sql += " ORDER BY sort_key, phases.id LIMIT :limit"
+
+    return session.execute(text(sql), params).all()
@@ -0,0 +1,154 @@
+"""
+SQLite tuning for MCP-AIDev
+
+Applies a PRAGMA profile to every pooled SQLite connection and provides a
+retry helper for writes that still hit lock contention.
+"""
+import asyncio
+import functools
+import os
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, List, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import MissingGreenlet, OperationalError
+from sqlalchemy.util import await_only
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+@dataclass
+class SQLiteTuning:
+    """PRAGMA settings applied to each SQLite connection"""
+
+    # "performance" applies the settings below, "default" leaves SQLite alone
+    profile: str = "performance"
+    journal_mode: str = "WAL"
+    synchronous: str = "NORMAL"
+    busy_timeout_ms: int = 5000
+    mmap_size: int = 256 * 1024 * 1024
+    cache_size_kib: int = 64 * 1024
+    temp_store: str = "MEMORY"
+
+    @classmethod
+    def from_env(cls) -> "SQLiteTuning":
+        """Build settings from SQLITE_* environment variables"""
+        defaults = cls()
+        return cls(
+            profile=os.getenv("SQLITE_PROFILE", defaults.profile).lower(),
+            journal_mode=os.getenv("SQLITE_JOURNAL_MODE", defaults.journal_mode),
+            synchronous=os.getenv("SQLITE_SYNCHRONOUS", defaults.synchronous),
+            busy_timeout_ms=int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", defaults.busy_timeout_ms)),
+            mmap_size=int(os.getenv("SQLITE_MMAP_SIZE", defaults.mmap_size)),
+            cache_size_kib=int(os.getenv("SQLITE_CACHE_SIZE_KIB", defaults.cache_size_kib)),
+            temp_store=os.getenv("SQLITE_TEMP_STORE", defaults.temp_store),
+        )
+
+    def pragmas(self) -> List[str]:
+        """PRAGMA statements for this profile"""
+        if self.profile != "performance":
+            return []
+        return [
+            f"PRAGMA journal_mode={self.journal_mode}",
+            f"PRAGMA synchronous={self.synchronous}",
+            f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}",
+            f"PRAGMA mmap_size={int(self.mmap_size)}",
+            # Negative cache_size is expressed in KiB rather than pages
+            f"PRAGMA cache_size=-{int(self.cache_size_kib)}",
+            f"PRAGMA temp_store={self.temp_store}",
+        ]
+
+
+def install_pragmas(engine: Engine, tuning: SQLiteTuning) -> None:
+    """
+    Apply the tuning profile to every new connection of an engine.
+
+    Args:
+        engine: Sync engine (use `async_engine.sync_engine` for async engines)
+        tuning: Settings to apply
+    """
+    statements = tuning.pragmas()
+    if not statements:
+        return
+
+    @event.listens_for(engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        try:
+            for statement in statements:
+                cursor.execute(statement)
+        finally:
+            cursor.close()
+
+
+def is_lock_error(error: Exception) -> bool:
+    """Whether an exception is SQLite lock contention"""
+    message = str(getattr(error, "orig", error)).lower()
+    return "database is locked" in message or "database is busy" in message
+
+
+def _backoff(delay: float) -> bool:
+    """
+    Wait before a retry without blocking an event loop.
+
+    Under AsyncSession.run_sync the method runs in a greenlet on the event
+    loop's thread, where time.sleep would stall every other request; the
+    wait is handed back to the loop with await_only instead.
+
+    Returns:
+        False if the wait is impossible (sync code called straight from a
+        coroutine), in which case the caller should not retry
+    """
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        time.sleep(delay)  # Worker thread or plain sync code
+        return True
+    try:
+        await_only(asyncio.sleep(delay))
+    except MissingGreenlet:
+        return False
+    return True
+
+
+def retry_on_lock(attempts: int = 5, base_delay: float = 0.05) -> Callable[[F], F]:
+    """
+    Retry a service method when SQLite reports lock contention.
+
+    busy_timeout already waits for the lock; this covers what it cannot,
+    such as a WAL read transaction that can no longer be upgraded to a write.
+    The session is rolled back and the whole method runs again with jittered
+    exponential backoff; in async mode the backoff awaits the event loop
+    instead of sleeping on it. Objects whose `in_transaction` attribute is
+    true are not retried, since a rollback would discard earlier work in the
+    same transaction; the error propagates to whoever owns it.
+
+    Args:
+        attempts: Total number of tries
+        base_delay: Delay before the first retry, in seconds
+
+    Returns:
+        Decorator for methods of objects with a `db` session attribute
+    """
+    def decorator(method: F) -> F:
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            for attempt in range(attempts):
+                try:
+                    return method(self, *args, **kwargs)
+                except OperationalError as e:
+                    if (
+                        not is_lock_error(e)
+                        or attempt == attempts - 1
+                        or getattr(self, "in_transaction", False)
+                    ):
+                        raise
+                    self.db.rollback()
+                    if not _backoff(base_delay * (2 ** attempt) * (0.5 + random.random())):
+                        raise
+        return wrapper
+    return decorator
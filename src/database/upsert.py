@@ -0,0 +1,139 @@
+"""
+Native INSERT ... ON CONFLICT DO UPDATE statements for MCP-AIDev
+
+SQLite and PostgreSQL share the ON CONFLICT syntax; each dialect exposes it
+through its own `insert` construct.
+"""
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.sql.dml import Insert
+
+from .models import Project, Phase, generate_uuid, utcnow
+
+
+# Rows per statement, well under SQLite's 32766 bound-parameter limit
+UPSERT_CHUNK_SIZE = 500
+
+
+def _dialect_insert(dialect_name: str):
+    """The dialect's insert construct, which supports ON CONFLICT"""
+    return postgresql.insert if dialect_name == "postgresql" else sqlite.insert
+
+
+def _greatest(dialect_name: str, *values):
+    """GREATEST() on PostgreSQL, the multi-argument max() on SQLite"""
+    return (func.greatest if dialect_name == "postgresql" else func.max)(*values)
+
+
+def upsert_phases(
+    dialect_name: str,
+    project_id: str,
+    phases: List[Dict[str, Any]],
+    expected_version: Optional[int] = None
+) -> Insert:
+    """
+    Build one INSERT that creates or updates phases by phase number.
+
+    New phases start as "planned" at version 1; existing ones keep their
+    status and progress data and only get a new title, specs, updated_at
+    and the next version.
+
+    Args:
+        dialect_name: "sqlite" or "postgresql"
+        project_id: UUID of the project
+        phases: Dictionaries with phase_number, title and specs
+        expected_version: Only update existing phases at this version;
+            others are left alone and not returned
+
+    Returns:
+        INSERT statement returning the upserted Phase objects; execute it
+        with populate_existing so phases already in the session are updated
+    """
+    insert = _dialect_insert(dialect_name)
+    now = utcnow()
+    stmt = insert(Phase).values([
+        {
+            "id": generate_uuid(),
+            "project_id": project_id,
+            "phase_number": phase["phase_number"],
+            "title": phase["title"],
+            "specs": phase["specs"],
+            "status": "planned",
+            "version": 1,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for phase in phases
+    ])
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[Phase.project_id, Phase.phase_number],
+        set_={
+            "title": stmt.excluded.title,
+            "specs": stmt.excluded.specs,
+            "updated_at": stmt.excluded.updated_at,
+            "version": Phase.version + 1,
+        },
+        where=None if expected_version is None else Phase.version == expected_version,
+    )
+    return stmt.returning(Phase)
+
+
+def import_projects(dialect_name: str, upsert: bool = False) -> Insert:
+    """
+    Build an INSERT of project rows, to run with a list of parameter sets.
+
+    Rows carry their exported version. An existing project moves to that
+    version or one past its own, whichever is greater, so versions never go
+    back and an old ETag cannot match again.
+
+    Args:
+        dialect_name: "sqlite" or "postgresql"
+        upsert: Update projects whose id already exists instead of failing
+
+    Returns:
+        INSERT statement for executemany
+    """
+    stmt = _dialect_insert(dialect_name)(Project)
+    if upsert:
+        set_ = {
+            name: getattr(stmt.excluded, name)
+            for name in ("name", "description", "status", "preferences", "updated_at")
+        }
+        set_["version"] = _greatest(dialect_name, Project.version + 1, stmt.excluded.version)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Project.id],
+            set_=set_,
+        )
+    return stmt
+
+
+def import_phases(dialect_name: str, upsert: bool = False) -> Insert:
+    """
+    Build an INSERT of phase rows, to run with a list of parameter sets.
+
+    Unlike upsert_phases, an imported phase replaces status and progress
+    data too: the import is the source of truth. Versions are restored as
+    in import_projects.
+
+    Args:
+        dialect_name: "sqlite" or "postgresql"
+        upsert: Update phases whose (project_id, phase_number) already exists
+            instead of failing
+
+    Returns:
+        INSERT statement for executemany
+    """
+    stmt = _dialect_insert(dialect_name)(Phase)
+    if upsert:
+        set_ = {
+            name: getattr(stmt.excluded, name)
+            for name in ("title", "specs", "status", "progress_data", "updated_at")
+        }
+        set_["version"] = _greatest(dialect_name, Phase.version + 1, stmt.excluded.version)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[Phase.project_id, Phase.phase_number],
+            set_=set_,
+        )
+    return stmt
@@ -3,32 +3,75 @@ MCP-AIDev Server
 
 FastAPI application exposing MCP protocol via HTTP
 """
+import asyncio
 import os
-from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Depends
+from contextlib import asynccontextmanager, nullcontext
+from itertools import chain
+import httpx
+from fastapi import FastAPI, HTTPException, Depends, Header, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
-from typing import Dict, Any, Optional
+from fastapi.responses import JSONResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from typing import Dict, Any, List, Optional, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 
-from database.connection import init_db, get_db
-from database.models import Project, Phase
-from mcp.protocol import MCPProtocol
+from database.connection import (
+    init_db, get_db, init_async_db, get_async_db, dispose_async_db,
+    async_enabled, async_mode_requested, run_in_session,
+)
+from mcp.encoding import dumps, dumps_batch_result, dumps_tool_result
+from mcp.protocol import AsyncMCPProtocol, MAX_BATCH_CALLS
 from mcp.tools import MCPTools
+from services.async_project_service import AsyncProjectService
+from services.cache import read_cache
+from services.etag import etag_matches
+from services.events import MEDIA_TYPE as SSE_MEDIA_TYPE, event_broker, sse_stream
+from services.ndjson import MEDIA_TYPE as NDJSON_MEDIA_TYPE, NDJSONImporter, export_header, iter_ndjson
+from services.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 from services.project_service import ProjectService
+from services.response_compression import CompressionMiddleware
+from services.writer import (
+    WRITE_TOOLS, WriteQueue, WriterClient, follow_writer_events, write_queue_requested,
+)
+
+
+# Single-writer mode (see services.writer), set up by lifespan: workers get
+# a writer_client from WRITER_URL, the writer process a write_queue
+writer_client: Optional[WriterClient] = None
+write_queue: Optional[WriteQueue] = None
 
 
 # Lifespan handler for startup/shutdown
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handle application startup and shutdown"""
+    global writer_client, write_queue
     # Startup: Initialize database
     db_url = os.getenv("DATABASE_URL", "sqlite:///./data/mcp_aidev.db")
     init_db(db_url)
-    print(f"✅ Database initialized: {db_url}")
+    if async_mode_requested():
+        init_async_db(db_url)
+    print(f"✅ Database initialized: {db_url}{' (async)' if async_enabled() else ''}")
+    
+    background = None
+    if os.getenv("WRITER_URL"):
+        writer_client = WriterClient(os.environ["WRITER_URL"])
+        background = asyncio.create_task(follow_writer_events(writer_client))
+        print(f"✍️  Writes forwarded to {writer_client.base_url}")
+    elif write_queue_requested():
+        write_queue = WriteQueue.from_env()
+        background = asyncio.create_task(write_queue.run())
+        print("✍️  Writes serialized through the write queue")
     yield
     # Shutdown: cleanup if needed
+    if background is not None:
+        background.cancel()
+    if writer_client is not None:
+        await writer_client.close()
+    writer_client, write_queue = None, None
+    await dispose_async_db()
     print("👋 Server shutting down")
 
 
@@ -53,10 +96,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip/br for bodies of COMPRESSION_MIN_SIZE bytes (default 1024) or more
+app.add_middleware(CompressionMiddleware, **CompressionMiddleware.options_from_env())
+
 
 # Dependency to get database session
-def get_database():
-    """Database session dependency"""
+async def get_database():
+    """Database session dependency (AsyncSession when async mode is enabled)"""
+    if async_enabled():
+        async for db in get_async_db():
+            yield db
+        return
+    
     db = next(get_db())
     try:
         yield db
@@ -64,6 +115,9 @@ def get_database():
         db.close()
 
 
+DatabaseSession = Union[AsyncSession, Session]
+
+
 # Pydantic models for request/response
 class ExecuteToolRequest(BaseModel):
     """Request body for tool execution"""
@@ -76,6 +130,24 @@ class ExecuteToolResponse(BaseModel):
     success: bool
     data: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    error_path: Optional[List[Union[str, int]]] = None  # Location of an invalid argument
+
+
+class ExecuteBatchRequest(BaseModel):
+    """Request body for batch tool execution"""
+    calls: List[ExecuteToolRequest] = Field(..., min_length=1, max_length=MAX_BATCH_CALLS)
+    transactional: bool = False
+
+
+class ExecuteBatchResponse(BaseModel):
+    """Response from batch tool execution, one result per call"""
+    success: bool
+    results: List[ExecuteToolResponse]
+
+
+class EncodedJSONResponse(Response):
+    """JSON response whose body was already encoded (see mcp.encoding)"""
+    media_type = "application/json"
 
 
 # Health check endpoints
@@ -91,11 +163,11 @@ async def root():
 
 
 @app.get("/health")
-async def health_check(db: Session = Depends(get_database)):
+async def health_check(db: DatabaseSession = Depends(get_database)):
     """Health check endpoint"""
     # Test database connection
     try:
-        db.execute(text("SELECT 1"))
+        await run_in_session(db, lambda session: session.execute(text("SELECT 1")))
         db_status = "connected"
     except Exception:
         db_status = "disconnected"
@@ -107,78 +179,260 @@ async def health_check(db: Session = Depends(get_database)):
     }
 
 
+@app.get("/cache/stats")
+async def cache_stats():
+    """Hit/miss/eviction counters of this process's read cache"""
+    return read_cache.stats()
+
+
+@app.get("/writer/stats")
+async def writer_stats():
+    """Write queue counters (writer process) or the writer this worker forwards to"""
+    if write_queue is not None:
+        return {"role": "writer", **write_queue.stats()}
+    if writer_client is not None:
+        return {"role": "worker", "writer_url": writer_client.base_url}
+    return {"role": "standalone"}
+
+
+async def forward_to_writer(path: str, content: Any, **kwargs) -> Response:
+    """Relay a write request to the writer process and return its response"""
+    try:
+        response = await writer_client.post(path, content, **kwargs)
+    except httpx.HTTPError as e:
+        raise HTTPException(status_code=503, detail=f"Writer unavailable: {e}")
+    return Response(
+        content=response.content,
+        status_code=response.status_code,
+        media_type=response.headers.get("content-type")
+    )
+
+
 # MCP Tools endpoints
 @app.get("/mcp/tools")
 async def list_tools():
     """List all available MCP tools"""
-    tools = MCPTools()
-    return {"tools": tools.get_all_tools()}
+    return Response(content=MCPTools().tools_json(), media_type="application/json")
 
 
 @app.get("/mcp/tools/{tool_name}")
 async def get_tool(tool_name: str):
     """Get specific tool definition"""
-    tools = MCPTools()
-    tool = tools.get_tool(tool_name)
+    tool = MCPTools().tool_json(tool_name)
     
-    if not tool:
+    if tool is None:
         raise HTTPException(status_code=404, detail=f"Tool '{tool_name}' not found")
     
-    return tool
+    return Response(content=tool, media_type="application/json")
 
 
 # MCP Execute endpoint
 @app.post("/mcp/execute", response_model=ExecuteToolResponse)
 async def execute_tool(
     request: ExecuteToolRequest,
-    db: Session = Depends(get_database)
+    if_none_match: Optional[str] = Header(None),
+    db: DatabaseSession = Depends(get_database)
+):
+    """
+    Execute an MCP tool (read tools honour If-None-Match).
+    
+    The result is encoded directly to bytes; ExecuteToolResponse only
+    documents the body in the OpenAPI schema.
+    """
+    if request.tool in WRITE_TOOLS:
+        if writer_client is not None:
+            return await forward_to_writer("/mcp/execute", dumps(request.model_dump()))
+        if write_queue is not None:
+            result = await write_queue.execute_tool(request.tool, request.arguments)
+            return EncodedJSONResponse(dumps_tool_result(result))
+    
+    protocol = AsyncMCPProtocol(db)
+    result = await protocol.execute_tool(request.tool, request.arguments, if_none_match=if_none_match)
+    
+    etag = result.pop("etag", None)
+    headers = {"ETag": etag} if etag else None
+    if etag and result.pop("not_modified", False):
+        return Response(status_code=304, headers=headers)
+    
+    return EncodedJSONResponse(dumps_tool_result(result), headers=headers)
+
+
+@app.post("/mcp/execute/batch", response_model=ExecuteBatchResponse)
+async def execute_batch(
+    request: ExecuteBatchRequest,
+    db: DatabaseSession = Depends(get_database)
 ):
-    """Execute an MCP tool"""
-    protocol = MCPProtocol(db)
-    result = protocol.execute_tool(request.tool, request.arguments)
+    """Execute several MCP tools in order, optionally in one transaction"""
+    calls = [call.model_dump() for call in request.calls]
+    if any(call["tool"] in WRITE_TOOLS for call in calls):
+        if writer_client is not None:
+            return await forward_to_writer("/mcp/execute/batch", dumps(request.model_dump()))
+        if write_queue is not None:
+            result = await write_queue.execute_batch(calls, transactional=request.transactional)
+            return EncodedJSONResponse(dumps_batch_result(result["success"], result["results"]))
     
-    return ExecuteToolResponse(**result)
+    protocol = AsyncMCPProtocol(db)
+    result = await protocol.execute_batch(calls, transactional=request.transactional)
+    
+    return EncodedJSONResponse(dumps_batch_result(result["success"], result["results"]))
 
 
 # Projects endpoints
 @app.get("/projects")
-async def list_projects(db: Session = Depends(get_database)):
-    """List all projects"""
-    service = ProjectService(db)
-    projects = service.list_projects()
-    return {"projects": projects}
+async def list_projects(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: DatabaseSession = Depends(get_database)
+):
+    """List projects, one page at a time (follow next_cursor for more)"""
+    service = AsyncProjectService(db)
+    try:
+        return await service.list_projects_page(limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 @app.get("/projects/{project_id}")
-async def get_project(project_id: str, db: Session = Depends(get_database)):
-    """Get project details with phases"""
-    project = db.query(Project).filter_by(id=project_id).first()
+async def get_project(project_id: str, request: Request, db: DatabaseSession = Depends(get_database)):
+    """Get project details with phases (304 when If-None-Match is current)"""
+    service = AsyncProjectService(db)
+    try:
+        # Tag first: a change between the two reads only costs a refetch
+        etag = await service.get_project_etag(project_id)
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        details = await service.get_project_details(project_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
     
-    if not project:
-        raise HTTPException(status_code=404, detail=f"Project '{project_id}' not found")
+    return JSONResponse(details, headers={"ETag": etag})
+
+
+# Change feed endpoints
+def event_stream_response(request: Request, project_id: Optional[str], last_event_id: Optional[str]) -> StreamingResponse:
+    """Stream change events as SSE, resuming after Last-Event-ID when given"""
+    return StreamingResponse(
+        sse_stream(event_broker, project_id, request.headers.get("last-event-id") or last_event_id),
+        media_type=SSE_MEDIA_TYPE,
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/events")
+async def all_events(request: Request, last_event_id: Optional[str] = None):
+    """
+    Server-Sent Events for writes to every project.
     
-    # Get all phases for this project
-    phases = db.query(Phase).filter_by(project_id=project_id).order_by(Phase.phase_number).all()
+    The last_event_id query parameter stands in for the Last-Event-ID
+    header for clients that cannot set it.
+    """
+    return event_stream_response(request, None, last_event_id)
+
+
+@app.get("/events/stats")
+async def event_stats():
+    """Change feed subscribers and counters"""
+    return event_broker.stats()
+
+
+@app.get("/projects/{project_id}/events")
+async def project_events(
+    project_id: str,
+    request: Request,
+    last_event_id: Optional[str] = None,
+    db: DatabaseSession = Depends(get_database)
+):
+    """Server-Sent Events for phase writes to one project"""
+    try:
+        await AsyncProjectService(db).get_project_etag(project_id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    finally:
+        # The stream outlives the request's session; return its connection now
+        await run_in_session(db, lambda session: session.rollback())
     
-    return {
-        "project_id": project.id,
-        "name": project.name,
-        "description": project.description,
-        "status": project.status,
-        "created_at": project.created_at.isoformat(),
-        "updated_at": project.updated_at.isoformat(),
-        "phases": [
-            {
-                "phase_id": p.id,
-                "phase_number": p.phase_number,
-                "title": p.title,
-                "status": p.status,
-                "specs": p.specs,
-                "progress_data": p.progress_data
-            }
-            for p in phases
-        ]
-    }
+    return event_stream_response(request, project_id, last_event_id)
+
+
+# Search endpoint
+@app.get("/search")
+async def search_phases(
+    q: str = Query(..., min_length=1, description="Words to look for in phases"),
+    project_id: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    db: DatabaseSession = Depends(get_database)
+):
+    """Full-text search over phases, best matches first (follow next_cursor for more)"""
+    service = AsyncProjectService(db)
+    try:
+        return await service.search_phases(q, project_id=project_id, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+# Export endpoint
+@app.get("/export")
+async def export_projects():
+    """
+    Stream every project and its phases as NDJSON.
+    
+    Rows are fetched in batches through a session owned by the stream and
+    closed after the last line, so memory stays flat however large the
+    database is.
+    """
+    def lines():
+        for db in get_db():
+            records = ProjectService(db, cache=None).export_records()
+            yield from iter_ndjson(chain([export_header()], records))
+    
+    return StreamingResponse(
+        lines(),
+        media_type=NDJSON_MEDIA_TYPE,
+        headers={"Content-Disposition": 'attachment; filename="mcp-aidev-export.ndjson"'}
+    )
+
+
+@app.post("/import")
+async def import_projects(
+    request: Request,
+    upsert: bool = Query(False, description="Update existing projects and phases instead of failing"),
+    db: DatabaseSession = Depends(get_database)
+):
+    """
+    Import projects and phases from an NDJSON body in the GET /export format.
+    
+    The body is parsed as it arrives. Every IMPORT_TRANSACTION_ROWS rows are
+    written with executemany in chunks and committed in one session call, so
+    no write transaction stays open while the upload is awaited. On error
+    only the current transaction is rolled back; the 400 response says which
+    lines failed and how much was already imported.
+    """
+    if writer_client is not None:
+        return await forward_to_writer(
+            "/import", request.stream(), params={"upsert": upsert}, content_type=NDJSON_MEDIA_TYPE
+        )
+    
+    importer = NDJSONImporter(upsert=upsert)
+    
+    async def flush() -> None:
+        # In the writer process, take a turn with the queued writes for each
+        # transaction only, so a slow upload does not hold them off
+        async with write_queue.exclusive() if write_queue is not None else nullcontext():
+            await run_in_session(db, importer.flush)
+    
+    try:
+        async for data in request.stream():
+            importer.feed(data)
+            if importer.ready:
+                await flush()
+        importer.close()
+        await flush()
+    except ValueError as e:
+        await run_in_session(db, importer.rollback)
+        raise HTTPException(status_code=400, detail={"error": str(e), "imported": importer.committed})
+    
+    return {"success": True, "imported": importer.committed, "transactions": importer.transactions}
 
 
 # Run server if executed directly
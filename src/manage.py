@@ -0,0 +1,185 @@
+"""
+Maintenance commands for MCP-AIDev
+
+Usage:
+    python src/manage.py repair-counters
+    python src/manage.py recompress --vacuum
+    python src/manage.py reindex
+    python src/manage.py serve --port 8000 --workers 4
+    python src/manage.py --database-url sqlite:///./data/mcp_aidev.db repair-counters
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+from typing import List, Optional
+
+import uvicorn
+from sqlalchemy import text
+
+from database.compression import COMPRESSION_THRESHOLD, recompress_payloads
+from database.connection import init_db, get_db
+from database.search import rebuild_search_index
+from services.project_service import ProjectService
+
+
+def repair_counters_command(args: argparse.Namespace) -> None:
+    """Recompute per-project phase counters from the phases table"""
+    db = next(get_db())
+    try:
+        repaired = ProjectService(db).repair_counters()
+    finally:
+        db.close()
+    print(f"✅ Counters repaired for {repaired} project(s)")
+
+
+def recompress_command(args: argparse.Namespace) -> None:
+    """Rewrite phase specs/progress_data in the compressed storage format"""
+    db = next(get_db())
+    try:
+        engine = db.get_bind()
+        report = recompress_payloads(engine, threshold=args.threshold)
+        if engine.dialect.name == "postgresql":
+            print("ℹ️  PostgreSQL stores payloads as JSONB, compressed by TOAST; nothing to do")
+            return
+        if args.vacuum:
+            with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+                conn.execute(text("VACUUM"))
+            # VACUUM may renumber the rowids the FTS5 index refers to
+            rebuild_search_index(db)
+            db.commit()
+    finally:
+        db.close()
+
+    before, after = report["bytes_before"], report["bytes_after"]
+    saved = before - after
+    print(f"✅ Rewrote {report['values_rewritten']} value(s) in {report['rows_scanned']} phase(s)")
+    print(f"   Payload bytes: {before:,} -> {after:,} ({saved:,} saved, {saved / before:.0%})" if before else "   No payloads stored")
+    if saved > 0 and not args.vacuum:
+        print("   Run with --vacuum to return the freed pages to the file system")
+
+
+def reindex_command(args: argparse.Namespace) -> None:
+    """Rebuild the full-text search index of phases"""
+    db = next(get_db())
+    try:
+        indexed = rebuild_search_index(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"✅ Search index rebuilt for {indexed} phase(s)")
+
+
+def wait_for_health(url: str, timeout: float = 30.0) -> None:
+    """Block until GET {url}/health answers, or raise RuntimeError"""
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            with urllib.request.urlopen(f"{url}/health", timeout=1):
+                return
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"Server at {url} did not start within {timeout:.0f}s")
+            time.sleep(0.1)
+
+
+def serve_command(args: argparse.Namespace) -> None:
+    """
+    Run the API server, optionally with several worker processes.
+    
+    With SQLite and more than one worker, a writer process is started first
+    on 127.0.0.1:--writer-port; the workers forward every write to it (see
+    services.writer). Migrations already ran in this process (init_db), so
+    workers start on an up-to-date schema.
+    """
+    src = str(Path(__file__).resolve().parent)
+    db = next(get_db())
+    try:
+        dialect = db.get_bind().dialect.name
+    finally:
+        db.close()
+    
+    writer = None
+    if args.workers > 1 and dialect == "sqlite" and not args.no_writer:
+        writer_url = f"http://127.0.0.1:{args.writer_port}"
+        writer = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "main:app", "--app-dir", src,
+             "--host", "127.0.0.1", "--port", str(args.writer_port), "--workers", "1",
+             "--log-level", "warning"],
+            env={**os.environ, "WRITE_QUEUE": "1", "WRITER_URL": ""}
+        )
+        wait_for_health(writer_url)
+        os.environ["WRITER_URL"] = writer_url
+        print(f"✍️  Writer process {writer.pid} on {writer_url}")
+    
+    try:
+        uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers, app_dir=src)
+    finally:
+        if writer is not None:
+            writer.terminate()
+            writer.wait()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """Entry point for maintenance commands"""
+    parser = argparse.ArgumentParser(description="MCP-AIDev maintenance commands")
+    parser.add_argument(
+        "--database-url",
+        default=None,
+        help="Database URL (defaults to DATABASE_URL or the local SQLite file)"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    repair = commands.add_parser(
+        "repair-counters",
+        help="recompute denormalized phase counters on projects"
+    )
+    repair.set_defaults(handler=repair_counters_command)
+
+    recompress = commands.add_parser(
+        "recompress",
+        help="store existing phase specs/progress_data in the compressed format"
+    )
+    recompress.add_argument(
+        "--threshold",
+        type=int,
+        default=COMPRESSION_THRESHOLD,
+        help=f"minimum JSON length to compress (default {COMPRESSION_THRESHOLD})"
+    )
+    recompress.add_argument("--vacuum", action="store_true", help="run VACUUM afterwards (SQLite)")
+    recompress.set_defaults(handler=recompress_command)
+
+    reindex = commands.add_parser(
+        "reindex",
+        help="rebuild the full-text search index of phases"
+    )
+    reindex.set_defaults(handler=reindex_command)
+
+    serve = commands.add_parser(
+        "serve",
+        help="run the API server (several workers share one SQLite writer)"
+    )
+    serve.add_argument("--host", default="0.0.0.0", help="bind address (default 0.0.0.0)")
+    serve.add_argument("--port", type=int, default=int(os.getenv("PORT", 8000)), help="port (default $PORT or 8000)")
+    serve.add_argument("--workers", type=int, default=1, help="worker processes (default 1)")
+    serve.add_argument("--writer-port", type=int, default=8001, help="internal port of the SQLite writer (default 8001)")
+    serve.add_argument(
+        "--no-writer",
+        action="store_true",
+        help="let every worker write to SQLite itself (the old behaviour, for comparison)"
+    )
+    serve.set_defaults(handler=serve_command)
+
+    args = parser.parse_args(argv)
+    if args.database_url:
+        # Worker and writer processes read the URL from the environment
+        os.environ["DATABASE_URL"] = args.database_url
+    init_db(args.database_url)
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,6 +3,6 @@ MCP Protocol module for mcp-aidev
 """
 
 from .tools import MCPTools
-from .protocol import MCPProtocol
+from .protocol import MCPProtocol, AsyncMCPProtocol
 
-__all__ = ["MCPTools", "MCPProtocol"]
+__all__ = ["MCPTools", "MCPProtocol", "AsyncMCPProtocol"]
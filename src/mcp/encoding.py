@@ -0,0 +1,57 @@
+"""
+JSON encoding for MCP responses
+
+Tool results are plain dicts of JSON types, so they can be encoded straight
+to bytes without a Pydantic round trip. orjson is used when installed; the
+standard library produces the same compact UTF-8 output otherwise.
+"""
+
+import json
+from typing import Any, Dict, List
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+# Fields of ExecuteToolResponse, in order
+RESULT_FIELDS = ("success", "data", "error", "error_path")
+
+
+if orjson is not None:
+    def dumps(value: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON"""
+        return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS)
+
+    # Raises orjson.JSONDecodeError, a ValueError
+    loads = orjson.loads
+else:
+    def dumps(value: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON"""
+        return json.dumps(value, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    loads = json.loads
+
+
+def tool_result(result: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Shape a protocol result like ExecuteToolResponse.
+
+    Args:
+        result: Dictionary returned by MCPProtocol.execute_tool
+
+    Returns:
+        Dictionary with every response field, missing ones set to None
+    """
+    return {field: result.get(field) for field in RESULT_FIELDS}
+
+
+def dumps_tool_result(result: Dict[str, Any]) -> bytes:
+    """Encode one tool result as an ExecuteToolResponse body"""
+    return dumps(tool_result(result))
+
+
+def dumps_batch_result(success: bool, results: List[Dict[str, Any]]) -> bytes:
+    """Encode a batch result as an ExecuteBatchResponse body"""
+    return dumps({"success": success, "results": [tool_result(result) for result in results]})
@@ -4,11 +4,28 @@ MCP Protocol Handler for mcp-aidev
 Handles request execution and response formatting
 """
 
-from typing import Dict, Any, Optional
+import re
+from typing import Dict, Any, List, Optional, Union
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 
 from .tools import MCPTools
-from services.project_service import ProjectService
+from .validation import SchemaError, compile_validator
+from database.connection import run_in_session
+from services.etag import CONDITIONAL_TOOLS, etag_matches
+from services.events import DEFAULT_WAIT_SECONDS, WAIT_TOOLS, event_broker, wait_for_version
+from services.project_service import ProjectService, VersionConflict
+
+
+# Maximum number of tool calls accepted in one batch
+MAX_BATCH_CALLS = 100
+
+# Argument values like "$0.project_id" refer to the data of an earlier call
+_RESULT_REFERENCE = re.compile(r"^\$(\d+)\.(\w+)$")
+
+
+class _BatchAborted(Exception):
+    """Raised to roll back a transactional batch after a failed call"""
 
 
 class MCPProtocol:
@@ -38,13 +55,26 @@ class MCPProtocol:
             "tools": self.tools.get_all_tools()
         }
     
-    def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+    def execute_tool(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        if_none_match: Optional[str] = None
+    ) -> Dict[str, Any]:
         """
         Execute a tool with given arguments.
         
+        Read tools in CONDITIONAL_TOOLS also return the project's "etag";
+        when it matches if_none_match the tool is not run and the result is
+        {"success": True, "not_modified": True, "etag": ...}.
+        
+        A write rejected by its expected_version fails with "data" holding
+        the phase's current version.
+        
         Args:
             tool_name: Name of the tool to execute
             arguments: Dictionary of arguments for the tool
+            if_none_match: Optional If-None-Match header value from the client
             
         Returns:
             Dictionary with success status and data or error
@@ -57,21 +87,49 @@ class MCPProtocol:
                 "error": f"Tool '{tool_name}' not found"
             }
         
-        # Validate required parameters
+        # Validate arguments against the tool schema
         validation_error = self._validate_arguments(tool_def, arguments)
         if validation_error:
             return {
                 "success": False,
-                "error": validation_error
+                "error": str(validation_error),
+                "error_path": validation_error.path
             }
         
         # Execute the tool
         try:
+            if tool_name in CONDITIONAL_TOOLS:
+                # Computed before the read, so the tag never claims newer data
+                etag = self.service.get_project_etag(arguments["project_id"])
+                if etag_matches(if_none_match, etag):
+                    return {
+                        "success": True,
+                        "not_modified": True,
+                        "etag": etag
+                    }
+                return {
+                    "success": True,
+                    "data": self._dispatch_tool(tool_name, arguments),
+                    "etag": etag
+                }
+            
             result = self._dispatch_tool(tool_name, arguments)
             return {
                 "success": True,
                 "data": result
             }
+        except VersionConflict as e:
+            # The current version lets the client re-read and retry
+            return {
+                "success": False,
+                "error": str(e),
+                "data": {
+                    "conflict": True,
+                    "phase_number": e.phase_number,
+                    "expected_version": e.expected_version,
+                    "current_version": e.current_version
+                }
+            }
         except ValueError as e:
             return {
                 "success": False,
@@ -83,59 +141,112 @@ class MCPProtocol:
                 "error": f"Execution error: {str(e)}"
             }
     
-    def _validate_arguments(self, tool_def: Dict[str, Any], arguments: Dict[str, Any]) -> Optional[str]:
+    def execute_batch(self, calls: List[Dict[str, Any]], transactional: bool = False) -> Dict[str, Any]:
         """
-        Validate arguments against tool schema.
+        Execute an ordered list of tool calls.
+        
+        A string argument of the form "$N.field" is replaced by `field` from
+        the data of call N, so one batch can create a project and then save
+        its phases.
         
         Args:
-            tool_def: Tool definition with schema
-            arguments: Arguments to validate
+            calls: List of {"tool": name, "arguments": {...}} dictionaries
+            transactional: If True, run every call in one transaction and
+                roll all of them back when any call fails; otherwise each
+                call commits on its own
             
         Returns:
-            Error message string or None if valid
+            Dictionary with overall success and one result per call
         """
-        schema = tool_def["input_schema"]
+        results: List[Dict[str, Any]] = []
         
-        # Check required fields
-        required = schema.get("required", [])
-        for field in required:
-            if field not in arguments:
-                return f"Missing required parameter: {field}"
+        if not transactional:
+            for call in calls:
+                result = self._execute_call(call, results)
+                if not result["success"]:
+                    # Clear a failed flush so the next call starts clean
+                    self.db.rollback()
+                results.append(result)
+            return {
+                "success": all(result["success"] for result in results),
+                "results": results
+            }
         
-        # Basic type validation
-        properties = schema.get("properties", {})
-        for key, value in arguments.items():
-            if key in properties:
-                expected_type = properties[key].get("type")
-                if not self._check_type(value, expected_type):
-                    return f"Invalid type for '{key}': expected {expected_type}"
+        try:
+            with self.service.transaction():
+                for call in calls:
+                    result = self._execute_call(call, results)
+                    results.append(result)
+                    if not result["success"]:
+                        raise _BatchAborted()
+        except _BatchAborted:
+            failed = len(results) - 1
+            return {
+                "success": False,
+                "results": (
+                    [{"success": False, "error": f"Rolled back: call {failed} failed"}] * failed
+                    + [results[failed]]
+                    + [{"success": False, "error": f"Skipped: call {failed} failed"}] * (len(calls) - failed - 1)
+                )
+            }
+        except Exception as e:
+            return {
+                "success": False,
+                "results": [{"success": False, "error": f"Execution error: {str(e)}"}] * len(calls)
+            }
         
-        return None
+        return {
+            "success": True,
+            "results": results
+        }
     
-    def _check_type(self, value: Any, expected_type: str) -> bool:
+    def _execute_call(self, call: Dict[str, Any], previous: List[Dict[str, Any]]) -> Dict[str, Any]:
         """
-        Check if value matches expected JSON Schema type.
+        Execute one batch call after resolving references to earlier results.
         
         Args:
-            value: Value to check
-            expected_type: Expected JSON Schema type
+            call: Dictionary with "tool" and "arguments"
+            previous: Results of the calls already executed in the batch
             
         Returns:
-            True if type matches, False otherwise
-        """
-        type_map = {
-            "string": str,
-            "integer": int,
-            "number": (int, float),
-            "boolean": bool,
-            "array": list,
-            "object": dict
-        }
+            Dictionary with success status and data or error
+        """
+        arguments = dict(call.get("arguments") or {})
+        for key, value in arguments.items():
+            match = _RESULT_REFERENCE.match(value) if isinstance(value, str) else None
+            if not match:
+                continue
+            index, field = int(match.group(1)), match.group(2)
+            if index >= len(previous) or not previous[index]["success"]:
+                return {
+                    "success": False,
+                    "error": f"Invalid reference '{value}': call {index} has no result"
+                }
+            data = previous[index].get("data") or {}
+            if field not in data:
+                return {
+                    "success": False,
+                    "error": f"Invalid reference '{value}': no field '{field}'"
+                }
+            arguments[key] = data[field]
         
-        if expected_type not in type_map:
-            return True  # Unknown type, skip validation
+        return self.execute_tool(call["tool"], arguments)
+    
+    def _validate_arguments(self, tool_def: Dict[str, Any], arguments: Dict[str, Any]) -> Optional[SchemaError]:
+        """
+        Validate arguments against tool schema, including nested values.
         
-        return isinstance(value, type_map[expected_type])
+        Args:
+            tool_def: Tool definition with schema
+            arguments: Arguments to validate
+            
+        Returns:
+            First SchemaError (message and path) or None if valid
+        """
+        validate = self.tools.get_validator(tool_def["name"])
+        if validate is None:
+            validate = compile_validator(tool_def["input_schema"])
+        return validate(arguments)
     
     def _dispatch_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
         """
@@ -160,7 +271,14 @@ class MCPProtocol:
                 project_id=arguments["project_id"],
                 phase_number=arguments["phase_number"],
                 title=arguments["title"],
-                specs=arguments["specs"]
+                specs=arguments["specs"],
+                expected_version=arguments.get("expected_version")
+            )
+        
+        elif tool_name == "save_phases":
+            return self.service.save_phases(
+                project_id=arguments["project_id"],
+                phases=arguments["phases"]
             )
         
         elif tool_name == "get_phase":
@@ -174,7 +292,8 @@ class MCPProtocol:
                 project_id=arguments["project_id"],
                 phase_number=arguments["phase_number"],
                 status=arguments["status"],
-                progress_data=arguments.get("progress_data")
+                progress_data=arguments.get("progress_data"),
+                expected_version=arguments.get("expected_version")
             )
         
         elif tool_name == "get_project_status":
@@ -183,11 +302,15 @@ class MCPProtocol:
             )
         
         elif tool_name == "list_project_phases":
+            page = self.service.list_project_phases_page(
+                project_id=arguments["project_id"],
+                limit=arguments.get("limit"),
+                cursor=arguments.get("cursor")
+            )
             return {
                 "project_id": arguments["project_id"],
-                "phases": self.service.list_project_phases(
-                    project_id=arguments["project_id"]
-                )
+                "phases": page["phases"],
+                "next_cursor": page["next_cursor"]
             }
         
         elif tool_name == "get_current_phase":
@@ -197,8 +320,129 @@ class MCPProtocol:
             return {
                 "project_id": arguments["project_id"],
                 "current_phase": current_phase,
-                "all_completed": current_phase is None
+                "all_completed": current_phase is None,
+                "version": self.service.get_project_version(arguments["project_id"])
             }
         
+        elif tool_name == "search_phases":
+            return self.service.search_phases(
+                query=arguments["query"],
+                project_id=arguments.get("project_id"),
+                limit=arguments.get("limit"),
+                cursor=arguments.get("cursor")
+            )
+        
         else:
             raise ValueError(f"Unknown tool: {tool_name}")
+
+
+class AsyncMCPProtocol:
+    """
+    Awaitable MCP protocol handler for the event loop.
+    
+    Runs MCPProtocol through `run_in_session`, so tool execution awaits the
+    async driver (AsyncSession) or a worker thread (Session) instead of
+    blocking the event loop.
+    """
+    
+    def __init__(self, db: Union[AsyncSession, Session]):
+        """
+        Initialize protocol handler.
+        
+        Args:
+            db: AsyncSession (async mode) or SQLAlchemy Session
+        """
+        self.db = db
+        self.tools = MCPTools()
+    
+    def list_tools(self) -> Dict[str, Any]:
+        """
+        List all available tools.
+        
+        Returns:
+            Dictionary with tools list for MCP response
+        """
+        return {
+            "tools": self.tools.get_all_tools()
+        }
+    
+    async def execute_tool(
+        self,
+        tool_name: str,
+        arguments: Dict[str, Any],
+        if_none_match: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Execute a tool with given arguments.
+        
+        Tools in WAIT_TOOLS called with "wait_since" first park until the
+        project's version exceeds it or "timeout" seconds pass (long
+        polling); the result is then read as usual.
+        
+        Args:
+            tool_name: Name of the tool to execute
+            arguments: Dictionary of arguments for the tool
+            if_none_match: Optional If-None-Match header value from the client
+            
+        Returns:
+            Dictionary with success status and data or error
+        """
+        if tool_name in WAIT_TOOLS and arguments.get("wait_since") is not None:
+            # Invalid arguments are reported by execute_tool, without waiting
+            if self.tools.get_validator(tool_name)(arguments) is None:
+                await self._wait_for_change(
+                    arguments["project_id"],
+                    arguments["wait_since"],
+                    arguments.get("timeout", DEFAULT_WAIT_SECONDS)
+                )
+        
+        return await run_in_session(
+            self.db,
+            lambda session: MCPProtocol(session).execute_tool(tool_name, arguments, if_none_match)
+        )
+    
+    async def _wait_for_change(self, project_id: str, since: int, timeout: float) -> None:
+        """
+        Wait until a project's version exceeds `since`, or the timeout.
+        
+        Reads the version once; the rest of the wait is parked on the
+        project's change feed (see services.events), holding no database
+        connection.
+        
+        Args:
+            project_id: UUID of the project
+            since: Version the client already has
+            timeout: Seconds to wait at most
+        """
+        # Subscribe first: a write committed after the read is still seen
+        subscription = event_broker.subscribe(project_id)
+        try:
+            def read_version(session: Session) -> Optional[int]:
+                try:
+                    return ProjectService(session).get_project_version(project_id)
+                except ValueError:
+                    return None  # execute_tool reports the missing project
+                finally:
+                    session.rollback()
+            
+            version = await run_in_session(self.db, read_version)
+            if version is not None and version <= since:
+                await wait_for_version(subscription, since, timeout)
+        finally:
+            subscription.close()
+    
+    async def execute_batch(self, calls: List[Dict[str, Any]], transactional: bool = False) -> Dict[str, Any]:
+        """
+        Execute an ordered list of tool calls.
+        
+        Args:
+            calls: List of {"tool": name, "arguments": {...}} dictionaries
+            transactional: If True, all calls succeed or none are kept
+            
+        Returns:
+            Dictionary with overall success and one result per call
+        """
+        return await run_in_session(
+            self.db,
+            lambda session: MCPProtocol(session).execute_batch(calls, transactional)
+        )
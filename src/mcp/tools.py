@@ -6,23 +6,53 @@ Defines the schema for each tool following MCP specification
 
 from typing import Dict, Any, List, Optional
 
+from .encoding import dumps
+from .validation import Validator, compile_validator
+
 
 class MCPTools:
     """
     Defines MCP tool schemas for the orchestrator.
+    
+    Definitions, validators and serialized JSON are built once per process
+    and shared by every instance, so creating an MCPTools is free. Treat the
+    returned definitions as read-only.
     """
     
     def __init__(self):
         """Initialize tool definitions"""
-        self._tools = self._define_tools()
+        self._tools = _TOOLS
     
-    def _define_tools(self) -> Dict[str, Dict[str, Any]]:
+    @staticmethod
+    def _define_tools() -> Dict[str, Dict[str, Any]]:
         """
         Define all available MCP tools with their schemas.
         
         Returns:
             Dictionary mapping tool names to their definitions
         """
+        specs_schema = {
+            "type": "object",
+            "description": "Phase specifications including files, tests, dependencies",
+            "properties": {
+                "files_to_create": {
+                    "type": "array",
+                    "items": {"type": "string"}
+                },
+                "tests_to_write": {
+                    "type": "array",
+                    "items": {"type": "string"}
+                },
+                "dependencies": {
+                    "type": "array",
+                    "items": {"type": "string"}
+                },
+                "instructions": {
+                    "type": "string"
+                }
+            }
+        }
+        
         return {
             "create_project": {
                 "name": "create_project",
@@ -64,29 +94,45 @@ class MCPTools:
                             "type": "string",
                             "description": "Title of the phase"
                         },
-                        "specs": {
-                            "type": "object",
-                            "description": "Phase specifications including files, tests, dependencies",
-                            "properties": {
-                                "files_to_create": {
-                                    "type": "array",
-                                    "items": {"type": "string"}
-                                },
-                                "tests_to_write": {
-                                    "type": "array",
-                                    "items": {"type": "string"}
-                                },
-                                "dependencies": {
-                                    "type": "array",
-                                    "items": {"type": "string"}
+                        "specs": specs_schema,
+                        "expected_version": {
+                            "type": "integer",
+                            "minimum": 0,
+                            "description": "Optional compare-and-swap: the phase 'version' this write is based on (0 to only create a new phase); fails with a version conflict if the phase has changed since"
+                        }
+                    },
+                    "required": ["project_id", "phase_number", "title", "specs"]
+                }
+            },
+            "save_phases": {
+                "name": "save_phases",
+                "description": "Saves a whole plan of phases for a project in one call. Existing phase numbers are updated in place, new ones are created as planned",
+                "input_schema": {
+                    "type": "object",
+                    "properties": {
+                        "project_id": {
+                            "type": "string",
+                            "description": "UUID of the project"
+                        },
+                        "phases": {
+                            "type": "array",
+                            "description": "Phases to save, each with phase_number, title and specs",
+                            "items": {
+                                "type": "object",
+                                "properties": {
+                                    "phase_number": {
+                                        "type": "integer"
+                                    },
+                                    "title": {
+                                        "type": "string"
+                                    },
+                                    "specs": specs_schema
                                 },
-                                "instructions": {
-                                    "type": "string"
-                                }
+                                "required": ["phase_number", "title", "specs"]
                             }
                         }
                     },
-                    "required": ["project_id", "phase_number", "title", "specs"]
+                    "required": ["project_id", "phases"]
                 }
             },
             "get_phase": {
@@ -144,6 +190,11 @@ class MCPTools:
                                     "type": "string"
                                 }
                             }
+                        },
+                        "expected_version": {
+                            "type": "integer",
+                            "minimum": 1,
+                            "description": "Optional compare-and-swap: the phase 'version' this update is based on; fails with a version conflict if the phase has changed since"
                         }
                     },
                     "required": ["project_id", "phase_number", "status"]
@@ -151,13 +202,24 @@ class MCPTools:
             },
             "get_project_status": {
                 "name": "get_project_status",
-                "description": "Get comprehensive project status including total phases, completed phases, in-progress phases, current phase, and progress percentage",
+                "description": "Get comprehensive project status including total phases, completed phases, in-progress phases, current phase, progress percentage and version. With wait_since, waits for the project to change before answering.",
                 "input_schema": {
                     "type": "object",
                     "properties": {
                         "project_id": {
                             "type": "string",
                             "description": "UUID of the project"
+                        },
+                        "wait_since": {
+                            "type": "integer",
+                            "minimum": 0,
+                            "description": "Long polling: wait until the project's version is greater than this value (the 'version' of a previous result), or until the timeout, then return the current state"
+                        },
+                        "timeout": {
+                            "type": "number",
+                            "minimum": 0,
+                            "maximum": 60,
+                            "description": "Seconds to wait with wait_since (default 30, max 60)"
                         }
                     },
                     "required": ["project_id"]
@@ -165,13 +227,21 @@ class MCPTools:
             },
             "list_project_phases": {
                 "name": "list_project_phases",
-                "description": "List all phases for a project with their status (planned, in_progress, completed)",
+                "description": "List the phases of a project with their status (planned, in_progress, completed). Results are paginated: pass the returned next_cursor to fetch the following page.",
                 "input_schema": {
                     "type": "object",
                     "properties": {
                         "project_id": {
                             "type": "string",
                             "description": "UUID of the project"
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Maximum number of phases to return (default 100, max 500)"
+                        },
+                        "cursor": {
+                            "type": "string",
+                            "description": "Opaque next_cursor returned by the previous page"
                         }
                     },
                     "required": ["project_id"]
@@ -179,17 +249,54 @@ class MCPTools:
             },
             "get_current_phase": {
                 "name": "get_current_phase",
-                "description": "Get the current phase (first non-completed phase) for a project. Returns None if all phases are completed.",
+                "description": "Get the current phase (first non-completed phase) for a project. Returns None if all phases are completed. With wait_since, waits for the project to change before answering.",
                 "input_schema": {
                     "type": "object",
                     "properties": {
                         "project_id": {
                             "type": "string",
                             "description": "UUID of the project"
+                        },
+                        "wait_since": {
+                            "type": "integer",
+                            "minimum": 0,
+                            "description": "Long polling: wait until the project's version is greater than this value (the 'version' of a previous result), or until the timeout, then return the current state"
+                        },
+                        "timeout": {
+                            "type": "number",
+                            "minimum": 0,
+                            "maximum": 60,
+                            "description": "Seconds to wait with wait_since (default 30, max 60)"
                         }
                     },
                     "required": ["project_id"]
                 }
+            },
+            "search_phases": {
+                "name": "search_phases",
+                "description": "Full-text search over phase titles, instructions, files to create and project names/descriptions, across all projects. Results are ranked by relevance and paginated: pass the returned next_cursor to fetch the following page.",
+                "input_schema": {
+                    "type": "object",
+                    "properties": {
+                        "query": {
+                            "type": "string",
+                            "description": "Words to look for, e.g. 'auth module' or 'redis'; every word must match (as a prefix)"
+                        },
+                        "project_id": {
+                            "type": "string",
+                            "description": "Optional UUID of a project to search in"
+                        },
+                        "limit": {
+                            "type": "integer",
+                            "description": "Maximum number of results to return (default 20, max 500)"
+                        },
+                        "cursor": {
+                            "type": "string",
+                            "description": "Opaque next_cursor returned by the previous page"
+                        }
+                    },
+                    "required": ["query"]
+                }
             }
         }
     
@@ -222,3 +329,43 @@ class MCPTools:
             List of tool name strings
         """
         return list(self._tools.keys())
+    
+    def get_validator(self, name: str) -> Optional[Validator]:
+        """
+        Get the precompiled argument validator of a tool.
+        
+        Args:
+            name: Tool name
+            
+        Returns:
+            Validator function or None if tool not found
+        """
+        return _VALIDATORS.get(name)
+    
+    def tools_json(self) -> bytes:
+        """
+        Get the {"tools": [...]} listing, already serialized.
+        
+        Returns:
+            UTF-8 encoded JSON
+        """
+        return _TOOLS_JSON
+    
+    def tool_json(self, name: str) -> Optional[bytes]:
+        """
+        Get one tool definition, already serialized.
+        
+        Args:
+            name: Tool name
+            
+        Returns:
+            UTF-8 encoded JSON or None if tool not found
+        """
+        return _TOOL_JSON.get(name)
+
+
+# Process-wide registry, built once at import
+_TOOLS = MCPTools._define_tools()
+_VALIDATORS = {name: compile_validator(tool["input_schema"]) for name, tool in _TOOLS.items()}
+_TOOLS_JSON = dumps({"tools": list(_TOOLS.values())})
+_TOOL_JSON = {name: dumps(tool) for name, tool in _TOOLS.items()}
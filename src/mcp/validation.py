@@ -0,0 +1,282 @@
+"""
+Argument validators for MCP tools
+
+Each tool's input schema is compiled once into nested plain functions, so a
+call only pays for dictionary lookups and isinstance checks. Supported JSON
+Schema keywords: type, enum, properties, required, additionalProperties,
+items, minimum, maximum, minLength, maxLength, minItems and maxItems.
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Union
+
+
+PathItem = Union[str, int]
+
+
+class SchemaError:
+    """
+    First schema violation found in a tool call's arguments.
+    
+    Checks return errors without a path; each enclosing object or array
+    prepends its key on the way out, so valid calls never build paths.
+
+    Attributes:
+        path: Location of the offending value, e.g. ["specs", "files_to_create", 0]
+        message: Human-readable description, which str() returns
+    """
+
+    __slots__ = ("_reversed_path", "_template")
+
+    def __init__(self, template: str):
+        self._reversed_path: List[PathItem] = []
+        self._template = template
+
+    def within(self, key: PathItem) -> "SchemaError":
+        """Record that the error is inside `key` of the enclosing value"""
+        self._reversed_path.append(key)
+        return self
+
+    @property
+    def path(self) -> List[PathItem]:
+        return self._reversed_path[::-1]
+
+    @property
+    def message(self) -> str:
+        return self._template.format(path=format_path(self.path))
+
+    def __str__(self) -> str:
+        return self.message
+
+    def __repr__(self) -> str:
+        return f"<SchemaError(path={self.path}, message={self.message!r})>"
+
+
+# Validator: arguments -> first error, or None when valid
+Validator = Callable[[Dict[str, Any]], Optional[SchemaError]]
+
+# Check: value -> first error, or None when valid
+_Check = Callable[[Any], Optional[SchemaError]]
+
+JSON_TYPES = {
+    "string": str,
+    "integer": int,
+    "number": (int, float),
+    "boolean": bool,
+    "array": list,
+    "object": dict,
+    "null": type(None)
+}
+
+
+def format_path(path: List[PathItem]) -> str:
+    """
+    Render a path as a dotted string, e.g. "specs.files_to_create[0]".
+
+    Args:
+        path: Sequence of property names and array indexes
+
+    Returns:
+        Path string ("arguments" for the root)
+    """
+    text = ""
+    for item in path:
+        if isinstance(item, int):
+            text += f"[{item}]"
+        else:
+            text += f".{item}" if text else item
+    return text or "arguments"
+
+
+def _type_check(expected: str) -> _Check:
+    """Check the JSON type; booleans are not integers or numbers"""
+    python_type = JSON_TYPES[expected]
+    template = f"Invalid type for '{{path}}': expected {expected}"
+
+    if expected in ("integer", "number"):
+        def check(value: Any) -> Optional[SchemaError]:
+            if not isinstance(value, python_type) or isinstance(value, bool):
+                return SchemaError(template)
+            return None
+    else:
+        def check(value: Any) -> Optional[SchemaError]:
+            if not isinstance(value, python_type):
+                return SchemaError(template)
+            return None
+
+    return check
+
+
+def _enum_check(allowed: List[Any]) -> _Check:
+    """Check the value is one of the allowed values"""
+    allowed_set = frozenset(allowed)
+    listing = ", ".join(str(value) for value in allowed)
+    template = f"Invalid value for '{{path}}': expected one of {listing}"
+
+    def check(value: Any) -> Optional[SchemaError]:
+        try:
+            valid = value in allowed_set
+        except TypeError:  # unhashable
+            valid = False
+        if not valid:
+            return SchemaError(template)
+        return None
+
+    return check
+
+
+def _bound_check(keyword: str, bound: Any, measure: Callable[[Any], Any], applies: type, text: str) -> _Check:
+    """Check a lower/upper bound on a value or on its length"""
+    lower = keyword.startswith("min")
+    template = f"Invalid value for '{{path}}': {text}"
+
+    def check(value: Any) -> Optional[SchemaError]:
+        if not isinstance(value, applies) or isinstance(value, bool):
+            return None
+        measured = measure(value)
+        if (measured < bound) if lower else (measured > bound):
+            return SchemaError(template)
+        return None
+
+    return check
+
+
+def _object_check(schema: Dict[str, Any]) -> Optional[_Check]:
+    """Check required keys, known properties and additional properties"""
+    required = tuple(schema.get("required", []))
+    known = frozenset(schema.get("properties", {}))
+    properties = {key: _compile(prop) for key, prop in schema.get("properties", {}).items()}
+    properties = {key: check for key, check in properties.items() if check is not None}
+    additional = schema.get("additionalProperties", True)
+    additional_check = _compile(additional) if isinstance(additional, dict) else None
+    if not required and not properties and additional is True:
+        return None
+
+    def check(value: Any) -> Optional[SchemaError]:
+        if not isinstance(value, dict):
+            return None
+        for field in required:
+            if field not in value:
+                return SchemaError("Missing required parameter: {path}").within(field)
+        for key, item in value.items():
+            item_check = properties.get(key)
+            if item_check is None:
+                if key in known or additional is True:
+                    continue
+                if additional is False:
+                    return SchemaError("Unexpected parameter: {path}").within(key)
+                item_check = additional_check
+                if item_check is None:
+                    continue
+            error = item_check(item)
+            if error is not None:
+                return error.within(key)
+        return None
+
+    return check
+
+
+def _array_check(items: Dict[str, Any]) -> Optional[_Check]:
+    """Check every element against the items schema"""
+    item_type = items.get("type")
+    if set(items) <= {"type", "description"} and item_type in ("string", "boolean", "array", "object", "null"):
+        # Plain typed lists (e.g. file names) need only one isinstance per element
+        python_type = JSON_TYPES[item_type]
+        template = f"Invalid type for '{{path}}': expected {item_type}"
+
+        def typed_check(value: Any) -> Optional[SchemaError]:
+            if not isinstance(value, list):
+                return None
+            for index, item in enumerate(value):
+                if not isinstance(item, python_type):
+                    return SchemaError(template).within(index)
+            return None
+
+        return typed_check
+
+    item_check = _compile(items)
+    if item_check is None:
+        return None
+
+    def check(value: Any) -> Optional[SchemaError]:
+        if not isinstance(value, list):
+            return None
+        for index, item in enumerate(value):
+            error = item_check(item)
+            if error is not None:
+                return error.within(index)
+        return None
+
+    return check
+
+
+def _compile(schema: Dict[str, Any]) -> Optional[_Check]:
+    """
+    Compile one schema node into a check function.
+
+    Returns:
+        Check function, or None when the node accepts any value
+    """
+    checks: List[_Check] = []
+
+    if schema.get("type") in JSON_TYPES:
+        checks.append(_type_check(schema["type"]))
+    if "enum" in schema:
+        checks.append(_enum_check(schema["enum"]))
+    if "minimum" in schema:
+        checks.append(_bound_check("minimum", schema["minimum"], lambda v: v, (int, float), f"must be >= {schema['minimum']}"))
+    if "maximum" in schema:
+        checks.append(_bound_check("maximum", schema["maximum"], lambda v: v, (int, float), f"must be <= {schema['maximum']}"))
+    if "minLength" in schema:
+        checks.append(_bound_check("minLength", schema["minLength"], len, str, f"must have at least {schema['minLength']} characters"))
+    if "maxLength" in schema:
+        checks.append(_bound_check("maxLength", schema["maxLength"], len, str, f"must have at most {schema['maxLength']} characters"))
+    if "minItems" in schema:
+        checks.append(_bound_check("minItems", schema["minItems"], len, list, f"must have at least {schema['minItems']} items"))
+    if "maxItems" in schema:
+        checks.append(_bound_check("maxItems", schema["maxItems"], len, list, f"must have at most {schema['maxItems']} items"))
+
+    object_check = _object_check(schema)
+    if object_check is not None:
+        checks.append(object_check)
+    if isinstance(schema.get("items"), dict):
+        array_check = _array_check(schema["items"])
+        if array_check is not None:
+            checks.append(array_check)
+
+    if not checks:
+        return None
+    if len(checks) == 1:
+        return checks[0]
+    if len(checks) == 2:
+        first, second = checks
+
+        def check(value: Any) -> Optional[SchemaError]:
+            return first(value) or second(value)
+
+        return check
+
+    def check(value: Any) -> Optional[SchemaError]:
+        for single in checks:
+            error = single(value)
+            if error is not None:
+                return error
+        return None
+
+    return check
+
+
+def compile_validator(schema: Dict[str, Any]) -> Validator:
+    """
+    Compile a tool input schema into a validator function.
+
+    Args:
+        schema: Tool input_schema (JSON Schema object)
+
+    Returns:
+        Function returning the first SchemaError, or None if arguments are valid
+    """
+    check = _compile(schema)
+
+    if check is None:
+        return lambda arguments: None
+    return check
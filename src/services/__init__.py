@@ -3,5 +3,6 @@ Services module for MCP-AIDev
 """
 
 from .project_service import ProjectService
+from .async_project_service import AsyncProjectService
 
-__all__ = ["ProjectService"]
+__all__ = ["ProjectService", "AsyncProjectService"]
@@ -0,0 +1,127 @@
+"""
+Async facade over ProjectService for the event loop.
+
+Every method runs the synchronous ProjectService logic through
+`run_in_session`: on an AsyncSession (aiosqlite) the ORM code awaits the
+async driver, on a plain Session it runs in a worker thread. Either way the
+event loop stays free while the database works, and the business rules live
+in a single place.
+"""
+
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Any, Callable, Dict, List, Optional, Union
+
+from database.connection import run_in_session
+from .project_service import ProjectService
+
+
+class AsyncProjectService:
+    """
+    Awaitable counterpart of ProjectService.
+    """
+
+    def __init__(self, db: Union[AsyncSession, Session]):
+        """
+        Initialize service with database session.
+
+        Args:
+            db: AsyncSession (async mode) or SQLAlchemy Session
+        """
+        self.db = db
+
+    async def _run(self, call: Callable[[ProjectService], Any]) -> Any:
+        """Run a ProjectService call against the session"""
+        return await run_in_session(self.db, lambda session: call(ProjectService(session)))
+
+    async def create_project(self, name: str, description: str = None, preferences: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Async variant of ProjectService.create_project"""
+        return await self._run(lambda s: s.create_project(name, description, preferences))
+
+    async def save_phase(
+        self,
+        project_id: str,
+        phase_number: int,
+        title: str,
+        specs: Dict[str, Any],
+        expected_version: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Async variant of ProjectService.save_phase"""
+        return await self._run(lambda s: s.save_phase(project_id, phase_number, title, specs, expected_version))
+    
+    async def save_phases(self, project_id: str, phases: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Async variant of ProjectService.save_phases"""
+        return await self._run(lambda s: s.save_phases(project_id, phases))
+
+    async def get_phase(self, project_id: str, phase_number: int) -> Dict[str, Any]:
+        """Async variant of ProjectService.get_phase"""
+        return await self._run(lambda s: s.get_phase(project_id, phase_number))
+
+    async def update_progress(
+        self,
+        project_id: str,
+        phase_number: int,
+        status: str,
+        progress_data: Optional[Dict[str, Any]] = None,
+        expected_version: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """Async variant of ProjectService.update_progress"""
+        return await self._run(
+            lambda s: s.update_progress(project_id, phase_number, status, progress_data, expected_version)
+        )
+
+    async def list_projects(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Async variant of ProjectService.list_projects"""
+        return await self._run(lambda s: s.list_projects(limit, cursor))
+
+    async def list_projects_page(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """Async variant of ProjectService.list_projects_page"""
+        return await self._run(lambda s: s.list_projects_page(limit, cursor))
+
+    async def get_project_etag(self, project_id: str) -> str:
+        """Async variant of ProjectService.get_project_etag"""
+        return await self._run(lambda s: s.get_project_etag(project_id))
+
+    async def get_project_version(self, project_id: str) -> int:
+        """Async variant of ProjectService.get_project_version"""
+        return await self._run(lambda s: s.get_project_version(project_id))
+
+    async def get_project_details(self, project_id: str) -> Dict[str, Any]:
+        """Async variant of ProjectService.get_project_details"""
+        return await self._run(lambda s: s.get_project_details(project_id))
+
+    async def get_project_status(self, project_id: str) -> Dict[str, Any]:
+        """Async variant of ProjectService.get_project_status"""
+        return await self._run(lambda s: s.get_project_status(project_id))
+
+    async def list_project_phases(
+        self,
+        project_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
+        """Async variant of ProjectService.list_project_phases"""
+        return await self._run(lambda s: s.list_project_phases(project_id, limit, cursor))
+
+    async def list_project_phases_page(
+        self,
+        project_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Async variant of ProjectService.list_project_phases_page"""
+        return await self._run(lambda s: s.list_project_phases_page(project_id, limit, cursor))
+
+    async def get_current_phase(self, project_id: str) -> Optional[Dict[str, Any]]:
+        """Async variant of ProjectService.get_current_phase"""
+        return await self._run(lambda s: s.get_current_phase(project_id))
+
+    async def search_phases(
+        self,
+        query: str,
+        project_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Async variant of ProjectService.search_phases"""
+        return await self._run(lambda s: s.search_phases(query, project_id, limit, cursor))
@@ -0,0 +1,257 @@
+"""
+In-process read-through cache for hot project reads.
+
+Entries are keyed by (kind, project_id, ...) and bounded by both entry count
+(LRU eviction) and age (TTL). Writers invalidate after committing: the
+phases they wrote plus every project-level entry (status, phase listings,
+current phase). Each project also has a generation number, bumped on
+invalidation; a reader that started before a write never stores its result,
+so a slow read cannot put pre-commit data back into the cache. Generations
+are kept for the `max_entries` most recently written projects only: a
+forgotten project reads as the newest generation forgotten so far, which
+is still past any generation a reader of it may hold.
+
+The cache is per process. With several workers, a write made by another
+process is noticed through the project's version: reads that check the ETag
+first (every cached read tool does) report the version they saw with
+observe_version(), which drops the project's entries when it moved. Other
+reads see the write once their entries expire, so READ_CACHE_TTL_SECONDS
+bounds their staleness.
+"""
+import functools
+import inspect
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Set, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_MISSING = object()
+
+
+class ReadCache:
+    """
+    Thread-safe LRU + TTL cache with per-project invalidation.
+
+    Cached values are shared between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 60.0):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum number of entries; 0 disables caching
+            ttl_seconds: Maximum age of an entry in seconds
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+        self._keys_by_project: Dict[str, Set[Tuple]] = {}
+        self._generations: "OrderedDict[str, int]" = OrderedDict()
+        self._versions: "OrderedDict[str, int]" = OrderedDict()
+        self._clock = 0  # Last generation handed out, to any project
+        self._floor = 0  # Generation of projects not in _generations
+        self._epoch = 0  # Bumped by clear(), which affects every project
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    @classmethod
+    def from_env(cls) -> "ReadCache":
+        """Build a cache from READ_CACHE_* environment variables"""
+        defaults = cls()
+        return cls(
+            max_entries=int(os.getenv("READ_CACHE_MAX_ENTRIES", defaults.max_entries)),
+            ttl_seconds=float(os.getenv("READ_CACHE_TTL_SECONDS", defaults.ttl_seconds)),
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def get(self, key: Tuple) -> Any:
+        """
+        Look up an entry.
+
+        Args:
+            key: Cache key; key[1] is the project id
+
+        Returns:
+            Cached value, or the module's _MISSING sentinel
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= now:
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def generation(self, project_id: str) -> Tuple[int, int]:
+        """Current invalidation generation of a project"""
+        with self._lock:
+            return self._epoch, self._generations.get(project_id, self._floor)
+
+    def set(self, key: Tuple, value: Any, generation: Tuple[int, int]) -> None:
+        """
+        Store an entry unless the project was invalidated since `generation`.
+
+        Args:
+            key: Cache key; key[1] is the project id
+            value: Value to cache
+            generation: Result of generation() taken before the value was read
+        """
+        project_id = key[1]
+        expires_at = time.monotonic() + self.ttl_seconds
+        with self._lock:
+            if (self._epoch, self._generations.get(project_id, self._floor)) != generation:
+                return
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            self._keys_by_project.setdefault(project_id, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def invalidate(self, project_id: str, phase_numbers: Optional[Iterable[int]] = None) -> None:
+        """
+        Drop entries made stale by a write to a project.
+
+        Args:
+            project_id: Project that was written
+            phase_numbers: Phases that were written; get_phase entries of other
+                phases are kept. None drops every entry of the project.
+        """
+        keep = None
+        if phase_numbers is not None:
+            written = set(phase_numbers)
+            keep = lambda key: key[0] == "phase" and key[2] not in written
+        with self._lock:
+            self._clock += 1
+            self._generations[project_id] = self._clock
+            self._generations.move_to_end(project_id)
+            while len(self._generations) > self.max_entries:
+                _, forgotten = self._generations.popitem(last=False)
+                self._floor = max(self._floor, forgotten)
+            for key in list(self._keys_by_project.get(project_id, ())):
+                if keep is None or not keep(key):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def observe_version(self, project_id: str, version: int) -> None:
+        """
+        Record a project version read from the database.
+
+        Entries of the project are dropped when it is newer than the version
+        last observed (or none was), since they may predate a write made by
+        another process.
+
+        Args:
+            project_id: Project whose version was read
+            version: Project.version as just read
+        """
+        with self._lock:
+            known = self._versions.get(project_id)
+            if known is not None and version <= known:
+                return
+            self._versions[project_id] = version
+            self._versions.move_to_end(project_id)
+            while len(self._versions) > self.max_entries:
+                self._versions.popitem(last=False)
+        self.invalidate(project_id)
+
+    def clear(self) -> None:
+        """Drop every entry (e.g. after a bulk repair)"""
+        with self._lock:
+            self._epoch += 1
+            self.invalidations += len(self._entries)
+            self._entries.clear()
+            self._keys_by_project.clear()
+            self._generations.clear()
+            self._floor = self._clock
+            self._versions.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and configuration for monitoring"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def _remove(self, key: Tuple) -> None:
+        """Remove an entry; caller holds the lock"""
+        self._entries.pop(key, None)
+        keys = self._keys_by_project.get(key[1])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_project[key[1]]
+
+
+# Process-wide cache shared by every ProjectService
+read_cache = ReadCache.from_env()
+
+
+def cached_read(kind: str) -> Callable[[F], F]:
+    """
+    Serve a ProjectService read method through the service's cache.
+
+    The key is (kind, project_id, *other arguments), with arguments
+    normalized by the method signature so positional and keyword calls
+    share an entry. Exceptions are never cached. Reads inside
+    ProjectService.transaction() bypass the cache, since they can see
+    uncommitted data.
+
+    Args:
+        kind: Entry kind; "phase" entries are invalidated per phase number
+
+    Returns:
+        Decorator for methods whose first argument is project_id
+    """
+    def decorator(method: F) -> F:
+        signature = inspect.signature(method)
+
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            cache: Optional[ReadCache] = self.cache
+            if cache is None or not cache.enabled or self.in_transaction:
+                return method(self, *args, **kwargs)
+
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            key: Tuple[Hashable, ...] = (kind, *list(bound.arguments.values())[1:])
+            value = cache.get(key)
+            if value is not _MISSING:
+                return value
+
+            generation = cache.generation(key[1])
+            value = method(self, *args, **kwargs)
+            cache.set(key, value, generation)
+            return value
+        return wrapper
+    return decorator
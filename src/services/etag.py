@@ -0,0 +1,52 @@
+"""
+Entity tags for conditional reads.
+
+A project's ETag changes whenever the project or any of its phases changes:
+phase writes bump Project.version and Project.updated_at in the same
+transaction. Phase reads use their project's ETag.
+"""
+from datetime import datetime
+from typing import Optional
+
+
+# Read tools answered with 304 Not Modified when the project is unchanged
+CONDITIONAL_TOOLS = frozenset({
+    "get_phase", "get_project_status", "list_project_phases", "get_current_phase",
+})
+
+
+def make_etag(version: int, updated_at: datetime) -> str:
+    """
+    Build a strong ETag.
+
+    Args:
+        version: Project.version
+        updated_at: Project.updated_at
+
+    Returns:
+        Quoted ETag, e.g. "7-1718000000123456"
+    """
+    micros = int(updated_at.timestamp() * 1_000_000)
+    return f'"{version}-{micros}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Evaluate an If-None-Match header against the current ETag.
+
+    Args:
+        if_none_match: Header value: "*" or a comma-separated list of ETags
+        etag: Current ETag of the resource
+
+    Returns:
+        True if the client's copy is current
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == "*" or candidate == etag:
+            return True
+    return False
@@ -0,0 +1,349 @@
+"""
+In-process change feed of project and phase writes, served as Server-Sent
+Events.
+
+ProjectService publishes an event after each committed write; every open
+event stream subscribed to that project (or to all projects) receives it.
+Events carry the project's new version (see etag.py), so a client can tell
+whether its copy is current without another read.
+
+Event ids are "<epoch>-<sequence>", where the epoch identifies this process
+lifetime. The last `buffer_size` events are kept so a reconnecting client
+can resume with Last-Event-ID. When that is impossible (id from another
+process lifetime, or older than the buffer) the stream starts with a
+"reset" event instead: the client should re-read the state it cares about.
+
+The same feed lets get_project_status and get_current_phase park a call
+until the project's version moves past a known value (wait_for_version).
+
+The feed is per process. In single-writer mode (see writer.py) every write
+is made by the writer process, and each worker republishes the writer's
+events to its own subscribers.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Set, Union
+
+
+MEDIA_TYPE = "text/event-stream"
+
+# Seconds between keepalive comments on an idle stream; proxies such as
+# Render's close connections that stay silent for too long
+KEEPALIVE_SECONDS = 15.0
+
+# Reconnection delay suggested to EventSource clients, in milliseconds
+RETRY_MS = 3000
+
+# Read tools that accept wait_since / timeout (long polling)
+WAIT_TOOLS = frozenset({"get_project_status", "get_current_phase"})
+
+# Seconds a long-polling call waits by default, and at most; kept below the
+# idle timeout of proxies such as Render's
+DEFAULT_WAIT_SECONDS = 30.0
+MAX_WAIT_SECONDS = 60.0
+
+
+@dataclass(frozen=True)
+class Event:
+    """One published change"""
+
+    sequence: int
+    id: str
+    type: str  # "project.created", "phase.created", "phase.updated", "project.imported"
+    project_id: str
+    data: Dict[str, Any]
+
+
+class _Reset:
+    """Queue marker: the subscriber missed events and must re-read state"""
+
+
+RESET = _Reset()
+
+
+class Subscription:
+    """
+    Events of one stream, delivered to the event loop that opened it.
+
+    Publishers may run in any thread; events are handed over with
+    call_soon_threadsafe. A subscriber that falls `max_pending` events
+    behind has its queue replaced by a single reset.
+    """
+
+    def __init__(
+        self,
+        broker: "EventBroker",
+        project_id: Optional[str],
+        loop: asyncio.AbstractEventLoop,
+        max_pending: int
+    ):
+        self.broker = broker
+        self.project_id = project_id
+        self.loop = loop
+        self.max_pending = max_pending
+        self.queue: "asyncio.Queue[Union[Event, _Reset]]" = asyncio.Queue()
+
+    def wants(self, event: Event) -> bool:
+        """Whether the event belongs to this subscription"""
+        return self.project_id is None or event.project_id == self.project_id
+
+    def deliver(self, item: Union[Event, _Reset]) -> None:
+        """Queue an event (or a reset) from any thread"""
+        try:
+            self.loop.call_soon_threadsafe(self._put, item)
+        except RuntimeError:  # Loop closed: the stream is gone
+            self.broker.unsubscribe(self)
+
+    def _put(self, item: Union[Event, _Reset]) -> None:
+        """Queue an item; runs in the subscriber's event loop"""
+        if self.queue.qsize() >= self.max_pending:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            item = RESET
+        self.queue.put_nowait(item)
+
+    async def next(self, timeout: Optional[float] = None) -> Union[Event, _Reset, None]:
+        """
+        Wait for the next item.
+
+        Args:
+            timeout: Seconds to wait; None waits forever
+
+        Returns:
+            An Event, RESET, or None when the timeout expired
+        """
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        """Stop receiving events"""
+        self.broker.unsubscribe(self)
+
+
+class EventBroker:
+    """
+    Thread-safe publish/subscribe hub with a replay buffer.
+    """
+
+    def __init__(self, buffer_size: int = 1000, max_pending: int = 1000):
+        """
+        Initialize a broker with no subscribers.
+
+        Args:
+            buffer_size: Recent events kept for Last-Event-ID resumption
+            max_pending: Undelivered events a subscriber may accumulate
+                before it is reset
+        """
+        self.buffer_size = buffer_size
+        self.max_pending = max_pending
+        self.epoch = format(time.time_ns() // 1000, "x")
+        self._sequence = 0
+        self._buffer: Deque[Event] = deque(maxlen=buffer_size)
+        self._subscribers: Set[Subscription] = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.resets = 0
+
+    @classmethod
+    def from_env(cls) -> "EventBroker":
+        """Build a broker from EVENTS_* environment variables"""
+        defaults = cls()
+        return cls(
+            buffer_size=int(os.getenv("EVENTS_BUFFER_SIZE", defaults.buffer_size)),
+            max_pending=int(os.getenv("EVENTS_MAX_PENDING", defaults.max_pending)),
+        )
+
+    @property
+    def last_event_id(self) -> str:
+        """Id of the latest event (or of the start of this process)"""
+        with self._lock:
+            return f"{self.epoch}-{self._sequence}"
+
+    def publish(self, event_type: str, project_id: str, data: Dict[str, Any]) -> Event:
+        """
+        Record an event and deliver it to matching subscribers.
+
+        Args:
+            event_type: Event name, e.g. "phase.updated"
+            project_id: Project the event is about
+            data: JSON-serializable payload
+
+        Returns:
+            The published Event
+        """
+        with self._lock:
+            self._sequence += 1
+            event = Event(
+                sequence=self._sequence,
+                id=f"{self.epoch}-{self._sequence}",
+                type=event_type,
+                project_id=project_id,
+                data=data,
+            )
+            self._buffer.append(event)
+            self.published += 1
+            subscribers = [sub for sub in self._subscribers if sub.wants(event)]
+        for subscriber in subscribers:
+            subscriber.deliver(event)
+        return event
+
+    def subscribe(
+        self,
+        project_id: Optional[str] = None,
+        last_event_id: Optional[str] = None
+    ) -> Subscription:
+        """
+        Open a subscription in the running event loop.
+
+        Args:
+            project_id: Only receive this project's events; None for all
+            last_event_id: Id of the last event the client saw; newer
+                buffered events are queued first
+
+        Returns:
+            Subscription whose queue already holds any replayed events (or
+            a reset when they cannot be replayed)
+        """
+        subscription = Subscription(self, project_id, asyncio.get_running_loop(), self.max_pending)
+        with self._lock:
+            replay = self._replay(subscription, last_event_id)
+            self._subscribers.add(subscription)
+        if replay is None:
+            self.resets += 1
+            subscription.queue.put_nowait(RESET)
+        else:
+            for event in replay:
+                subscription.queue.put_nowait(event)
+        return subscription
+
+    def _replay(self, subscription: Subscription, last_event_id: Optional[str]) -> Optional[List[Event]]:
+        """Buffered events after last_event_id, or None if some are lost; caller holds the lock"""
+        if not last_event_id:
+            return []
+        epoch, _, sequence = last_event_id.partition("-")
+        if epoch != self.epoch or not sequence.isdigit():
+            return None
+        after = int(sequence)
+        if after > self._sequence:
+            return None
+        if after < self._sequence and (not self._buffer or self._buffer[0].sequence > after + 1):
+            return None
+        return [event for event in self._buffer if event.sequence > after and subscription.wants(event)]
+
+    def reset_subscribers(self) -> None:
+        """
+        Tell every subscriber to re-read its state.
+
+        Used when events may have been lost upstream (see services.writer).
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+            self.resets += len(subscribers)
+        for subscriber in subscribers:
+            subscriber.deliver(RESET)
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """Remove a subscription (idempotent)"""
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "published": self.published,
+                "buffered": len(self._buffer),
+                "buffer_size": self.buffer_size,
+                "resets": self.resets,
+                "last_event_id": f"{self.epoch}-{self._sequence}",
+            }
+
+
+# Process-wide broker fed by every ProjectService
+event_broker = EventBroker.from_env()
+
+
+def format_event(item: Union[Event, _Reset], broker: EventBroker) -> bytes:
+    """
+    Encode an item as an SSE frame.
+
+    A reset carries the broker's latest id, so a client reconnecting after
+    it resumes from there instead of being reset again.
+    """
+    if isinstance(item, _Reset):
+        return f"id: {broker.last_event_id}\nevent: reset\ndata: {{}}\n\n".encode()
+    data = json.dumps({"project_id": item.project_id, **item.data}, separators=(",", ":"))
+    return f"id: {item.id}\nevent: {item.type}\ndata: {data}\n\n".encode()
+
+
+async def wait_for_version(subscription: Subscription, since: int, timeout: float) -> bool:
+    """
+    Park until the subscription's project moves past a version.
+
+    The caller subscribes before reading the current version, so a write
+    committed in between is already queued and not missed.
+
+    Args:
+        subscription: Subscription to the project
+        since: Version the client already has
+        timeout: Seconds to wait at most
+
+    Returns:
+        True if the project changed (or events were lost, so it may have),
+        False when the timeout expired
+    """
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while True:
+        remaining = deadline - loop.time()
+        if remaining <= 0:
+            return False
+        item = await subscription.next(remaining)
+        if item is None:
+            return False
+        # project.imported carries no version: assume it changed
+        if isinstance(item, _Reset) or item.data.get("version", since + 1) > since:
+            return True
+
+
+async def sse_stream(
+    broker: EventBroker,
+    project_id: Optional[str] = None,
+    last_event_id: Optional[str] = None,
+    keepalive: float = KEEPALIVE_SECONDS
+) -> AsyncIterator[bytes]:
+    """
+    Stream a subscription as Server-Sent Events until the client leaves.
+
+    The subscription is opened when the stream is first iterated, not when
+    it is created, so a response whose body is never sent leaks nothing;
+    events published in between are replayed after last_event_id.
+
+    Args:
+        broker: Broker to subscribe to
+        project_id: Only stream this project's events; None for all
+        last_event_id: Id of the last event the client saw
+        keepalive: Seconds of silence before a keepalive comment
+
+    Yields:
+        SSE frames
+    """
+    subscription = broker.subscribe(project_id, last_event_id)
+    try:
+        yield f"retry: {RETRY_MS}\n\n".encode()
+        while True:
+            item = await subscription.next(keepalive)
+            if item is None:
+                yield b": keepalive\n\n"
+            else:
+                yield format_event(item, subscription.broker)
+    finally:
+        subscription.close()
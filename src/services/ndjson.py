@@ -0,0 +1,263 @@
+"""
+Newline-delimited JSON (NDJSON) export format.
+
+An export is one JSON object per line. The first line is a header naming
+the format version; then each project is followed by its phases:
+
+    {"type": "export", "version": 1, "exported_at": "..."}
+    {"type": "project", "project_id": "...", "name": "...", ...}
+    {"type": "phase", "project_id": "...", "phase_number": 1, ...}
+
+NDJSONImporter reads the same format back.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from database.models import generate_uuid, utcnow
+from mcp.encoding import dumps, loads
+from .project_service import ProjectService
+
+
+# Version written in the header line
+EXPORT_FORMAT_VERSION = 1
+
+MEDIA_TYPE = "application/x-ndjson"
+
+# Lines are yielded in chunks of about this many bytes
+CHUNK_SIZE = 64 * 1024
+
+# Rows written per executemany when importing
+IMPORT_CHUNK_SIZE = 1000
+
+# Rows per import transaction, buffered in memory until written; an error
+# rolls back only the current one
+IMPORT_TRANSACTION_ROWS = 2_000
+
+
+def export_header() -> Dict[str, Any]:
+    """Header record of an export"""
+    return {"type": "export", "version": EXPORT_FORMAT_VERSION, "exported_at": utcnow().isoformat()}
+
+
+def iter_ndjson(records: Iterable[Dict[str, Any]], chunk_size: int = CHUNK_SIZE) -> Iterator[bytes]:
+    """
+    Encode records as NDJSON, batching lines into chunks.
+
+    Only one chunk is held in memory at a time, and each chunk is a single
+    write to the client instead of one per record.
+
+    Args:
+        records: Records to encode
+        chunk_size: Approximate chunk size in bytes
+
+    Yields:
+        UTF-8 encoded chunks of complete lines
+    """
+    chunk = bytearray()
+    for record in records:
+        chunk += dumps(record)
+        chunk += b"\n"
+        if len(chunk) >= chunk_size:
+            yield bytes(chunk)
+            chunk.clear()
+    if chunk:
+        yield bytes(chunk)
+
+
+def _timestamp(record: Dict[str, Any], key: str, line_number: int) -> datetime:
+    """Parse an ISO 8601 timestamp of a record, defaulting to now"""
+    value = record.get(key)
+    if value is None:
+        return utcnow()
+    try:
+        return datetime.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Line {line_number}: invalid {key} {value!r}")
+
+
+def _version(record: Dict[str, Any], line_number: int) -> int:
+    """Version of a record; 1 for exports made before versions existed"""
+    value = record.get("version", 1)
+    if not isinstance(value, int) or isinstance(value, bool) or value < 1:
+        raise ValueError(f"Line {line_number}: version must be a positive integer")
+    return value
+
+
+def _require(record: Dict[str, Any], keys: Iterable[str], line_number: int) -> None:
+    """Raise ValueError naming the first missing key of a record"""
+    for key in keys:
+        if record.get(key) is None:
+            raise ValueError(f"Line {line_number}: {record['type']} record without '{key}'")
+
+
+class NDJSONImporter:
+    """
+    Incremental import of an export stream.
+    
+    feed() takes raw bytes as they arrive and parses complete lines into
+    pending rows. Once `transaction_rows` rows are pending (ready), flush()
+    writes them with one executemany per table and chunk and commits, all
+    in one call: no write transaction stays open while the caller waits for
+    more of the stream, so a slow upload never holds the database lock.
+    Memory holds at most one transaction's worth of rows, whatever the size
+    of the stream.
+    """
+    
+    def __init__(
+        self,
+        upsert: bool = False,
+        chunk_size: int = IMPORT_CHUNK_SIZE,
+        transaction_rows: int = IMPORT_TRANSACTION_ROWS
+    ):
+        """
+        Initialize the importer.
+        
+        Args:
+            upsert: Update existing projects and phases instead of failing
+            chunk_size: Rows per executemany
+            transaction_rows: Rows per transaction
+        """
+        self.upsert = upsert
+        self.chunk_size = chunk_size
+        self.transaction_rows = transaction_rows
+        self.line_number = 0
+        self.committed = {"projects": 0, "phases": 0}
+        self.transactions = 0
+        self._buffer = b""
+        self._projects: List[Dict[str, Any]] = []
+        self._phases: List[Dict[str, Any]] = []
+        self._first_line: Optional[int] = None
+    
+    @property
+    def ready(self) -> bool:
+        """Whether a full transaction of rows is waiting to be flushed"""
+        return len(self._projects) + len(self._phases) >= self.transaction_rows
+    
+    def feed(self, data: bytes) -> None:
+        """
+        Parse the complete lines of a piece of the stream.
+        
+        Args:
+            data: Next bytes of the stream; a partial last line is kept
+                until the next call
+            
+        Raises:
+            ValueError: If a line is not a valid record
+        """
+        lines = (self._buffer + data).split(b"\n")
+        self._buffer = lines.pop()
+        for line in lines:
+            self._parse_line(line)
+    
+    def close(self) -> None:
+        """
+        Parse the final line, which may lack a trailing newline.
+        
+        Raises:
+            ValueError: If the line is not a valid record, or the stream had
+                no header
+        """
+        buffer, self._buffer = self._buffer, b""
+        self._parse_line(buffer)
+        if self.line_number == 0:
+            raise ValueError("Empty import")
+    
+    def _parse_line(self, line: bytes) -> None:
+        """Validate one line and queue its row"""
+        if not line.strip():
+            return
+        self.line_number += 1
+        number = self.line_number
+        try:
+            record = loads(line)
+        except ValueError as e:
+            raise ValueError(f"Line {number}: invalid JSON ({e})")
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {number}: expected a JSON object")
+        
+        kind = record.get("type")
+        if number == 1:
+            if kind != "export":
+                raise ValueError("Line 1: expected the export header")
+            if record.get("version") != EXPORT_FORMAT_VERSION:
+                raise ValueError(f"Line 1: unsupported export version {record.get('version')!r}")
+            return
+        
+        if self._first_line is None:
+            self._first_line = number
+        if kind == "project":
+            _require(record, ("project_id", "name"), number)
+            self._projects.append({
+                "id": record["project_id"],
+                "name": record["name"],
+                "description": record.get("description"),
+                "status": record.get("status") or "active",
+                "preferences": record.get("preferences"),
+                "version": _version(record, number),
+                "created_at": _timestamp(record, "created_at", number),
+                "updated_at": _timestamp(record, "updated_at", number)
+            })
+        elif kind == "phase":
+            _require(record, ("project_id", "phase_number", "title", "specs"), number)
+            if not isinstance(record["phase_number"], int) or isinstance(record["phase_number"], bool):
+                raise ValueError(f"Line {number}: phase_number must be an integer")
+            self._phases.append({
+                "id": record.get("phase_id") or generate_uuid(),
+                "project_id": record["project_id"],
+                "phase_number": record["phase_number"],
+                "title": record["title"],
+                "specs": record["specs"],
+                "status": record.get("status") or "planned",
+                "progress_data": record.get("progress_data"),
+                "version": _version(record, number),
+                "created_at": _timestamp(record, "created_at", number),
+                "updated_at": _timestamp(record, "updated_at", number)
+            })
+        elif kind == "export":
+            raise ValueError(f"Line {number}: unexpected export header")
+        else:
+            raise ValueError(f"Line {number}: unknown record type {kind!r}")
+    
+    def flush(self, db: Session) -> None:
+        """
+        Write the pending rows and commit them as one transaction.
+        
+        Pending projects are written before pending phases, so a phase may
+        refer to a project earlier in the same stream.
+        
+        Args:
+            db: Sync database session (see database.connection.run_in_session)
+            
+        Raises:
+            ValueError: If rows could not be written; the transaction is
+                rolled back and `committed` counts what was imported before it
+        """
+        service = ProjectService(db)
+        projects, self._projects = self._projects, []
+        phases, self._phases = self._phases, []
+        first_line, self._first_line = self._first_line, None
+        if not projects and not phases:
+            return
+        try:
+            for start in range(0, len(projects), self.chunk_size):
+                service.import_rows(projects[start:start + self.chunk_size], [], self.upsert)
+            for start in range(0, len(phases), self.chunk_size):
+                service.import_rows([], phases[start:start + self.chunk_size], self.upsert)
+            service.commit_import({row["id"] for row in projects} | {row["project_id"] for row in phases})
+        except ValueError as e:
+            db.rollback()
+            lines = f"Line {first_line}" if first_line == self.line_number else f"Lines {first_line}-{self.line_number}"
+            raise ValueError(f"{lines}: {e}")
+        except Exception:
+            db.rollback()
+            raise
+        self.transactions += 1
+        self.committed["projects"] += len(projects)
+        self.committed["phases"] += len(phases)
+    
+    def rollback(self, db: Session) -> None:
+        """Discard the current transaction and any pending rows"""
+        db.rollback()
+        self._projects, self._phases = [], []
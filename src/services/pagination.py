@@ -0,0 +1,70 @@
+"""
+Keyset pagination helpers.
+
+Cursors are opaque to clients: a URL-safe base64 encoding of a small JSON
+object that records the kind of listing and the key of the last row served.
+"""
+import base64
+import binascii
+import json
+from typing import Any, Optional
+
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+
+def clamp_limit(limit: Optional[int]) -> int:
+    """
+    Normalize a requested page size.
+
+    Args:
+        limit: Requested page size or None for the default
+
+    Returns:
+        Page size between 1 and MAX_PAGE_SIZE
+    """
+    if limit is None:
+        return DEFAULT_PAGE_SIZE
+    return max(1, min(int(limit), MAX_PAGE_SIZE))
+
+
+def encode_cursor(kind: str, **key: Any) -> str:
+    """
+    Build an opaque cursor.
+
+    Args:
+        kind: Listing the cursor belongs to (e.g. "projects", "phases")
+        **key: Keyset values of the last row returned
+
+    Returns:
+        URL-safe cursor string
+    """
+    payload = json.dumps({"k": kind, **key}, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, kind: str, field: str) -> Any:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Args:
+        cursor: Cursor string received from a client
+        kind: Expected listing kind
+        field: Keyset field to extract
+
+    Returns:
+        Value of the keyset field stored in the cursor
+
+    Raises:
+        ValueError: If the cursor is malformed or belongs to another listing
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, ValueError, UnicodeDecodeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    if not isinstance(payload, dict) or payload.get("k") != kind or field not in payload:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return payload[field]
@@ -2,10 +2,55 @@
 Business logic layer for project and phase management.
 """
 
-from sqlalchemy.orm import Session
-from typing import Dict, Any, List, Optional
+from contextlib import contextmanager
+from sqlalchemy import select, update, and_, or_, cast, Text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session, aliased, undefer, undefer_group
+from typing import Collection, Dict, Any, Iterator, List, Optional, Tuple
 
-from database.models import Project, Phase
+from database.counters import refresh_counters, repair_counters
+from database.models import Project, Phase, PAYLOAD
+from database.search import index_phases, match_phases, phase_document, write_documents
+from database.sqlite import retry_on_lock
+from database.upsert import import_phases, import_projects, upsert_phases, UPSERT_CHUNK_SIZE
+from .cache import ReadCache, cached_read, read_cache
+from .events import EventBroker, event_broker
+from .etag import make_etag
+from .pagination import clamp_limit, encode_cursor, decode_cursor
+
+
+# Rows fetched per round trip when streaming an export; phase rows carry
+# full specs (often 10-50 KB), so a batch holds a few MB at most
+EXPORT_BATCH_SIZE = 200
+
+# Default page size of search_phases
+SEARCH_PAGE_SIZE = 20
+
+# Whether a phase has progress data, evaluated in SQL so the JSON is not loaded
+HAS_PROGRESS_DATA = and_(
+    Phase.progress_data.is_not(None),
+    cast(Phase.progress_data, Text) != "null",
+).label("has_progress_data")
+
+
+class VersionConflict(ValueError):
+    """
+    A write's expected_version did not match the phase's current version.
+    
+    Attributes:
+        expected_version: Version the caller based its write on
+        current_version: Version found (0 if the phase does not exist)
+    """
+    
+    def __init__(self, project_id: str, phase_number: int, expected_version: int, current_version: int):
+        super().__init__(
+            f"Version conflict on phase {phase_number} of project {project_id}: "
+            f"expected version {expected_version}, current version {current_version}"
+        )
+        self.phase_number = phase_number
+        self.expected_version = expected_version
+        self.current_version = current_version
 
 
 class ProjectService:
@@ -13,15 +58,237 @@ class ProjectService:
     Service class for managing projects and phases.
     """
     
-    def __init__(self, db: Session):
+    def __init__(
+        self,
+        db: Session,
+        cache: Optional[ReadCache] = read_cache,
+        events: Optional[EventBroker] = event_broker
+    ):
         """
         Initialize service with database session.
         
         Args:
             db: SQLAlchemy database session
+            cache: Read-through cache for hot reads (process-wide by
+                default); None disables caching
+            events: Change feed notified of committed writes (process-wide
+                by default); None disables events
         """
         self.db = db
+        self.cache = cache
+        self.events = events
+        self.in_transaction = False
+        self._pending_invalidations: List[Tuple[str, Optional[List[int]]]] = []
+        self._pending_events: List[Tuple[str, str, Dict[str, Any]]] = []
+    
+    @contextmanager
+    def transaction(self):
+        """
+        Group several service calls into one database transaction.
+        
+        Inside the block, write methods flush instead of committing; the
+        block commits once on exit and rolls everything back on error.
+        """
+        self.in_transaction = True
+        committed = False
+        try:
+            yield self
+            self.db.commit()
+            committed = True
+        except Exception:
+            self.db.rollback()
+            raise
+        finally:
+            self.in_transaction = False
+            pending, self._pending_invalidations = self._pending_invalidations, []
+            for project_id, phase_numbers in pending:
+                self._invalidate(project_id, phase_numbers)
+            events, self._pending_events = self._pending_events, []
+            if committed:
+                for event in events:
+                    self._publish(*event)
+    
+    def _commit(self) -> None:
+        """Commit, or only flush when running inside transaction()"""
+        if self.in_transaction:
+            self.db.flush()
+        else:
+            self.db.commit()
+    
+    def _invalidate(self, project_id: str, phase_numbers: Optional[List[int]] = None) -> None:
+        """Drop cached reads made stale by a committed write"""
+        if self.cache is None:
+            return
+        if self.in_transaction:
+            # Applied once transaction() has committed
+            self._pending_invalidations.append((project_id, phase_numbers))
+        else:
+            self.cache.invalidate(project_id, phase_numbers)
+    
+    def _publish(self, event_type: str, project_id: str, data: Dict[str, Any]) -> None:
+        """Notify the change feed of a committed write"""
+        if self.events is None:
+            return
+        if self.in_transaction:
+            # Published once transaction() has committed; dropped on rollback
+            self._pending_events.append((event_type, project_id, data))
+        else:
+            self.events.publish(event_type, project_id, data)
+    
+    def _publish_phases(self, project: Row, phases: List[Phase]) -> None:
+        """Publish phase.created / phase.updated for saved phases"""
+        for phase in phases:
+            # Upserts set both timestamps on insert and only updated_at on update
+            created = phase.created_at == phase.updated_at
+            self._publish("phase.created" if created else "phase.updated", phase.project_id, {
+                "phase_id": phase.id,
+                "phase_number": phase.phase_number,
+                "title": phase.title,
+                "status": phase.status,
+                "phase_version": phase.version,
+                "version": project.version
+            })
+    
+    def _rollback(self) -> None:
+        """Roll back a failed write, unless transaction() owns the rollback"""
+        if not self.in_transaction:
+            self.db.rollback()
+    
+    def _lock_project(self, project_id: str) -> None:
+        """
+        Serialize phase writes to one project on PostgreSQL.
+        
+        refresh_counters recomputes the counters with subqueries that read
+        the snapshot taken when the UPDATE starts. Under READ COMMITTED, two
+        transactions writing different phases of one project would each
+        miss the other's phase: the second UPDATE waits for the first's row
+        lock, then re-applies its SET with counts from its older snapshot,
+        and the counters drift. Locking the project row before the phase
+        write makes the second writer wait up front, so its statements run
+        on snapshots that include the first writer's commit. SQLite needs
+        no lock: it already serializes writers on the database file.
+        
+        Args:
+            project_id: UUID of the project about to be written
+        """
+        if self.db.get_bind().dialect.name == "postgresql":
+            self.db.execute(select(Project.id).where(Project.id == project_id).with_for_update())
+    
+    def _refresh_counters(self, project_id: str) -> Row:
+        """
+        Recompute a project's counters after a phase write.
+        
+        The UPDATE doubles as the project existence check: no matched row
+        means the project does not exist.
+        
+        Returns:
+            Row with the project's new version (for events) and its name and
+            description (for the search index)
+            
+        Raises:
+            ValueError: If project not found
+        """
+        project = self.db.execute(
+            refresh_counters(project_id).returning(Project.version, Project.name, Project.description)
+        ).first()
+        if project is None:
+            self._rollback()
+            raise ValueError(f"Project {project_id} not found")
+        return project
     
+    def _version_conflict(
+        self,
+        project_id: str,
+        phase_number: int,
+        expected_version: int,
+        current_version: Optional[int] = None
+    ) -> VersionConflict:
+        """
+        Roll back a write that failed its expected_version check.
+        
+        Args:
+            project_id: UUID of the project
+            phase_number: Phase number written
+            expected_version: Version the caller expected
+            current_version: Version found, if already known; read from the
+                database otherwise
+            
+        Returns:
+            VersionConflict to raise
+        """
+        if current_version is None:
+            current_version = self.db.scalar(
+                select(Phase.version).where(Phase.project_id == project_id, Phase.phase_number == phase_number)
+            ) or 0
+        self._rollback()
+        return VersionConflict(project_id, phase_number, expected_version, current_version)
+    
+    def _upsert_phases(
+        self,
+        project_id: str,
+        phases: List[Dict[str, Any]],
+        expected_version: Optional[int] = None
+    ) -> Tuple[Row, List[Phase]]:
+        """
+        Insert or update phases by phase number and refresh counters.
+        
+        Args:
+            project_id: UUID of the project
+            phases: List of dictionaries with phase_number, title and specs
+            expected_version: Compare-and-swap for a single phase: its
+                current version, or 0 if it must not exist yet
+            
+        Returns:
+            Project row from _refresh_counters and the saved Phase objects,
+            as returned by the database
+            
+        Raises:
+            ValueError: If project not found
+            VersionConflict: If the phase is not at expected_version
+        """
+        dialect = self.db.get_bind().dialect.name
+        self._lock_project(project_id)
+        saved = []
+        try:
+            for start in range(0, len(phases), UPSERT_CHUNK_SIZE):
+                chunk = phases[start:start + UPSERT_CHUNK_SIZE]
+                saved.extend(self.db.scalars(
+                    upsert_phases(dialect, project_id, chunk, expected_version),
+                    execution_options={"populate_existing": True}
+                ).all())
+        except IntegrityError as e:
+            # PostgreSQL enforces the project foreign key on insert
+            if "foreign key" not in str(e.orig).lower():
+                raise
+            self._rollback()
+            raise ValueError(f"Project {project_id} not found")
+        
+        if expected_version is not None:
+            phase_number = phases[0]["phase_number"]
+            if not saved:
+                # The conflict clause skipped a phase at another version
+                raise self._version_conflict(project_id, phase_number, expected_version)
+            if saved[0].version == 1 and expected_version != 0:
+                # Inserted: the phase the caller expected did not exist, or
+                # (on SQLite, which does not enforce the foreign key) the project
+                if self.db.scalar(select(Project.id).where(Project.id == project_id)) is None:
+                    self._rollback()
+                    raise ValueError(f"Project {project_id} not found")
+                raise self._version_conflict(project_id, phase_number, expected_version, 0)
+        
+        project = self._refresh_counters(project_id)
+        # Saved phases do not load the deferred specs; index the input values
+        phase_ids = {phase.phase_number: phase.id for phase in saved}
+        write_documents(self.db, [
+            {
+                "phase_id": phase_ids[phase["phase_number"]],
+                **phase_document(phase["title"], phase["specs"], project.name, project.description)
+            }
+            for phase in phases
+        ])
+        return project, saved
+    
+    @retry_on_lock()
     def create_project(self, name: str, description: str = None, preferences: Dict[str, Any] = None) -> Dict[str, Any]:
         """
         Create a new project.
@@ -36,8 +303,8 @@ class ProjectService:
         """
         project = Project(name=name, description=description, preferences=preferences)
         self.db.add(project)
-        self.db.commit()
-        self.db.refresh(project)
+        self._commit()
+        self._publish("project.created", project.id, {"name": project.name, "version": project.version})
         
         return {
             "project_id": project.id,
@@ -45,16 +312,19 @@ class ProjectService:
             "description": project.description,
             "preferences": project.preferences,
             "status": project.status,
+            "version": project.version,
             "created_at": project.created_at.isoformat(),
             "message": f"Project '{name}' created successfully"
         }
     
+    @retry_on_lock()
     def save_phase(
         self,
         project_id: str,
         phase_number: int,
         title: str,
-        specs: Dict[str, Any]
+        specs: Dict[str, Any],
+        expected_version: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Save phase specifications for a project.
@@ -64,38 +334,23 @@ class ProjectService:
             phase_number: Phase number (1, 2, 3, etc.)
             title: Phase title
             specs: Dictionary containing phase specifications
+            expected_version: Optional compare-and-swap: the phase's current
+                version, or 0 to only create it
             
         Returns:
             Dictionary with phase info and success message
+            
+        Raises:
+            ValueError: If project not found
+            VersionConflict: If the phase is not at expected_version
         """
-        # Verify project exists
-        project = self.db.query(Project).filter_by(id=project_id).first()
-        if not project:
-            raise ValueError(f"Project {project_id} not found")
-        
-        # Check if phase already exists
-        existing = self.db.query(Phase).filter_by(
-            project_id=project_id,
-            phase_number=phase_number
-        ).first()
-        
-        if existing:
-            # Update existing phase
-            existing.title = title
-            existing.specs = specs
-            phase = existing
-        else:
-            # Create new phase
-            phase = Phase(
-                project_id=project_id,
-                phase_number=phase_number,
-                title=title,
-                specs=specs
-            )
-            self.db.add(phase)
-        
-        self.db.commit()
-        self.db.refresh(phase)
+        project, saved = self._upsert_phases(project_id, [
+            {"phase_number": phase_number, "title": title, "specs": specs}
+        ], expected_version)
+        self._commit()
+        self._invalidate(project_id, [phase_number])
+        self._publish_phases(project, saved)
+        phase = saved[0]
         
         return {
             "phase_id": phase.id,
@@ -103,9 +358,58 @@ class ProjectService:
             "phase_number": phase.phase_number,
             "title": phase.title,
             "status": phase.status,
+            "version": phase.version,
             "message": f"Phase {phase_number} saved successfully"
         }
     
+    @retry_on_lock()
+    def save_phases(self, project_id: str, phases: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Save a whole plan of phases with one upsert statement.
+        
+        Phases are inserted, or updated in place when their phase number
+        already exists, with INSERT ... ON CONFLICT DO UPDATE.
+        
+        Args:
+            project_id: UUID of the project
+            phases: List of dictionaries with phase_number, title and specs
+            
+        Returns:
+            Dictionary with the saved phases and success message
+            
+        Raises:
+            ValueError: If project not found or the plan is invalid
+        """
+        if not phases:
+            raise ValueError("No phases to save")
+        for index, phase in enumerate(phases):
+            for key in ("phase_number", "title", "specs"):
+                if key not in phase:
+                    raise ValueError(f"Phase at index {index} is missing '{key}'")
+        numbers = [phase["phase_number"] for phase in phases]
+        if len(set(numbers)) != len(numbers):
+            raise ValueError("Duplicate phase_number in phases")
+        
+        project, saved = self._upsert_phases(project_id, phases)
+        self._commit()
+        self._invalidate(project_id, numbers)
+        self._publish_phases(project, saved)
+        
+        return {
+            "project_id": project_id,
+            "phases": [
+                {
+                    "phase_id": phase.id,
+                    "phase_number": phase.phase_number,
+                    "status": phase.status,
+                    "version": phase.version
+                }
+                for phase in sorted(saved, key=lambda phase: phase.phase_number)
+            ],
+            "message": f"{len(saved)} phases saved successfully"
+        }
+    
+    @cached_read("phase")
     def get_phase(self, project_id: str, phase_number: int) -> Dict[str, Any]:
         """
         Retrieve phase specifications.
@@ -120,7 +424,7 @@ class ProjectService:
         Raises:
             ValueError: If phase not found
         """
-        phase = self.db.query(Phase).filter_by(
+        phase = self.db.query(Phase).options(undefer_group(PAYLOAD)).filter_by(
             project_id=project_id,
             phase_number=phase_number
         ).first()
@@ -136,16 +440,19 @@ class ProjectService:
             "specs": phase.specs,
             "status": phase.status,
             "progress_data": phase.progress_data,
+            "version": phase.version,
             "created_at": phase.created_at.isoformat(),
             "updated_at": phase.updated_at.isoformat()
         }
     
+    @retry_on_lock()
     def update_progress(
         self,
         project_id: str,
         phase_number: int,
         status: str,
-        progress_data: Optional[Dict[str, Any]] = None
+        progress_data: Optional[Dict[str, Any]] = None,
+        expected_version: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Update phase progress after implementation.
@@ -155,80 +462,265 @@ class ProjectService:
             phase_number: Phase number to update
             status: New status (in_progress, completed)
             progress_data: Optional dictionary with progress information
+            expected_version: Optional compare-and-swap: only update the
+                phase if it is still at this version
             
         Returns:
             Dictionary with updated phase info
             
         Raises:
             ValueError: If phase not found
+            VersionConflict: If the phase is not at expected_version
         """
-        phase = self.db.query(Phase).filter_by(
-            project_id=project_id,
-            phase_number=phase_number
+        values = {"status": status, "version": Phase.version + 1}
+        if progress_data:
+            values["progress_data"] = progress_data
+        
+        self._lock_project(project_id)
+        stmt = update(Phase).where(Phase.project_id == project_id, Phase.phase_number == phase_number)
+        if expected_version is not None:
+            stmt = stmt.where(Phase.version == expected_version)
+        phase = self.db.scalars(
+            stmt.values(**values)
+            .returning(Phase)
+            .options(undefer(Phase.progress_data)),
+            execution_options={"populate_existing": True}
         ).first()
         
         if not phase:
+            if expected_version is not None:
+                conflict = self._version_conflict(project_id, phase_number, expected_version)
+                if conflict.current_version:
+                    raise conflict
             raise ValueError(f"Phase {phase_number} not found for project {project_id}")
         
-        phase.status = status
-        if progress_data:
-            phase.progress_data = progress_data
-        
-        self.db.commit()
-        self.db.refresh(phase)
+        project = self._refresh_counters(project_id)
+        self._commit()
+        self._invalidate(project_id, [phase_number])
+        self._publish("phase.updated", project_id, {
+            "phase_id": phase.id,
+            "phase_number": phase.phase_number,
+            "title": phase.title,
+            "status": phase.status,
+            "phase_version": phase.version,
+            "version": project.version
+        })
         
         return {
             "phase_id": phase.id,
             "phase_number": phase.phase_number,
             "status": phase.status,
+            "version": phase.version,
             "progress_data": phase.progress_data,
             "message": f"Phase {phase_number} progress updated to '{status}'"
         }
     
-    def list_projects(self) -> List[Dict[str, Any]]:
+    def list_projects(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> List[Dict[str, Any]]:
         """
-        List all projects with phase statistics.
+        List projects with phase statistics, ordered by (created_at, id).
+        
+        Statistics come from the denormalized counters on each project and
+        the current phase is joined by primary key, so phases (and their
+        specs) are never scanned.
+        
+        Args:
+            limit: Optional maximum number of projects to return
+            cursor: Optional cursor from list_projects_page; only projects
+                after it are returned
         
         Returns:
             List of project dictionaries with phase statistics
+            
+        Raises:
+            ValueError: If the cursor is invalid
         """
-        projects = self.db.query(Project).all()
+        current = aliased(Phase)
+        
+        stmt = (
+            select(
+                Project.id,
+                Project.name,
+                Project.description,
+                Project.status,
+                Project.created_at,
+                Project.phases_total,
+                Project.phases_completed,
+                Project.phases_in_progress,
+                Project.phases_planned,
+                current.phase_number.label("current_number"),
+                current.title.label("current_title"),
+                current.status.label("current_status"),
+            )
+            .outerjoin(
+                current,
+                and_(
+                    current.project_id == Project.id,
+                    current.phase_number == Project.current_phase_number,
+                ),
+            )
+            .order_by(Project.created_at, Project.id)
+        )
+        
+        if cursor:
+            # Compare against the anchor row inside the database so the
+            # keyset works regardless of how timestamps are stored
+            after_id = decode_cursor(cursor, "projects", "id")
+            anchor = select(Project.created_at).where(Project.id == after_id).scalar_subquery()
+            stmt = stmt.where(or_(
+                Project.created_at > anchor,
+                and_(Project.created_at == anchor, Project.id > after_id),
+            ))
+        if limit is not None:
+            stmt = stmt.limit(limit)
         
         result = []
-        for p in projects:
-            phases = p.phases
-            total_phases = len(phases)
-            completed_phases = sum(1 for ph in phases if ph.status == "completed")
-            in_progress_phases = sum(1 for ph in phases if ph.status == "in_progress")
-            planned_phases = sum(1 for ph in phases if ph.status == "planned")
-            
-            # Encontrar fase atual (primeira não completada)
+        for row in self.db.execute(stmt):
+            total_phases = row.phases_total
+            completed_phases = row.phases_completed
+            
+            # Fase atual (primeira não completada)
             current_phase = None
-            for ph in sorted(phases, key=lambda x: x.phase_number):
-                if ph.status != "completed":
-                    current_phase = {
-                        "phase_number": ph.phase_number,
-                        "title": ph.title,
-                        "status": ph.status
-                    }
-                    break
+            if row.current_number is not None:
+                current_phase = {
+                    "phase_number": row.current_number,
+                    "title": row.current_title,
+                    "status": row.current_status
+                }
             
             result.append({
-                "project_id": p.id,
-                "name": p.name,
-                "description": p.description,
-                "status": p.status,
-                "created_at": p.created_at.isoformat(),
+                "project_id": row.id,
+                "name": row.name,
+                "description": row.description,
+                "status": row.status,
+                "created_at": row.created_at.isoformat(),
                 "phases_count": total_phases,
                 "phases_completed": completed_phases,
-                "phases_in_progress": in_progress_phases,
-                "phases_planned": planned_phases,
+                "phases_in_progress": row.phases_in_progress,
+                "phases_planned": row.phases_planned,
                 "current_phase": current_phase,
                 "progress_percentage": int((completed_phases / total_phases * 100)) if total_phases > 0 else 0
             })
         
         return result
     
+    def list_projects_page(self, limit: Optional[int] = None, cursor: Optional[str] = None) -> Dict[str, Any]:
+        """
+        List one page of projects.
+        
+        Args:
+            limit: Page size (defaults to DEFAULT_PAGE_SIZE, capped at MAX_PAGE_SIZE)
+            cursor: Cursor returned by the previous page
+            
+        Returns:
+            Dictionary with "projects" and "next_cursor" (None on the last page)
+        """
+        limit = clamp_limit(limit)
+        projects = self.list_projects(limit=limit + 1, cursor=cursor)
+        
+        next_cursor = None
+        if len(projects) > limit:
+            projects = projects[:limit]
+            next_cursor = encode_cursor("projects", id=projects[-1]["project_id"])
+        
+        return {"projects": projects, "next_cursor": next_cursor}
+    
+    def get_project_etag(self, project_id: str) -> str:
+        """
+        Get the current ETag of a project and its phases.
+        
+        Reads only the project's version and updated_at, so callers can
+        answer conditional requests before loading any phase.
+        
+        Args:
+            project_id: UUID of the project
+            
+        Returns:
+            Strong ETag string (quoted)
+            
+        Raises:
+            ValueError: If project not found
+        """
+        row = self.db.execute(
+            select(Project.version, Project.updated_at).where(Project.id == project_id)
+        ).first()
+        
+        if row is None:
+            raise ValueError(f"Project '{project_id}' not found")
+        
+        if self.cache is not None and not self.in_transaction:
+            # Reads that follow are then never older than this version
+            self.cache.observe_version(project_id, row.version)
+        return make_etag(row.version, row.updated_at)
+    
+    def get_project_version(self, project_id: str) -> int:
+        """
+        Get the current version of a project.
+        
+        Args:
+            project_id: UUID of the project
+            
+        Returns:
+            Project.version, bumped by every write to the project or its phases
+            
+        Raises:
+            ValueError: If project not found
+        """
+        version = self.db.scalar(select(Project.version).where(Project.id == project_id))
+        
+        if version is None:
+            raise ValueError(f"Project '{project_id}' not found")
+        
+        return version
+    
+    def get_project_details(self, project_id: str) -> Dict[str, Any]:
+        """
+        Get a project with every phase, including specs and progress data.
+        
+        Args:
+            project_id: UUID of the project
+            
+        Returns:
+            Dictionary with project fields and a "phases" list
+            
+        Raises:
+            ValueError: If project not found
+        """
+        project = self.db.query(Project).filter_by(id=project_id).first()
+        
+        if not project:
+            raise ValueError(f"Project '{project_id}' not found")
+        
+        phases = (
+            self.db.query(Phase)
+            .options(undefer_group(PAYLOAD))
+            .filter_by(project_id=project_id)
+            .order_by(Phase.phase_number)
+            .all()
+        )
+        
+        return {
+            "project_id": project.id,
+            "name": project.name,
+            "description": project.description,
+            "status": project.status,
+            "version": project.version,
+            "created_at": project.created_at.isoformat(),
+            "updated_at": project.updated_at.isoformat(),
+            "phases": [
+                {
+                    "phase_id": p.id,
+                    "phase_number": p.phase_number,
+                    "title": p.title,
+                    "status": p.status,
+                    "version": p.version,
+                    "specs": p.specs,
+                    "progress_data": p.progress_data
+                }
+                for p in phases
+            ]
+        }
+    
+    @cached_read("status")
     def get_project_status(self, project_id: str) -> Dict[str, Any]:
         """
         Get comprehensive project status including phase statistics.
@@ -247,21 +739,25 @@ class ProjectService:
         if not project:
             raise ValueError(f"Project {project_id} not found")
         
-        phases = self.db.query(Phase).filter_by(project_id=project_id).order_by(Phase.phase_number).all()
+        # Summary columns only: specs and progress_data are never decoded here
+        phases = self.db.execute(
+            select(Phase.phase_number, Phase.title, Phase.status, Phase.version, Phase.created_at, Phase.updated_at)
+            .where(Phase.project_id == project_id)
+            .order_by(Phase.phase_number)
+        ).all()
         
-        total_phases = len(phases)
-        completed_phases = sum(1 for ph in phases if ph.status == "completed")
-        in_progress_phases = sum(1 for ph in phases if ph.status == "in_progress")
-        planned_phases = sum(1 for ph in phases if ph.status == "planned")
+        total_phases = project.phases_total
+        completed_phases = project.phases_completed
         
-        # Encontrar fase atual (primeira não completada)
+        # Fase atual (primeira não completada), mantida em current_phase_number
         current_phase = None
         for ph in phases:
-            if ph.status != "completed":
+            if ph.phase_number == project.current_phase_number:
                 current_phase = {
                     "phase_number": ph.phase_number,
                     "title": ph.title,
                     "status": ph.status,
+                    "version": ph.version,
                     "created_at": ph.created_at.isoformat()
                 }
                 break
@@ -272,6 +768,7 @@ class ProjectService:
                 "phase_number": ph.phase_number,
                 "title": ph.title,
                 "status": ph.status,
+                "version": ph.version,
                 "created_at": ph.created_at.isoformat(),
                 "updated_at": ph.updated_at.isoformat()
             }
@@ -283,36 +780,62 @@ class ProjectService:
             "name": project.name,
             "description": project.description,
             "status": project.status,
+            "version": project.version,
             "created_at": project.created_at.isoformat(),
             "updated_at": project.updated_at.isoformat(),
             "total_phases": total_phases,
             "phases_completed": completed_phases,
-            "phases_in_progress": in_progress_phases,
-            "phases_planned": planned_phases,
+            "phases_in_progress": project.phases_in_progress,
+            "phases_planned": project.phases_planned,
             "current_phase": current_phase,
             "progress_percentage": int((completed_phases / total_phases * 100)) if total_phases > 0 else 0,
             "phases": phases_list
         }
     
-    def list_project_phases(self, project_id: str) -> List[Dict[str, Any]]:
+    @cached_read("phases")
+    def list_project_phases(
+        self,
+        project_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> List[Dict[str, Any]]:
         """
-        List all phases for a project with their status.
+        List phases for a project with their status, ordered by phase number.
         
         Args:
             project_id: UUID of the project
+            limit: Optional maximum number of phases to return
+            cursor: Optional cursor from list_project_phases_page; only phases
+                after it are returned
             
         Returns:
             List of phase dictionaries with status
             
         Raises:
-            ValueError: If project not found
+            ValueError: If project not found or the cursor is invalid
         """
         project = self.db.query(Project).filter_by(id=project_id).first()
         
         if not project:
             raise ValueError(f"Project {project_id} not found")
         
-        phases = self.db.query(Phase).filter_by(project_id=project_id).order_by(Phase.phase_number).all()
+        stmt = select(
+            Phase.id,
+            Phase.phase_number,
+            Phase.title,
+            Phase.status,
+            Phase.version,
+            Phase.created_at,
+            Phase.updated_at,
+            HAS_PROGRESS_DATA,
+        ).where(Phase.project_id == project_id)
+        if cursor:
+            after_number = decode_cursor(cursor, "phases", "n")
+            stmt = stmt.where(Phase.phase_number > after_number)
+        stmt = stmt.order_by(Phase.phase_number)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        phases = self.db.execute(stmt).all()
         
         return [
             {
@@ -320,13 +843,45 @@ class ProjectService:
                 "phase_number": ph.phase_number,
                 "title": ph.title,
                 "status": ph.status,
+                "version": ph.version,
                 "created_at": ph.created_at.isoformat(),
                 "updated_at": ph.updated_at.isoformat(),
-                "has_progress_data": ph.progress_data is not None
+                "has_progress_data": bool(ph.has_progress_data)
             }
             for ph in phases
         ]
     
+    def list_project_phases_page(
+        self,
+        project_id: str,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        List one page of phases for a project.
+        
+        Args:
+            project_id: UUID of the project
+            limit: Page size (defaults to DEFAULT_PAGE_SIZE, capped at MAX_PAGE_SIZE)
+            cursor: Cursor returned by the previous page
+            
+        Returns:
+            Dictionary with "phases" and "next_cursor" (None on the last page)
+            
+        Raises:
+            ValueError: If project not found or the cursor is invalid
+        """
+        limit = clamp_limit(limit)
+        phases = self.list_project_phases(project_id, limit=limit + 1, cursor=cursor)
+        
+        next_cursor = None
+        if len(phases) > limit:
+            phases = phases[:limit]
+            next_cursor = encode_cursor("phases", n=phases[-1]["phase_number"])
+        
+        return {"phases": phases, "next_cursor": next_cursor}
+    
+    @cached_read("current")
     def get_current_phase(self, project_id: str) -> Optional[Dict[str, Any]]:
         """
         Get the current phase (first non-completed phase) for a project.
@@ -345,20 +900,224 @@ class ProjectService:
         if not project:
             raise ValueError(f"Project {project_id} not found")
         
-        phases = self.db.query(Phase).filter_by(project_id=project_id).order_by(Phase.phase_number).all()
+        if project.current_phase_number is None:
+            # Todas as fases estão completas
+            return None
         
-        # Encontrar primeira fase não completada
-        for ph in phases:
-            if ph.status != "completed":
-                return {
-                    "phase_id": ph.id,
-                    "phase_number": ph.phase_number,
-                    "title": ph.title,
-                    "status": ph.status,
-                    "specs": ph.specs,
-                    "created_at": ph.created_at.isoformat(),
-                    "updated_at": ph.updated_at.isoformat()
+        ph = self.db.query(Phase).options(undefer(Phase.specs)).filter_by(
+            project_id=project_id,
+            phase_number=project.current_phase_number
+        ).first()
+        if ph is None:
+            # Counters out of step with the phases (see repair-counters)
+            return None
+        
+        return {
+            "phase_id": ph.id,
+            "phase_number": ph.phase_number,
+            "title": ph.title,
+            "status": ph.status,
+            "version": ph.version,
+            "specs": ph.specs,
+            "created_at": ph.created_at.isoformat(),
+            "updated_at": ph.updated_at.isoformat()
+        }
+    
+    def search_phases(
+        self,
+        query: str,
+        project_id: Optional[str] = None,
+        limit: Optional[int] = None,
+        cursor: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Full-text search over phase titles, instructions, files to create
+        and project names and descriptions.
+        
+        Args:
+            query: Words that must all appear (as word prefixes)
+            project_id: Only search this project's phases
+            limit: Page size (defaults to SEARCH_PAGE_SIZE, capped at MAX_PAGE_SIZE)
+            cursor: Cursor returned by the previous page of the same query
+            
+        Returns:
+            Dictionary with "results" (best matches first, each with a
+            relevance "score") and "next_cursor" (None on the last page)
+            
+        Raises:
+            ValueError: If the query has no words or the cursor is invalid
+        """
+        limit = clamp_limit(SEARCH_PAGE_SIZE if limit is None else limit)
+        after = None
+        if cursor:
+            if decode_cursor(cursor, "search", "q") != query:
+                raise ValueError(f"Invalid cursor: {cursor}")
+            after = (decode_cursor(cursor, "search", "s"), decode_cursor(cursor, "search", "i"))
+        
+        rows = match_phases(self.db, query, project_id, limit=limit + 1, after=after)
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor("search", q=query, s=rows[-1].sort_key, i=rows[-1].phase_id)
+        
+        return {
+            "query": query,
+            "results": [
+                {
+                    "phase_id": row.phase_id,
+                    "project_id": row.project_id,
+                    "project_name": row.project_name,
+                    "phase_number": row.phase_number,
+                    "title": row.title,
+                    "status": row.status,
+                    "version": row.version,
+                    "score": -row.sort_key
                 }
+                for row in rows
+            ],
+            "next_cursor": next_cursor
+        }
+    
+    def export_records(self, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Dict[str, Any]]:
+        """
+        Stream every project, each followed by its phases.
+        
+        Projects and phases are read by two queries in the same
+        (created_at, id) project order, fetched batch_size rows at a time
+        (server-side cursors on PostgreSQL), and merged. Memory use does not
+        depend on the number of projects or phases.
+        
+        Args:
+            batch_size: Rows fetched per round trip
+            
+        Yields:
+            Dictionaries with "type" set to "project" or "phase"
+        """
+        stream = {"yield_per": batch_size}
+        projects = self.db.execute(
+            select(
+                Project.id,
+                Project.name,
+                Project.description,
+                Project.status,
+                Project.preferences,
+                Project.version,
+                Project.created_at,
+                Project.updated_at,
+            )
+            .order_by(Project.created_at, Project.id)
+            .execution_options(**stream)
+        )
+        phases = self.db.execute(
+            select(
+                Phase.id,
+                Phase.project_id,
+                Phase.phase_number,
+                Phase.title,
+                Phase.status,
+                Phase.specs,
+                Phase.progress_data,
+                Phase.version,
+                Phase.created_at,
+                Phase.updated_at,
+            )
+            .join(Project, Project.id == Phase.project_id)
+            .order_by(Project.created_at, Project.id, Phase.phase_number)
+            .execution_options(**stream)
+        )
+        
+        phase = next(phases, None)
+        for project in projects:
+            yield {
+                "type": "project",
+                "project_id": project.id,
+                "name": project.name,
+                "description": project.description,
+                "status": project.status,
+                "preferences": project.preferences,
+                "version": project.version,
+                "created_at": project.created_at.isoformat(),
+                "updated_at": project.updated_at.isoformat()
+            }
+            while phase is not None and phase.project_id == project.id:
+                yield {
+                    "type": "phase",
+                    "phase_id": phase.id,
+                    "project_id": phase.project_id,
+                    "phase_number": phase.phase_number,
+                    "title": phase.title,
+                    "status": phase.status,
+                    "specs": phase.specs,
+                    "progress_data": phase.progress_data,
+                    "version": phase.version,
+                    "created_at": phase.created_at.isoformat(),
+                    "updated_at": phase.updated_at.isoformat()
+                }
+                phase = next(phases, None)
+    
+    def import_rows(
+        self,
+        projects: List[Dict[str, Any]],
+        phases: List[Dict[str, Any]],
+        upsert: bool = False
+    ) -> None:
+        """
+        Write a chunk of imported rows with one executemany per table.
+        
+        Nothing is committed: the importer commits (and refreshes counters
+        through commit_import) once per transaction of many chunks.
         
-        # Todas as fases estão completas
-        return None
+        Args:
+            projects: Project column values, all with the same keys
+            phases: Phase column values, all with the same keys
+            upsert: Update existing projects (by id) and phases (by
+                project_id and phase_number) instead of failing
+            
+        Raises:
+            ValueError: If a phase's project does not exist or a row
+                conflicts with an existing one
+        """
+        dialect = self.db.get_bind().dialect.name
+        try:
+            if projects:
+                self.db.execute(import_projects(dialect, upsert), projects)
+            if phases:
+                # SQLite does not enforce the foreign key; check explicitly so
+                # both databases fail the same way
+                parents = {phase["project_id"] for phase in phases}
+                found = set(self.db.scalars(select(Project.id).where(Project.id.in_(parents))))
+                for project_id in parents - found:
+                    raise ValueError(f"Project {project_id} not found")
+                self.db.execute(import_phases(dialect, upsert), phases)
+        except IntegrityError as e:
+            raise ValueError(f"Conflicting row: {e.orig}")
+    
+    def commit_import(self, project_ids: Collection[str]) -> None:
+        """
+        Refresh counters and search index of imported projects and commit.
+        
+        Args:
+            project_ids: Projects written since the last commit
+        """
+        project_ids = list(project_ids)
+        for start in range(0, len(project_ids), UPSERT_CHUNK_SIZE):
+            self.db.execute(refresh_counters(project_ids=project_ids[start:start + UPSERT_CHUNK_SIZE]))
+        index_phases(self.db, project_ids=project_ids)
+        self.db.commit()
+        for project_id in project_ids:
+            self._invalidate(project_id)
+            self._publish("project.imported", project_id, {})
+    
+    def repair_counters(self) -> int:
+        """
+        Recompute denormalized phase counters for projects that drifted.
+        
+        Returns:
+            Number of projects whose counters were corrected
+        """
+        result = self.db.execute(repair_counters())
+        self.db.commit()
+        if self.cache is not None:
+            self.cache.clear()
+        return result.rowcount
@@ -0,0 +1,351 @@
+"""
+Single-writer mode for serving one SQLite database from several workers.
+
+SQLite lets one connection write at a time: worker processes committing
+concurrently only queue on the file lock (busy_timeout) and retry
+(retry_on_lock). In single-writer mode (`manage.py serve --workers N`) one
+extra process, the writer, makes every write:
+
+- Workers serve reads themselves and forward write tools, batches with a
+  write tool and imports to the writer over HTTP (WriterClient).
+- The writer runs write tool calls through a WriteQueue: calls that arrive
+  while a commit is in progress are executed together in one transaction
+  and committed once (group commit). Imports, which commit on their own,
+  take a turn with the queue for each transaction they write
+  (WriteQueue.exclusive), never while waiting for the upload.
+- Workers follow the writer's change feed (follow_writer_events) to drop
+  stale cache entries and to republish the events to their own SSE and
+  long-polling clients.
+"""
+import asyncio
+import json
+import os
+from collections import deque
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional, Tuple
+
+import httpx
+from sqlalchemy.orm import Session
+
+from database.connection import get_db
+from mcp.protocol import MCPProtocol
+from .cache import ReadCache, read_cache
+from .events import RETRY_MS, EventBroker, event_broker
+
+
+# Tools that write; everything else is served by the worker itself
+WRITE_TOOLS = frozenset({"create_project", "save_phase", "save_phases", "update_progress"})
+
+# Calls committed together at most
+MAX_GROUP_CALLS = 64
+
+# Seconds a worker waits for the writer; imports can take a while
+WRITER_TIMEOUT_SECONDS = 300.0
+
+
+def write_queue_requested() -> bool:
+    """Whether WRITE_QUEUE asks this process to serialize its writes"""
+    return os.getenv("WRITE_QUEUE", "").lower() in ("1", "true", "yes")
+
+
+class _GroupFailed(Exception):
+    """Raised to roll back a group of calls after a failed call"""
+
+
+class WriteQueue:
+    """
+    Serialized, group-committed execution of write tool calls.
+
+    One task drains the queue: every call waiting when it becomes free is
+    executed in a single transaction (up to `max_group` calls) and committed
+    once. If any call of a group fails, the group is rolled back and its
+    calls are replayed one by one, each committing on its own, so a failing
+    call never takes others down with it. Batches run alone, in order.
+    Other writers take turns with the queue through exclusive().
+    """
+
+    def __init__(
+        self,
+        session_factory: Optional[Callable[[], Session]] = None,
+        max_group: int = MAX_GROUP_CALLS
+    ):
+        """
+        Initialize an empty queue; start run() to process it.
+
+        Args:
+            session_factory: Returns a new sync Session (defaults to get_db)
+            max_group: Calls committed together at most
+        """
+        self.session_factory = session_factory or (lambda: next(get_db()))
+        self.max_group = max_group
+        self._pending: Deque[Tuple[str, Tuple, asyncio.Future]] = deque()
+        self._ready = asyncio.Event()
+        self._turn = asyncio.Lock()  # Held by run() per group, or by exclusive()
+        self.calls = 0
+        self.commits = 0
+        self.replays = 0
+        self.largest_group = 0
+
+    @classmethod
+    def from_env(cls) -> "WriteQueue":
+        """Build a queue from WRITE_QUEUE_* environment variables"""
+        return cls(max_group=int(os.getenv("WRITE_QUEUE_MAX_GROUP", MAX_GROUP_CALLS)))
+
+    async def execute_tool(self, tool_name: str, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Queue a tool call and wait for its result.
+
+        Args:
+            tool_name: Name of the tool to execute
+            arguments: Dictionary of arguments for the tool
+
+        Returns:
+            Result of MCPProtocol.execute_tool
+        """
+        return await self._submit("tool", (tool_name, arguments))
+
+    async def execute_batch(self, calls: List[Dict[str, Any]], transactional: bool = False) -> Dict[str, Any]:
+        """
+        Queue a batch and wait for its result.
+
+        Args:
+            calls: List of {"tool": name, "arguments": {...}} dictionaries
+            transactional: If True, all calls succeed or none are kept
+
+        Returns:
+            Result of MCPProtocol.execute_batch
+        """
+        return await self._submit("batch", (calls, transactional))
+
+    def exclusive(self) -> asyncio.Lock:
+        """
+        Take a turn with the queue, e.g. for an import that commits on its own.
+
+        Usage: `async with queue.exclusive(): ...`. The group being executed
+        finishes first; calls queued meanwhile wait and are then grouped, so
+        hold the turn only for database work, never across network awaits.
+
+        Returns:
+            Lock shared with run()
+        """
+        return self._turn
+
+    async def _submit(self, kind: str, payload: Tuple) -> Dict[str, Any]:
+        """Queue one item and wait for run() to resolve it"""
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((kind, payload, future))
+        self._ready.set()
+        return await future
+
+    async def run(self) -> None:
+        """Process the queue until cancelled"""
+        while True:
+            await self._ready.wait()
+            async with self._turn:
+                group = self._take_group()
+                if not self._pending:
+                    self._ready.clear()
+                try:
+                    results = await asyncio.to_thread(self._execute, group)
+                except Exception as e:
+                    results = [{"success": False, "error": f"Execution error: {str(e)}"}] * len(group)
+            for (_, _, future), result in zip(group, results):
+                if not future.done():
+                    future.set_result(result)
+
+    def _take_group(self) -> List[Tuple[str, Tuple, asyncio.Future]]:
+        """Pop a batch, or the leading run of tool calls"""
+        group = [self._pending.popleft()]
+        if group[0][0] == "tool":
+            while self._pending and self._pending[0][0] == "tool" and len(group) < self.max_group:
+                group.append(self._pending.popleft())
+        return group
+
+    def _execute(self, group: List[Tuple[str, Tuple, asyncio.Future]]) -> List[Dict[str, Any]]:
+        """Execute a group in a worker thread"""
+        db = self.session_factory()
+        try:
+            kind, payload, _ = group[0]
+            if kind == "batch":
+                self.calls += len(payload[0])
+                self.commits += 1
+                return [MCPProtocol(db).execute_batch(*payload)]
+
+            calls = [payload for _, payload, _ in group]
+            self.calls += len(calls)
+            self.largest_group = max(self.largest_group, len(calls))
+            if len(calls) > 1:
+                protocol = MCPProtocol(db)
+                results = []
+                try:
+                    with protocol.service.transaction():
+                        for tool_name, arguments in calls:
+                            result = protocol.execute_tool(tool_name, arguments)
+                            if not result["success"]:
+                                raise _GroupFailed()
+                            results.append(result)
+                    self.commits += 1
+                    return results
+                except _GroupFailed:
+                    self.replays += 1
+
+            results = []
+            for tool_name, arguments in calls:
+                result = MCPProtocol(db).execute_tool(tool_name, arguments)
+                if not result["success"]:
+                    # Clear a failed flush so the next call starts clean
+                    db.rollback()
+                results.append(result)
+            self.commits += len(calls)
+            return results
+        finally:
+            db.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters for monitoring"""
+        return {
+            "pending": len(self._pending),
+            "calls": self.calls,
+            "commits": self.commits,
+            "calls_per_commit": round(self.calls / self.commits, 2) if self.commits else 0.0,
+            "largest_group": self.largest_group,
+            "replays": self.replays,
+        }
+
+
+class WriterClient:
+    """
+    Forwards a worker's writes to the writer process.
+    """
+
+    def __init__(self, base_url: str, transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Initialize the client.
+
+        Args:
+            base_url: URL of the writer, e.g. http://127.0.0.1:8001
+            transport: Optional httpx transport (tests)
+        """
+        self.base_url = base_url.rstrip("/")
+        self.client = httpx.AsyncClient(
+            base_url=self.base_url,
+            timeout=WRITER_TIMEOUT_SECONDS,
+            transport=transport,
+        )
+
+    async def post(
+        self,
+        path: str,
+        content: Any,
+        params: Optional[Dict[str, Any]] = None,
+        content_type: str = "application/json"
+    ) -> httpx.Response:
+        """
+        Send a request body to the writer.
+
+        Args:
+            path: Endpoint path, e.g. "/mcp/execute"
+            content: Body bytes, or an async iterator of chunks (streamed)
+            params: Query parameters
+            content_type: Content-Type of the body
+
+        Returns:
+            The writer's response
+
+        Raises:
+            httpx.HTTPError: If the writer cannot be reached
+        """
+        return await self.client.post(path, content=content, params=params, headers={"Content-Type": content_type})
+
+    async def close(self) -> None:
+        """Close the connection pool"""
+        await self.client.aclose()
+
+
+async def sse_frames(lines: AsyncIterator[str]) -> AsyncIterator[Tuple[Optional[str], str, Dict[str, Any]]]:
+    """
+    Parse Server-Sent Events as sent by services.events.sse_stream.
+
+    Args:
+        lines: Lines of the stream, without line endings
+
+    Yields:
+        (id, event type, data) of each frame; comments and retry hints are
+        skipped
+    """
+    event_id, event_type, data = None, None, []
+    async for line in lines:
+        if not line:
+            if event_type is not None:
+                yield event_id, event_type, json.loads("\n".join(data) or "{}")
+            event_id, event_type, data = None, None, []
+        elif line.startswith(":"):
+            continue
+        else:
+            field, _, value = line.partition(":")
+            value = value[1:] if value.startswith(" ") else value
+            if field == "id":
+                event_id = value
+            elif field == "event":
+                event_type = value
+            elif field == "data":
+                data.append(value)
+
+
+def apply_writer_event(
+    event_type: str,
+    data: Dict[str, Any],
+    cache: Optional[ReadCache] = read_cache,
+    broker: Optional[EventBroker] = event_broker
+) -> None:
+    """
+    Apply one event of the writer's change feed to this worker.
+
+    Args:
+        event_type: Event name; "reset" means events were lost
+        data: Event payload, with project_id
+        cache: Read cache to invalidate
+        broker: Local change feed to republish to
+    """
+    if event_type == "reset":
+        if cache is not None:
+            cache.clear()
+        if broker is not None:
+            broker.reset_subscribers()
+        return
+
+    data = dict(data)
+    project_id = data.pop("project_id")
+    if cache is not None:
+        phase_number = data.get("phase_number")
+        cache.invalidate(project_id, None if phase_number is None else [phase_number])
+    if broker is not None:
+        broker.publish(event_type, project_id, data)
+
+
+async def follow_writer_events(
+    writer: WriterClient,
+    cache: Optional[ReadCache] = read_cache,
+    broker: Optional[EventBroker] = event_broker
+) -> None:
+    """
+    Mirror the writer's change feed into this worker until cancelled.
+
+    Reconnects after RETRY_MS with Last-Event-ID, so events sent while
+    disconnected are replayed (or a reset clears the cache).
+
+    Args:
+        writer: Client of the writer process
+        cache: Read cache to invalidate
+        broker: Local change feed to republish to
+    """
+    last_event_id = None
+    while True:
+        headers = {"Last-Event-ID": last_event_id} if last_event_id else {}
+        try:
+            async with writer.client.stream("GET", "/events", headers=headers, timeout=None) as response:
+                async for event_id, event_type, data in sse_frames(response.aiter_lines()):
+                    last_event_id = event_id or last_event_id
+                    apply_writer_event(event_type, data, cache, broker)
+        except httpx.HTTPError:
+            pass
+        await asyncio.sleep(RETRY_MS / 1000)
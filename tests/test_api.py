@@ -17,10 +17,13 @@ from database.connection import init_db, clear_db, get_db
 
 
 @pytest.fixture
-def client():
+def client(test_database_url, monkeypatch):
     """Provide test client with clean database"""
+    # The app lifespan initializes DATABASE_URL; point it at the test database
+    monkeypatch.setenv("DATABASE_URL", test_database_url)
+    
     # Override database dependency for testing
-    init_db(":memory:")
+    init_db(test_database_url)
     
     def override_get_db():
         db = next(get_db())
@@ -291,6 +294,84 @@ class TestMCPExecuteEndpoint:
         data = response.json()
         assert data["success"] is False
         assert "error" in data
+    
+    def test_execute_reports_invalid_argument_path(self, client):
+        """Nested schema violations should include the argument path"""
+        response = client.post(
+            "/mcp/execute",
+            json={
+                "tool": "update_progress",
+                "arguments": {"project_id": "p", "phase_number": 1, "status": "finished"}
+            }
+        )
+        
+        data = response.json()
+        assert data["success"] is False
+        assert data["error_path"] == ["status"]
+    
+    def test_execute_response_matches_schema(self, client):
+        """Pre-encoded results keep every response field and non-ASCII text"""
+        response = client.post(
+            "/mcp/execute",
+            json={"tool": "create_project", "arguments": {"name": "Projeto São Paulo"}}
+        )
+        
+        assert response.headers["content-type"] == "application/json"
+        assert set(response.json()) == {"success", "data", "error", "error_path"}
+        assert response.json()["error_path"] is None
+        assert "São Paulo".encode("utf-8") in response.content
+        
+        schema = client.get("/openapi.json").json()
+        responses = schema["paths"]["/mcp/execute"]["post"]["responses"]
+        assert responses["200"]["content"]["application/json"]["schema"] == {
+            "$ref": "#/components/schemas/ExecuteToolResponse"
+        }
+
+
+class TestMCPExecuteBatchEndpoint:
+    """Test POST /mcp/execute/batch"""
+    
+    def test_batch_plans_project_in_one_request(self, client):
+        """create_project plus several save_phase calls in one round-trip"""
+        calls = [{"tool": "create_project", "arguments": {"name": "Batch Project"}}]
+        calls += [
+            {
+                "tool": "save_phase",
+                "arguments": {"project_id": "$0.project_id", "phase_number": n, "title": f"Phase {n}", "specs": {}}
+            }
+            for n in range(1, 4)
+        ]
+        
+        response = client.post("/mcp/execute/batch", json={"calls": calls, "transactional": True})
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is True
+        assert len(data["results"]) == 4
+        project_id = data["results"][0]["data"]["project_id"]
+        details = client.get(f"/projects/{project_id}").json()
+        assert [p["phase_number"] for p in details["phases"]] == [1, 2, 3]
+    
+    def test_batch_returns_per_call_errors(self, client):
+        """Failures are reported per call with status 200"""
+        response = client.post(
+            "/mcp/execute/batch",
+            json={"calls": [
+                {"tool": "create_project", "arguments": {"name": "ok"}},
+                {"tool": "unknown_tool", "arguments": {}}
+            ]}
+        )
+        
+        assert response.status_code == 200
+        data = response.json()
+        assert data["success"] is False
+        assert [r["success"] for r in data["results"]] == [True, False]
+    
+    def test_batch_rejects_empty_call_list(self, client):
+        """An empty batch is a validation error"""
+        response = client.post("/mcp/execute/batch", json={"calls": []})
+        
+        assert response.status_code == 422
 
 
 class TestProjectsEndpoint:
@@ -332,6 +413,34 @@ class TestProjectsEndpoint:
         assert "project-1" in names
         assert "project-2" in names
     
+    def test_list_projects_paginated(self, client):
+        """Should return a page of projects and a cursor for the next one"""
+        for i in range(3):
+            client.post(
+                "/mcp/execute",
+                json={
+                    "tool": "create_project",
+                    "arguments": {"name": f"paged-{i}"}
+                }
+            )
+        
+        first = client.get("/projects", params={"limit": 2}).json()
+        assert len(first["projects"]) == 2
+        assert first["next_cursor"] is not None
+        
+        second = client.get(
+            "/projects",
+            params={"limit": 2, "cursor": first["next_cursor"]}
+        ).json()
+        assert len(second["projects"]) == 1
+        assert second["next_cursor"] is None
+    
+    def test_list_projects_invalid_cursor_returns_400(self, client):
+        """Should reject malformed cursors"""
+        response = client.get("/projects", params={"cursor": "garbage"})
+        
+        assert response.status_code == 400
+    
     def test_get_project_details(self, client):
         """Should get project with phases"""
         # Create project
@@ -373,6 +482,382 @@ class TestProjectsEndpoint:
         assert response.status_code == 404
 
 
+class TestConditionalRequests:
+    """Test ETag / If-None-Match on project and phase reads"""
+    
+    def _create_project_with_phase(self, client) -> str:
+        project_id = client.post(
+            "/mcp/execute",
+            json={"tool": "create_project", "arguments": {"name": "etag-project"}}
+        ).json()["data"]["project_id"]
+        client.post(
+            "/mcp/execute",
+            json={"tool": "save_phase", "arguments": {
+                "project_id": project_id, "phase_number": 1, "title": "Setup", "specs": {}
+            }}
+        )
+        return project_id
+    
+    def test_get_project_not_modified(self, client):
+        """GET /projects/{id} should answer 304 until a phase changes"""
+        project_id = self._create_project_with_phase(client)
+        
+        first = client.get(f"/projects/{project_id}")
+        etag = first.headers["etag"]
+        cached = client.get(f"/projects/{project_id}", headers={"If-None-Match": etag})
+        
+        assert first.status_code == 200
+        assert cached.status_code == 304
+        assert cached.headers["etag"] == etag
+        assert cached.content == b""
+        
+        client.post(
+            "/mcp/execute",
+            json={"tool": "update_progress", "arguments": {
+                "project_id": project_id, "phase_number": 1, "status": "completed"
+            }}
+        )
+        changed = client.get(f"/projects/{project_id}", headers={"If-None-Match": etag})
+        
+        assert changed.status_code == 200
+        assert changed.headers["etag"] != etag
+        assert changed.json()["phases"][0]["status"] == "completed"
+    
+    def test_read_tools_not_modified(self, client):
+        """Read tools via /mcp/execute should honour If-None-Match"""
+        project_id = self._create_project_with_phase(client)
+        request = {"tool": "get_phase", "arguments": {"project_id": project_id, "phase_number": 1}}
+        
+        first = client.post("/mcp/execute", json=request)
+        cached = client.post("/mcp/execute", json=request, headers={"If-None-Match": first.headers["etag"]})
+        
+        assert first.status_code == 200
+        assert first.json()["data"]["title"] == "Setup"
+        assert cached.status_code == 304
+        
+        write = client.post(
+            "/mcp/execute",
+            json={"tool": "create_project", "arguments": {"name": "other"}}
+        )
+        assert "etag" not in write.headers
+        
+        # Another project's writes leave this one's tag alone
+        again = client.post("/mcp/execute", json=request, headers={"If-None-Match": first.headers["etag"]})
+        assert again.status_code == 304
+
+
+class TestResponseCompression:
+    """Test negotiated gzip/br response compression"""
+    
+    def _large_project(self, client):
+        project_id = client.post(
+            "/mcp/execute",
+            json={"tool": "create_project", "arguments": {"name": "compressed"}}
+        ).json()["data"]["project_id"]
+        client.post("/mcp/execute", json={
+            "tool": "save_phase",
+            "arguments": {
+                "project_id": project_id,
+                "phase_number": 1,
+                "title": "Large",
+                "specs": {"instructions": "Implementar e testar o módulo. " * 200}
+            }
+        })
+        return project_id
+    
+    def test_large_response_is_compressed(self, client):
+        """Large bodies are gzipped and keep working with If-None-Match"""
+        project_id = self._large_project(client)
+        
+        response = client.get(f"/projects/{project_id}", headers={"Accept-Encoding": "gzip"})
+        
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert int(response.headers["content-length"]) < len(response.content) / 5
+        assert response.json()["phases"][0]["title"] == "Large"
+        
+        etag = response.headers["etag"]
+        assert etag.startswith('W/"')
+        conditional = client.get(
+            f"/projects/{project_id}",
+            headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+        )
+        assert conditional.status_code == 304
+    
+    def test_small_or_unaccepted_responses_are_not_compressed(self, client):
+        """Small bodies and clients without gzip get identity responses"""
+        project_id = self._large_project(client)
+        
+        small = client.get("/health", headers={"Accept-Encoding": "gzip"})
+        identity = client.get(f"/projects/{project_id}", headers={"Accept-Encoding": "identity"})
+        
+        assert "content-encoding" not in small.headers
+        assert "content-encoding" not in identity.headers
+        assert identity.headers["etag"].startswith('"')
+    
+    def test_negotiate_encoding(self):
+        """q-values decide; ties go to the server's preference"""
+        from services.response_compression import negotiate_encoding
+        
+        assert negotiate_encoding("gzip, deflate, br", ("br", "gzip")) == "br"
+        assert negotiate_encoding("gzip, br;q=0.5", ("br", "gzip")) == "gzip"
+        assert negotiate_encoding("br", ("gzip",)) is None
+        assert negotiate_encoding("*", ("gzip",)) == "gzip"
+        assert negotiate_encoding("gzip;q=0", ("gzip",)) is None
+        assert negotiate_encoding(None, ("gzip",)) is None
+
+
+class TestExportEndpoint:
+    """Test GET /export"""
+    
+    def test_export_streams_ndjson(self, client):
+        """The export starts with a header and lists each project with its phases"""
+        import json
+        project_id = client.post(
+            "/mcp/execute",
+            json={"tool": "create_project", "arguments": {"name": "exported"}}
+        ).json()["data"]["project_id"]
+        client.post("/mcp/execute", json={
+            "tool": "save_phase",
+            "arguments": {"project_id": project_id, "phase_number": 1, "title": "Setup", "specs": {}}
+        })
+        
+        response = client.get("/export")
+        
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        records = [json.loads(line) for line in response.text.splitlines()]
+        assert records[0]["type"] == "export"
+        assert records[0]["version"] == 1
+        assert [(r["type"], r["project_id"]) for r in records[1:]] == [
+            ("project", project_id),
+            ("phase", project_id),
+        ]
+
+
+class TestImportEndpoint:
+    """Test POST /import"""
+    
+    def test_import_round_trips_export(self, client):
+        """An export can be imported back, and again with upsert"""
+        project_id = client.post(
+            "/mcp/execute",
+            json={"tool": "create_project", "arguments": {"name": "imported"}}
+        ).json()["data"]["project_id"]
+        client.post("/mcp/execute", json={
+            "tool": "save_phase",
+            "arguments": {"project_id": project_id, "phase_number": 1, "title": "Setup", "specs": {}}
+        })
+        export = client.get("/export").content
+        
+        duplicate = client.post("/import", content=export)
+        response = client.post("/import", params={"upsert": True}, content=export)
+        
+        assert duplicate.status_code == 400
+        assert duplicate.json()["detail"]["imported"] == {"projects": 0, "phases": 0}
+        assert response.status_code == 200
+        assert response.json()["imported"] == {"projects": 1, "phases": 1}
+    
+    def test_import_reports_bad_line(self, client):
+        """Malformed lines are rejected with their line number"""
+        response = client.post("/import", content=b'{"type":"export","version":1}\nnot json\n')
+        
+        assert response.status_code == 400
+        assert response.json()["detail"]["error"].startswith("Line 2: invalid JSON")
+    
+    async def test_stalled_upload_does_not_hold_off_queued_writes(self, client, monkeypatch):
+        """In the writer, writes queued while an upload stalls still finish"""
+        import asyncio
+        import httpx
+        import main
+        from services.writer import WriteQueue
+        queue = WriteQueue()
+        monkeypatch.setattr(main, "write_queue", queue)
+        runner = asyncio.create_task(queue.run())
+        resume = asyncio.Event()
+        
+        async def body():
+            yield b'{"type":"export","version":1}\n{"type":"project","project_id":"slow","name":"slow"}\n'
+            await resume.wait()
+            yield b'{"type":"phase","project_id":"slow","phase_number":1,"title":"A","specs":{}}\n'
+        
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as http:
+                upload = asyncio.create_task(http.post("/import", content=body()))
+                await asyncio.sleep(0.05)
+                queued = await asyncio.wait_for(queue.execute_tool("create_project", {"name": "queued"}), 5)
+                assert not upload.done()
+                resume.set()
+                response = await asyncio.wait_for(upload, 5)
+        finally:
+            runner.cancel()
+        
+        assert queued["success"] is True
+        assert response.status_code == 200
+        assert response.json()["imported"] == {"projects": 1, "phases": 1}
+
+
+class TestSearchEndpoint:
+    """Test GET /search and the search_phases tool"""
+    
+    def test_search_finds_phase(self, client):
+        """A saved phase is found by a word of its instructions"""
+        project_id = client.post(
+            "/mcp/execute",
+            json={"tool": "create_project", "arguments": {"name": "searchable"}}
+        ).json()["data"]["project_id"]
+        client.post("/mcp/execute", json={
+            "tool": "save_phase",
+            "arguments": {"project_id": project_id, "phase_number": 1, "title": "Setup",
+                          "specs": {"instructions": "Configure redis"}}
+        })
+        
+        response = client.get("/search", params={"q": "redis"})
+        tool = client.post("/mcp/execute", json={"tool": "search_phases", "arguments": {"query": "redis"}})
+        
+        assert response.status_code == 200
+        assert [(r["project_id"], r["phase_number"]) for r in response.json()["results"]] == [(project_id, 1)]
+        assert tool.json()["data"]["results"] == response.json()["results"]
+        assert client.get("/search", params={"q": "!!"}).status_code == 400
+
+
+class TestEventsEndpoint:
+    """Test the SSE change feed endpoints (streams are covered in test_database)"""
+    
+    def test_unknown_project_events_is_404(self, client):
+        """Subscribing to a missing project fails before streaming"""
+        response = client.get("/projects/missing/events")
+        
+        assert response.status_code == 404
+    
+    async def test_unsent_event_stream_subscribes_nothing(self, client):
+        """A client gone before the body is sent leaves no subscription behind"""
+        from starlette.requests import Request
+        from main import event_broker, event_stream_response
+        
+        response = event_stream_response(Request({"type": "http", "headers": []}), None, None)
+        await response.body_iterator.aclose()
+        
+        assert event_broker.stats()["subscribers"] == 0
+    
+    def test_event_stats_count_published_events(self, client):
+        """Writes through the API are published to the change feed"""
+        before = client.get("/events/stats").json()["published"]
+        client.post("/mcp/execute", json={"tool": "create_project", "arguments": {"name": "evented"}})
+        
+        assert client.get("/events/stats").json()["published"] == before + 1
+    
+    def test_long_poll_times_out_with_current_state(self, client):
+        """get_project_status with wait_since answers with the unchanged state after the timeout"""
+        project_id = client.post(
+            "/mcp/execute",
+            json={"tool": "create_project", "arguments": {"name": "long-polled"}}
+        ).json()["data"]["project_id"]
+        
+        response = client.post(
+            "/mcp/execute",
+            json={"tool": "get_project_status", "arguments": {"project_id": project_id, "wait_since": 1, "timeout": 0.05}}
+        )
+        too_long = client.post(
+            "/mcp/execute",
+            json={"tool": "get_project_status", "arguments": {"project_id": project_id, "wait_since": 1, "timeout": 600}}
+        )
+        
+        assert response.json()["data"]["version"] == 1
+        assert too_long.json()["error_path"] == ["timeout"]
+        assert client.get("/events/stats").json()["subscribers"] == 0
+
+
+class TestCacheStats:
+    """Test GET /cache/stats"""
+    
+    def test_cache_stats_counts_hits(self, client):
+        """Repeated reads should show up as cache hits"""
+        project_id = client.post(
+            "/mcp/execute",
+            json={"tool": "create_project", "arguments": {"name": "stats"}}
+        ).json()["data"]["project_id"]
+        before = client.get("/cache/stats").json()
+        
+        for _ in range(3):
+            client.post(
+                "/mcp/execute",
+                json={"tool": "get_project_status", "arguments": {"project_id": project_id}}
+            )
+        after = client.get("/cache/stats").json()
+        
+        assert after["misses"] - before["misses"] == 1
+        assert after["hits"] - before["hits"] == 2
+        assert {"evictions", "invalidations", "size", "hit_ratio"} <= set(after)
+
+
+class TestWriterForwarding:
+    """Test a worker forwarding writes to the single writer"""
+    
+    def test_writes_are_forwarded_and_reads_served_locally(self, client, monkeypatch):
+        """Write tools go to WRITER_URL; reads never leave the worker"""
+        import httpx
+        import main
+        from services.writer import WriterClient
+        assert client.get("/writer/stats").json() == {"role": "standalone"}
+        
+        forwarded = []
+        
+        def writer(request):
+            forwarded.append((request.url.path, request.read()))
+            return httpx.Response(200, json={"success": True, "data": {"project_id": "from-writer"}})
+        
+        monkeypatch.setattr(main, "writer_client", WriterClient("http://writer", transport=httpx.MockTransport(writer)))
+        assert client.get("/writer/stats").json() == {"role": "worker", "writer_url": "http://writer"}
+        
+        response = client.post("/mcp/execute", json={"tool": "create_project", "arguments": {"name": "w"}})
+        assert response.json()["data"]["project_id"] == "from-writer"
+        assert forwarded[0][0] == "/mcp/execute"
+        assert b'"create_project"' in forwarded[0][1]
+        
+        response = client.post("/mcp/execute", json={"tool": "search_phases", "arguments": {"query": "w"}})
+        assert response.json()["success"] is True
+        assert len(forwarded) == 1
+    
+    def test_unreachable_writer_is_503(self, client, monkeypatch):
+        """A worker that cannot reach the writer should say so"""
+        import httpx
+        import main
+        from services.writer import WriterClient
+        
+        def writer(request):
+            raise httpx.ConnectError("connection refused")
+        
+        monkeypatch.setattr(main, "writer_client", WriterClient("http://writer", transport=httpx.MockTransport(writer)))
+        response = client.post("/mcp/execute", json={"tool": "create_project", "arguments": {"name": "w"}})
+        assert response.status_code == 503
+
+
+class TestAsyncMode:
+    """Test the API with DATABASE_ASYNC enabled"""
+    
+    def test_endpoints_use_async_session(self, tmp_path, monkeypatch):
+        """Endpoints should work end-to-end on the aiosqlite engine"""
+        from database import connection
+        monkeypatch.setenv("DATABASE_URL", f"sqlite:///{tmp_path / 'async.db'}")
+        monkeypatch.setenv("DATABASE_ASYNC", "1")
+        
+        with TestClient(app) as async_client:
+            assert connection.async_enabled()
+            assert async_client.get("/health").json()["database"] == "connected"
+            
+            created = async_client.post(
+                "/mcp/execute",
+                json={"tool": "create_project", "arguments": {"name": "async-api"}}
+            ).json()
+            project_id = created["data"]["project_id"]
+            
+            assert async_client.get("/projects").json()["projects"][0]["name"] == "async-api"
+            assert async_client.get(f"/projects/{project_id}").json()["phases"] == []
+        
+        assert not connection.async_enabled()
+
+
 class TestCORSAndHeaders:
     """Test CORS and security headers"""
     
@@ -4,6 +4,8 @@ Tests for Phase 2: Database Layer
 TDD - RED Phase: These tests should FAIL initially
 """
 
+import asyncio
+import json
 import pytest
 from datetime import datetime
 from pathlib import Path
@@ -18,9 +20,9 @@ from services.project_service import ProjectService
 
 
 @pytest.fixture
-def db_session():
+def db_session(test_database_url):
     """Provide a clean database session for each test"""
-    init_db(":memory:")  # Use in-memory SQLite for tests
+    init_db(test_database_url)  # In-memory SQLite unless TEST_DATABASE_URL is set
     db = next(get_db())
     yield db
     clear_db()
@@ -35,9 +37,9 @@ def project_service(db_session):
 class TestDatabaseConnection:
     """Test database connection and initialization"""
     
-    def test_init_db_creates_tables(self):
+    def test_init_db_creates_tables(self, test_database_url):
         """Database initialization should create all tables"""
-        init_db(":memory:")
+        init_db(test_database_url)
         db = next(get_db())
         
         # Check tables exist by querying them
@@ -48,9 +50,9 @@ class TestDatabaseConnection:
         assert "projects" in tables
         assert "phases" in tables
     
-    def test_get_db_returns_session(self):
+    def test_get_db_returns_session(self, test_database_url):
         """get_db should return a valid database session"""
-        init_db(":memory:")
+        init_db(test_database_url)
         db = next(get_db())
         
         assert db is not None
@@ -375,3 +377,1299 @@ class TestProjectService:
         names = [p["name"] for p in projects]
         assert "list-test-1" in names
         assert "list-test-2" in names
+
+
+class TestPhaseIndex:
+    """Test the (project_id, phase_number) index and its migration"""
+    
+    def test_phase_index_exists(self, db_session):
+        """Phases should have a unique composite index"""
+        from sqlalchemy import inspect
+        indexes = inspect(db_session.bind).get_indexes("phases")
+        
+        index = next(ix for ix in indexes if ix["name"] == "ix_phases_project_phase")
+        assert index["column_names"] == ["project_id", "phase_number"]
+        assert index["unique"]
+    
+    def test_duplicate_phase_number_rejected(self, db_session):
+        """Two phases with the same number in a project should be rejected"""
+        from sqlalchemy.exc import IntegrityError
+        project = Project(name="unique-test")
+        db_session.add(project)
+        db_session.commit()
+        
+        db_session.add_all([
+            Phase(project_id=project.id, phase_number=1, title="A", specs={}),
+            Phase(project_id=project.id, phase_number=1, title="B", specs={}),
+        ])
+        with pytest.raises(IntegrityError):
+            db_session.commit()
+        db_session.rollback()
+    
+    @pytest.mark.sqlite_only
+    def test_migration_adds_index_to_legacy_database(self, tmp_path):
+        """init_db should dedupe phases and add the index on old SQLite files"""
+        import sqlite3
+        from sqlalchemy import inspect
+        
+        db_file = tmp_path / "legacy.db"
+        conn = sqlite3.connect(db_file)
+        conn.executescript(
+            """
+            CREATE TABLE projects (
+                id VARCHAR(36) PRIMARY KEY, name VARCHAR(255) NOT NULL,
+                description TEXT, status VARCHAR(50), preferences JSON,
+                created_at DATETIME, updated_at DATETIME
+            );
+            CREATE TABLE phases (
+                id VARCHAR(36) PRIMARY KEY, project_id VARCHAR(36) NOT NULL,
+                phase_number INTEGER NOT NULL, title VARCHAR(255) NOT NULL,
+                specs JSON NOT NULL, status VARCHAR(50), progress_data JSON,
+                created_at DATETIME, updated_at DATETIME
+            );
+            INSERT INTO projects VALUES ('p1', 'legacy', NULL, 'active', NULL,
+                '2024-01-01 00:00:00', '2024-01-01 00:00:00');
+            INSERT INTO phases VALUES ('a', 'p1', 1, 'Old', '{}', 'planned', NULL,
+                '2024-01-01 00:00:00', '2024-01-01 00:00:00');
+            INSERT INTO phases VALUES ('b', 'p1', 1, 'New', '{}', 'planned', NULL,
+                '2024-01-02 00:00:00', '2024-01-02 00:00:00');
+            """
+        )
+        conn.commit()
+        conn.close()
+        
+        init_db(f"sqlite:///{db_file}")
+        db = next(get_db())
+        
+        indexes = {ix["name"] for ix in inspect(db.bind).get_indexes("phases")}
+        assert "ix_phases_project_phase" in indexes
+        assert ProjectService(db).get_phase("p1", 1)["title"] == "New"
+        assert ProjectService(db).get_project_status("p1")["total_phases"] == 1
+        assert [r["title"] for r in ProjectService(db).search_phases("new")["results"]] == ["New"]
+        assert ProjectService(db).get_phase("p1", 1)["version"] == 1
+        db.close()
+
+
+class TestListProjectsAggregate:
+    """Test the single-query implementation of list_projects"""
+    
+    def test_list_projects_statistics(self, project_service):
+        """Counts and current phase should reflect phase statuses"""
+        project = project_service.create_project(name="stats-test")
+        project_id = project["project_id"]
+        for number in (1, 2, 3):
+            project_service.save_phase(project_id, number, f"Phase {number}", {})
+        project_service.update_progress(project_id, 1, "completed")
+        project_service.update_progress(project_id, 2, "in_progress")
+        project_service.create_project(name="empty-project")
+        
+        projects = {p["name"]: p for p in project_service.list_projects()}
+        
+        stats = projects["stats-test"]
+        assert stats["phases_count"] == 3
+        assert stats["phases_completed"] == 1
+        assert stats["phases_in_progress"] == 1
+        assert stats["phases_planned"] == 1
+        assert stats["progress_percentage"] == 33
+        assert stats["current_phase"] == {"phase_number": 2, "title": "Phase 2", "status": "in_progress"}
+        
+        empty = projects["empty-project"]
+        assert empty["phases_count"] == 0
+        assert empty["current_phase"] is None
+        assert empty["progress_percentage"] == 0
+    
+    def test_list_projects_uses_single_query(self, project_service, db_session):
+        """list_projects should issue one SELECT regardless of project count"""
+        from sqlalchemy import event
+        for i in range(5):
+            project = project_service.create_project(name=f"query-{i}")
+            project_service.save_phase(project["project_id"], 1, "Phase 1", {})
+        
+        statements = []
+        
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+        
+        event.listen(db_session.bind, "before_cursor_execute", count)
+        try:
+            project_service.list_projects()
+        finally:
+            event.remove(db_session.bind, "before_cursor_execute", count)
+        
+        assert len(statements) == 1
+
+
+class TestPagination:
+    """Test keyset pagination of projects and phases"""
+    
+    def test_list_projects_pages(self, project_service):
+        """Following next_cursor should visit every project exactly once"""
+        names = {f"page-{i}" for i in range(7)}
+        for name in names:
+            project_service.create_project(name=name)
+        
+        seen = []
+        cursor = None
+        while True:
+            page = project_service.list_projects_page(limit=3, cursor=cursor)
+            assert len(page["projects"]) <= 3
+            seen.extend(p["name"] for p in page["projects"])
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        
+        assert sorted(seen) == sorted(names)
+    
+    def test_list_project_phases_pages(self, project_service):
+        """Phases should be paginated in phase_number order"""
+        project = project_service.create_project(name="phase-pages")
+        for number in range(1, 6):
+            project_service.save_phase(project["project_id"], number, f"Phase {number}", {})
+        
+        first = project_service.list_project_phases_page(project["project_id"], limit=2)
+        second = project_service.list_project_phases_page(
+            project["project_id"], limit=2, cursor=first["next_cursor"]
+        )
+        last = project_service.list_project_phases_page(
+            project["project_id"], limit=2, cursor=second["next_cursor"]
+        )
+        
+        assert [p["phase_number"] for p in first["phases"]] == [1, 2]
+        assert [p["phase_number"] for p in second["phases"]] == [3, 4]
+        assert [p["phase_number"] for p in last["phases"]] == [5]
+        assert last["next_cursor"] is None
+    
+    def test_invalid_cursor_raises_error(self, project_service):
+        """Malformed or foreign cursors should be rejected"""
+        from services.pagination import encode_cursor
+        
+        with pytest.raises(ValueError):
+            project_service.list_projects_page(cursor="not-a-cursor")
+        with pytest.raises(ValueError):
+            project_service.list_projects_page(cursor=encode_cursor("phases", n=1))
+
+
+@pytest.fixture
+async def async_db(tmp_path, test_database_url):
+    """Provide an AsyncSession (aiosqlite file or asyncpg) in async mode"""
+    from database.connection import init_async_db, get_async_db, dispose_async_db
+    url = test_database_url
+    if url == ":memory:":
+        # In-memory databases are not shared between the sync and async engines
+        url = f"sqlite:///{tmp_path / 'async.db'}"
+    init_db(url)
+    init_async_db(url)
+    async for db in get_async_db():
+        yield db
+    await dispose_async_db()
+    clear_db()
+
+
+class TestAsyncProjectService:
+    """Test the async service facade over aiosqlite"""
+    
+    async def test_async_round_trip(self, async_db):
+        """Async service should create, save, update and read phases"""
+        from sqlalchemy.ext.asyncio import AsyncSession
+        from services.async_project_service import AsyncProjectService
+        assert isinstance(async_db, AsyncSession)
+        
+        service = AsyncProjectService(async_db)
+        project = await service.create_project(name="async-test")
+        await service.save_phase(project["project_id"], 1, "Async Phase", {"instructions": "go"})
+        await service.update_progress(project["project_id"], 1, "completed")
+        
+        phase = await service.get_phase(project["project_id"], 1)
+        status = await service.get_project_status(project["project_id"])
+        page = await service.list_projects_page()
+        
+        assert phase["specs"] == {"instructions": "go"}
+        assert status["phases_completed"] == 1
+        assert [p["name"] for p in page["projects"]] == ["async-test"]
+    
+    async def test_async_protocol_execute(self, async_db):
+        """AsyncMCPProtocol should execute tools through the async session"""
+        from mcp.protocol import AsyncMCPProtocol
+        
+        protocol = AsyncMCPProtocol(async_db)
+        created = await protocol.execute_tool("create_project", {"name": "async-protocol"})
+        missing = await protocol.execute_tool("get_phase", {"project_id": "nope", "phase_number": 1})
+        
+        assert created["success"] is True
+        assert missing["success"] is False
+    
+    async def test_lock_retry_awaits_instead_of_sleeping(self, async_db, monkeypatch):
+        """Under run_sync the retry backoff should leave the event loop free"""
+        import sqlite3
+        import time
+        from sqlalchemy.exc import OperationalError
+        from database.sqlite import retry_on_lock
+        
+        def blocking_sleep(seconds):
+            raise AssertionError("time.sleep on the event loop")
+        monkeypatch.setattr(time, "sleep", blocking_sleep)
+        
+        class FlakyService:
+            def __init__(self, db):
+                self.db = db
+                self.calls = 0
+            
+            @retry_on_lock(attempts=3, base_delay=0.05)
+            def write(self):
+                self.calls += 1
+                if self.calls == 1:
+                    raise OperationalError("UPDATE", {}, sqlite3.OperationalError("database is locked"))
+                return "ok"
+        
+        ticks = 0
+        
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+        
+        background = asyncio.create_task(ticker())
+        try:
+            result = await async_db.run_sync(lambda session: FlakyService(session).write())
+        finally:
+            background.cancel()
+        assert result == "ok"
+        assert ticks > 1
+
+
+class TestSQLiteTuning:
+    """Test the SQLite PRAGMA profile and lock retries"""
+    
+    @pytest.mark.sqlite_only
+    def test_pragmas_applied_to_file_database(self, tmp_path):
+        """Every pooled connection should use the performance profile"""
+        from sqlalchemy import text
+        init_db(f"sqlite:///{tmp_path / 'tuned.db'}")
+        db = next(get_db())
+        
+        pragma = lambda name: db.execute(text(f"PRAGMA {name}")).scalar()
+        assert pragma("journal_mode") == "wal"
+        assert pragma("synchronous") == 1  # NORMAL
+        assert pragma("busy_timeout") == 5000
+        assert pragma("temp_store") == 2  # MEMORY
+        assert pragma("cache_size") == -65536
+        db.close()
+    
+    @pytest.mark.sqlite_only
+    def test_default_profile_leaves_sqlite_alone(self, tmp_path):
+        """SQLITE_PROFILE=default should skip all PRAGMAs"""
+        from sqlalchemy import text
+        from database.sqlite import SQLiteTuning
+        init_db(f"sqlite:///{tmp_path / 'plain.db'}", sqlite_tuning=SQLiteTuning(profile="default"))
+        db = next(get_db())
+        
+        assert db.execute(text("PRAGMA journal_mode")).scalar() == "delete"
+        db.close()
+    
+    def test_tuning_from_env(self, monkeypatch):
+        """Settings should be configurable through environment variables"""
+        from database.sqlite import SQLiteTuning
+        monkeypatch.setenv("SQLITE_BUSY_TIMEOUT_MS", "250")
+        monkeypatch.setenv("SQLITE_SYNCHRONOUS", "FULL")
+        
+        tuning = SQLiteTuning.from_env()
+        
+        assert "PRAGMA busy_timeout=250" in tuning.pragmas()
+        assert "PRAGMA synchronous=FULL" in tuning.pragmas()
+    
+    def test_retry_on_lock(self):
+        """Lock errors should be retried after a rollback; others should not"""
+        import sqlite3
+        from sqlalchemy.exc import OperationalError
+        from database.sqlite import retry_on_lock
+        
+        class FakeService:
+            def __init__(self, failures, message="database is locked"):
+                self.failures = failures
+                self.message = message
+                self.calls = 0
+                self.rollbacks = 0
+                self.db = self
+            
+            def rollback(self):
+                self.rollbacks += 1
+            
+            @retry_on_lock(attempts=3, base_delay=0)
+            def write(self):
+                self.calls += 1
+                if self.calls <= self.failures:
+                    raise OperationalError("UPDATE", {}, sqlite3.OperationalError(self.message))
+                return "ok"
+        
+        flaky = FakeService(failures=2)
+        assert flaky.write() == "ok"
+        assert flaky.calls == 3
+        assert flaky.rollbacks == 2
+        
+        with pytest.raises(OperationalError):
+            FakeService(failures=3).write()
+        broken = FakeService(failures=1, message="no such table: phases")
+        with pytest.raises(OperationalError):
+            broken.write()
+        assert broken.calls == 1
+
+
+class TestPostgresSettings:
+    """Test PostgreSQL engine configuration"""
+    
+    def test_engine_options_from_env(self, monkeypatch):
+        """Pool sizing and statement timeout should come from DB_* variables"""
+        from database.postgres import PostgresSettings
+        monkeypatch.setenv("DB_POOL_SIZE", "20")
+        monkeypatch.setenv("DB_POOL_PRE_PING", "false")
+        monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "1500")
+        
+        settings = PostgresSettings.from_env()
+        sync_options = settings.engine_options()
+        async_options = settings.engine_options(async_driver=True)
+        
+        assert sync_options["pool_size"] == 20
+        assert sync_options["pool_pre_ping"] is False
+        assert sync_options["connect_args"] == {"options": "-c statement_timeout=1500"}
+        assert async_options["connect_args"] == {"server_settings": {"statement_timeout": "1500"}}
+    
+    def test_database_urls_are_normalized(self):
+        """postgres:// URLs should be accepted and mapped to async drivers"""
+        from database.connection import _async_url
+        from database.postgres import normalize_url
+        
+        url = normalize_url("postgres://user:pw@db:5432/mcp")
+        
+        assert url == "postgresql://user:pw@db:5432/mcp"
+        assert _async_url(url) == "postgresql+asyncpg://user:pw@db:5432/mcp"
+        assert _async_url("sqlite:///./data/x.db") == "sqlite+aiosqlite:///./data/x.db"
+
+
+class TestProjectCounters:
+    """Test denormalized per-project phase counters"""
+    
+    def test_counters_follow_phase_writes(self, project_service, db_session):
+        """save_phase and update_progress should keep counters current"""
+        project = project_service.create_project(name="counter-test")
+        project_id = project["project_id"]
+        for number in (1, 2, 3):
+            project_service.save_phase(project_id, number, f"Phase {number}", {})
+        project_service.update_progress(project_id, 1, "completed")
+        project_service.update_progress(project_id, 2, "in_progress")
+        
+        row = db_session.query(Project).filter_by(id=project_id).one()
+        db_session.refresh(row)
+        
+        assert (row.phases_total, row.phases_completed, row.phases_in_progress, row.phases_planned) == (3, 1, 1, 1)
+        assert row.current_phase_number == 2
+        assert project_service.get_current_phase(project_id)["phase_number"] == 2
+        
+        project_service.update_progress(project_id, 2, "completed")
+        project_service.update_progress(project_id, 3, "completed")
+        status = project_service.get_project_status(project_id)
+        
+        assert status["phases_completed"] == 3
+        assert status["current_phase"] is None
+        assert project_service.get_current_phase(project_id) is None
+    
+    def test_repair_counters(self, project_service, db_session):
+        """repair_counters should fix only drifted projects"""
+        from sqlalchemy import update
+        healthy = project_service.create_project(name="healthy")
+        drifted = project_service.create_project(name="drifted")
+        for project in (healthy, drifted):
+            project_service.save_phase(project["project_id"], 1, "Phase 1", {})
+        db_session.execute(
+            update(Project)
+            .where(Project.id == drifted["project_id"])
+            .values(phases_total=42, current_phase_number=None)
+        )
+        db_session.commit()
+        
+        assert project_service.repair_counters() == 1
+        
+        status = project_service.get_project_status(drifted["project_id"])
+        assert status["total_phases"] == 1
+        assert status["current_phase"]["phase_number"] == 1
+        assert project_service.repair_counters() == 0
+    
+    def test_concurrent_phase_writes_keep_counters(self, project_service, test_database_url):
+        """Two transactions writing different phases of a project must both be counted"""
+        import threading
+        import time
+        if not test_database_url.startswith("postgres"):
+            pytest.skip("Concurrent writers need PostgreSQL (SQLite serializes them)")
+        project_id = project_service.create_project(name="raced")["project_id"]
+        project_service.save_phases(project_id, [
+            {"phase_number": n, "title": f"Phase {n}", "specs": {}} for n in (1, 2)
+        ])
+        first = ProjectService(next(get_db()), cache=None)
+        second = ProjectService(next(get_db()), cache=None)
+        
+        with first.transaction():
+            first.update_progress(project_id, 1, "completed")
+            # Starts while the first transaction holds the project
+            writer = threading.Thread(target=second.update_progress, args=(project_id, 2, "completed"))
+            writer.start()
+            time.sleep(0.2)
+        writer.join(10)
+        
+        status = ProjectService(next(get_db()), cache=None).get_project_status(project_id)
+        assert status["phases_completed"] == 2
+        assert status["current_phase"] is None
+    
+    def test_current_phase_past_the_last_phase(self, project_service, db_session):
+        """A drifted current_phase_number should read as no current phase"""
+        from sqlalchemy import update
+        project_id = project_service.create_project(name="drifted")["project_id"]
+        project_service.save_phase(project_id, 1, "Phase 1", {})
+        db_session.execute(update(Project).where(Project.id == project_id).values(current_phase_number=7))
+        db_session.commit()
+        
+        assert project_service.get_current_phase(project_id) is None
+
+
+class TestSavePhases:
+    """Test bulk save_phases upsert"""
+    
+    def test_save_phases_inserts_and_updates_in_one_statement(self, project_service, db_session):
+        """Existing phases keep their status; the plan is written by one INSERT"""
+        from sqlalchemy import event
+        project_id = project_service.create_project(name="bulk")["project_id"]
+        project_service.save_phase(project_id, 1, "Old title", {"v": 1})
+        project_service.update_progress(project_id, 1, "completed", {"notes": "done"})
+        
+        statements = []
+        engine = db_session.get_bind()
+        
+        def count(conn, cursor, statement, *args):
+            statements.append(statement)
+        
+        event.listen(engine, "before_cursor_execute", count)
+        try:
+            result = project_service.save_phases(project_id, [
+                {"phase_number": n, "title": f"Phase {n}", "specs": {"v": 2}}
+                for n in (3, 1, 2)
+            ])
+        finally:
+            event.remove(engine, "before_cursor_execute", count)
+        
+        assert [p["phase_number"] for p in result["phases"]] == [1, 2, 3]
+        assert [p["status"] for p in result["phases"]] == ["completed", "planned", "planned"]
+        assert sum(s.lstrip().upper().startswith("INSERT INTO PHASES") for s in statements) == 1
+        
+        phase = project_service.get_phase(project_id, 1)
+        assert phase["title"] == "Phase 1"
+        assert phase["specs"] == {"v": 2}
+        assert phase["progress_data"] == {"notes": "done"}
+        
+        status = project_service.get_project_status(project_id)
+        assert status["total_phases"] == 3
+        assert status["phases_completed"] == 1
+        assert status["current_phase"]["phase_number"] == 2
+    
+    def test_save_phases_rejects_invalid_plans(self, project_service):
+        """Unknown projects, duplicates and incomplete phases raise ValueError"""
+        project_id = project_service.create_project(name="bulk-invalid")["project_id"]
+        
+        with pytest.raises(ValueError, match="not found"):
+            project_service.save_phases("missing", [{"phase_number": 1, "title": "x", "specs": {}}])
+        with pytest.raises(ValueError, match="Duplicate"):
+            project_service.save_phases(project_id, [
+                {"phase_number": 1, "title": "a", "specs": {}},
+                {"phase_number": 1, "title": "b", "specs": {}},
+            ])
+        with pytest.raises(ValueError, match="missing 'specs'"):
+            project_service.save_phases(project_id, [{"phase_number": 1, "title": "a"}])
+
+
+class TestWriteStatementCount:
+    """Write tools should not read back what they just wrote"""
+    
+    @pytest.fixture
+    def statements(self, db_session):
+        """Collect SQL statements executed on the session's engine"""
+        from sqlalchemy import event
+        executed = []
+        engine = db_session.get_bind()
+        
+        def collect(conn, cursor, statement, *args):
+            executed.append(statement.split()[0].upper())
+        
+        event.listen(engine, "before_cursor_execute", collect)
+        yield executed
+        event.remove(engine, "before_cursor_execute", collect)
+    
+    def test_writes_issue_no_refresh_select(self, project_service, statements, db_session):
+        """create_project is one INSERT; phase writes add only the counter UPDATE and search index entry"""
+        # PostgreSQL first locks the project row (see ProjectService._lock_project)
+        lock = ["SELECT"] if db_session.get_bind().dialect.name == "postgresql" else []
+        project = project_service.create_project(name="counted")
+        assert statements == ["INSERT"]
+        
+        statements.clear()
+        project_service.save_phase(project["project_id"], 1, "Phase 1", {})
+        assert statements == lock + ["INSERT", "UPDATE", "INSERT"]
+        
+        statements.clear()
+        result = project_service.update_progress(project["project_id"], 1, "completed", {"notes": "ok"})
+        assert statements == lock + ["UPDATE", "UPDATE"]
+        assert result["progress_data"] == {"notes": "ok"}
+    
+    def test_session_sees_its_own_writes(self, project_service):
+        """Objects loaded earlier in the session must not go stale"""
+        project_id = project_service.create_project(name="fresh")["project_id"]
+        project_service.save_phase(project_id, 1, "Draft", {})
+        assert project_service.get_phase(project_id, 1)["status"] == "planned"
+        assert project_service.get_project_status(project_id)["phases_completed"] == 0
+        
+        project_service.save_phase(project_id, 1, "Final", {"v": 2})
+        project_service.update_progress(project_id, 1, "completed")
+        
+        phase = project_service.get_phase(project_id, 1)
+        assert (phase["title"], phase["specs"], phase["status"]) == ("Final", {"v": 2}, "completed")
+        assert project_service.get_project_status(project_id)["phases_completed"] == 1
+    
+    def test_timestamps_serialize_the_same_before_and_after_reload(self, project_service, db_session):
+        """Client-side timestamps round-trip as UTC"""
+        created = project_service.create_project(name="utc")
+        db_session.expire_all()
+        
+        details = project_service.get_project_details(created["project_id"])
+        
+        assert details["created_at"] == created["created_at"]
+        assert details["created_at"].endswith("+00:00")
+
+
+class TestProjectETag:
+    """Test project versions and ETags"""
+    
+    def test_phase_writes_change_the_etag(self, project_service):
+        """Every phase write bumps the project's version and ETag"""
+        from services.etag import etag_matches
+        project_id = project_service.create_project(name="tagged")["project_id"]
+        tags = [project_service.get_project_etag(project_id)]
+        
+        project_service.save_phase(project_id, 1, "Phase 1", {})
+        tags.append(project_service.get_project_etag(project_id))
+        project_service.update_progress(project_id, 1, "completed")
+        tags.append(project_service.get_project_etag(project_id))
+        project_service.save_phases(project_id, [{"phase_number": 2, "title": "Phase 2", "specs": {}}])
+        tags.append(project_service.get_project_etag(project_id))
+        
+        assert len(set(tags)) == 4
+        assert tags[0].startswith('"1-')
+        assert tags[-1].startswith('"4-')
+        assert project_service.get_project_etag(project_id) == tags[-1]
+        assert etag_matches(f'W/{tags[-1]}, "other"', tags[-1])
+        assert etag_matches("*", tags[-1])
+        assert not etag_matches(tags[0], tags[-1])
+        
+        with pytest.raises(ValueError):
+            project_service.get_project_etag("missing")
+
+
+class TestReadCache:
+    """Test the read-through cache around hot project reads"""
+    
+    @pytest.fixture
+    def cache(self):
+        from services.cache import ReadCache
+        return ReadCache(max_entries=100, ttl_seconds=60)
+    
+    @pytest.fixture
+    def service(self, db_session, cache):
+        return ProjectService(db_session, cache=cache)
+    
+    def _project_with_phases(self, service, count=2):
+        project_id = service.create_project(name="cached")["project_id"]
+        for number in range(1, count + 1):
+            service.save_phase(project_id, number, f"Phase {number}", {})
+        return project_id
+    
+    def test_repeated_reads_hit_the_cache(self, service, cache, db_session):
+        """The second read of each tool should not query the database"""
+        from sqlalchemy import event
+        project_id = self._project_with_phases(service)
+        reads = [
+            lambda: service.get_phase(project_id, 1),
+            lambda: service.get_project_status(project_id),
+            lambda: service.list_project_phases_page(project_id),
+            lambda: service.get_current_phase(project_id),
+        ]
+        first = [read() for read in reads]
+        
+        statements = []
+        engine = db_session.get_bind()
+        collect = lambda *args: statements.append(args[2])
+        event.listen(engine, "before_cursor_execute", collect)
+        try:
+            second = [read() for read in reads]
+        finally:
+            event.remove(engine, "before_cursor_execute", collect)
+        
+        assert second == first
+        assert statements == []
+        assert cache.stats()["hits"] == 4
+        assert service.get_phase(project_id, phase_number=1) is second[0]
+    
+    def test_writes_invalidate_precisely(self, service, cache):
+        """A phase write drops that phase and project-level entries only"""
+        project_id = self._project_with_phases(service)
+        other_phase = service.get_phase(project_id, 2)
+        service.get_phase(project_id, 1)
+        service.get_project_status(project_id)
+        
+        service.update_progress(project_id, 1, "completed")
+        
+        assert service.get_phase(project_id, 1)["status"] == "completed"
+        assert service.get_project_status(project_id)["phases_completed"] == 1
+        assert service.get_phase(project_id, 2) is other_phase
+        assert service.get_current_phase(project_id)["phase_number"] == 2
+    
+    def test_transaction_invalidates_after_commit(self, service):
+        """Reads inside transaction() bypass the cache; commit invalidates"""
+        project_id = self._project_with_phases(service, count=1)
+        assert service.get_phase(project_id, 1)["title"] == "Phase 1"
+        
+        with service.transaction():
+            service.save_phase(project_id, 1, "Renamed", {})
+            assert service.get_phase(project_id, 1)["title"] == "Renamed"
+        
+        assert service.get_phase(project_id, 1)["title"] == "Renamed"
+    
+    def test_eviction_expiry_and_stale_fill(self, cache):
+        """LRU eviction, TTL expiry and reads that raced a write"""
+        import time
+        from services.cache import ReadCache
+        small = ReadCache(max_entries=2, ttl_seconds=60)
+        for n in range(3):
+            small.set(("phase", "p", n), n, small.generation("p"))
+        assert small.stats()["size"] == 2
+        assert small.stats()["evictions"] == 1
+        
+        short = ReadCache(max_entries=10, ttl_seconds=0.01)
+        short.set(("status", "p"), "old", short.generation("p"))
+        time.sleep(0.02)
+        short.get(("status", "p"))
+        assert short.stats()["expirations"] == 1
+        
+        before_write = cache.generation("p")
+        cache.invalidate("p", [1])
+        cache.set(("status", "p"), "stale", before_write)
+        assert cache.stats()["size"] == 0
+    
+    def test_per_project_bookkeeping_is_bounded(self):
+        """Generations and versions of old projects are forgotten safely"""
+        from services.cache import ReadCache
+        small = ReadCache(max_entries=2, ttl_seconds=60)
+        before_write = small.generation("p")
+        small.invalidate("p")
+        for n in range(5):
+            small.observe_version(f"other-{n}", 1)
+        assert len(small._generations) == 2
+        assert len(small._versions) == 2
+        
+        # "p" was forgotten, yet its in-flight read still cannot fill
+        small.set(("status", "p"), "stale", before_write)
+        assert small.stats()["size"] == 0
+        small.set(("status", "p"), "fresh", small.generation("p"))
+        assert small.get(("status", "p")) == "fresh"
+
+    def test_newer_version_drops_entries_written_elsewhere(self, service, cache, db_session):
+        """A write by another process is noticed when the ETag check sees its version"""
+        project_id = self._project_with_phases(service, count=1)
+        service.get_project_etag(project_id)
+        assert service.get_project_status(project_id)["total_phases"] == 1
+        
+        # Another worker: same database, its own cache
+        ProjectService(db_session, cache=None).save_phase(project_id, 2, "Elsewhere", {})
+        assert service.get_project_status(project_id)["total_phases"] == 1
+        
+        service.get_project_etag(project_id)
+        assert service.get_project_status(project_id)["total_phases"] == 2
+        invalidations = cache.stats()["invalidations"]
+        service.get_project_etag(project_id)
+        assert cache.stats()["invalidations"] == invalidations
+
+
+
+class TestDeferredPayload:
+    """Summary reads should not decode specs or progress_data"""
+    
+    @pytest.fixture
+    def counting_service(self, test_database_url, db_session):
+        """ProjectService on an engine that records the size of every decoded JSON value"""
+        from sqlalchemy import create_engine
+        from sqlalchemy.orm import sessionmaker
+        from sqlalchemy.pool import StaticPool
+        from database.connection import normalize_url
+        from database.models import Base
+        decoded = []
+        
+        def loads(value):
+            decoded.append(len(value))
+            return json.loads(value)
+        
+        if test_database_url.startswith("postgres"):
+            engine = create_engine(normalize_url(test_database_url), json_deserializer=loads)
+        else:
+            engine = create_engine("sqlite://", poolclass=StaticPool, json_deserializer=loads)
+            Base.metadata.create_all(engine)
+        session = sessionmaker(bind=engine, expire_on_commit=False)()
+        yield ProjectService(session, cache=None), decoded
+        session.close()
+        engine.dispose()
+    
+    def test_summary_reads_decode_no_payload(self, counting_service):
+        """Status and listings should read only summary columns"""
+        service, decoded = counting_service
+        specs = {"instructions": "x" * 20000}
+        project_id = service.create_project(name="large specs")["project_id"]
+        for number in (1, 2, 3):
+            service.save_phase(project_id, number, f"Phase {number}", specs)
+        service.update_progress(project_id, 1, "completed", {"notes": "y" * 20000})
+        decoded.clear()
+        
+        status = service.get_project_status(project_id)
+        phases = service.list_project_phases(project_id)
+        service.list_projects()
+        
+        assert sum(decoded) < 1000
+        assert status["total_phases"] == 3
+        assert [phase["has_progress_data"] for phase in phases] == [True, False, False]
+        
+        assert service.get_phase(project_id, 2)["specs"] == specs
+        assert sum(decoded) > 20000
+
+
+class TestCompressedPayloads:
+    """Test compressed storage of specs and progress_data"""
+    
+    LARGE_SPECS = {
+        "instructions": "Implementar o endpoint com validação e testes. " * 100,
+        "files_to_create": [f"src/module_{i}.py" for i in range(50)]
+    }
+    
+    def test_encode_and_decode(self):
+        """Small values stay JSON text; large ones get the zlib header"""
+        from database.compression import ZLIB_HEADER, decode_json, encode_json
+        
+        assert encode_json({"a": 1}) == '{"a": 1}'
+        stored = encode_json(self.LARGE_SPECS)
+        assert stored.startswith(ZLIB_HEADER)
+        assert len(stored) < len(json.dumps(self.LARGE_SPECS)) / 5
+        assert decode_json(stored) == self.LARGE_SPECS
+        assert decode_json('{"a": 1}') == {"a": 1}
+    
+    def test_round_trip_through_service(self, project_service):
+        """Compression is invisible to ProjectService"""
+        project_id = project_service.create_project(name="compressed")["project_id"]
+        project_service.save_phase(project_id, 1, "Large", self.LARGE_SPECS)
+        project_service.update_progress(project_id, 1, "completed", {"notes": "ok " * 1000})
+        
+        phase = project_service.get_phase(project_id, 1)
+        
+        assert phase["specs"] == self.LARGE_SPECS
+        assert phase["progress_data"] == {"notes": "ok " * 1000}
+        assert project_service.list_project_phases(project_id)[0]["has_progress_data"] is True
+    
+    @pytest.mark.sqlite_only
+    def test_recompress_plain_rows(self, project_service, db_session):
+        """Rows written as plain JSON stay readable and can be recompressed"""
+        from sqlalchemy import text
+        from database.compression import recompress_payloads
+        project_id = project_service.create_project(name="legacy")["project_id"]
+        project_service.save_phase(project_id, 1, "Small", {"instructions": "short"})
+        project_service.save_phase(project_id, 2, "Large", {})
+        db_session.execute(
+            text("UPDATE phases SET specs = :specs WHERE phase_number = 2"),
+            {"specs": json.dumps(self.LARGE_SPECS)}
+        )
+        db_session.commit()
+        assert project_service.get_phase(project_id, 2)["specs"] == self.LARGE_SPECS
+        
+        report = recompress_payloads(db_session.get_bind())
+        
+        assert report["rows_scanned"] == 2
+        assert report["values_rewritten"] == 1
+        assert report["bytes_after"] < report["bytes_before"] / 5
+        stored = dict(db_session.execute(text("SELECT phase_number, typeof(specs) FROM phases")).all())
+        assert stored == {1: "text", 2: "blob"}
+        project_service.cache.clear()
+        assert project_service.get_phase(project_id, 2)["specs"] == self.LARGE_SPECS
+        assert recompress_payloads(db_session.get_bind())["values_rewritten"] == 0
+
+
+class TestExportRecords:
+    """Test the streaming export of projects and phases"""
+    
+    def test_projects_followed_by_their_phases(self, project_service):
+        """Each project record comes before its phases, in phase order"""
+        first = project_service.create_project(name="first")["project_id"]
+        second = project_service.create_project(name="second", preferences={"lang": "pt"})["project_id"]
+        project_service.save_phases(second, [
+            {"phase_number": 2, "title": "B", "specs": {"instructions": "b" * 2000}},
+            {"phase_number": 1, "title": "A", "specs": {}},
+        ])
+        project_service.update_progress(second, 1, "completed", {"notes": "done"})
+        
+        records = list(project_service.export_records(batch_size=2))
+        
+        assert [(r["type"], r["project_id"], r.get("phase_number")) for r in records] == [
+            ("project", first, None),
+            ("project", second, None),
+            ("phase", second, 1),
+            ("phase", second, 2),
+        ]
+        assert records[1]["preferences"] == {"lang": "pt"}
+        assert records[2]["progress_data"] == {"notes": "done"}
+        assert records[3]["specs"] == {"instructions": "b" * 2000}
+    
+    def test_rows_are_streamed(self, project_service, db_session):
+        """Both export queries run with streaming execution options"""
+        from sqlalchemy import event
+        project_id = project_service.create_project(name="stream")["project_id"]
+        project_service.save_phase(project_id, 1, "A", {})
+        
+        options = []
+        engine = db_session.get_bind()
+        collect = lambda conn, cursor, statement, params, context, many: options.append(context.execution_options)
+        event.listen(engine, "before_cursor_execute", collect)
+        try:
+            records = project_service.export_records()
+            next(records)
+            assert len(options) == 2
+            list(records)
+        finally:
+            event.remove(engine, "before_cursor_execute", collect)
+        
+        assert all(opts.get("stream_results") and opts.get("yield_per") for opts in options)
+
+
+class TestNDJSONImport:
+    """Test importing an NDJSON export"""
+    
+    def _import(self, db_session, lines, upsert=False, **options):
+        """Feed NDJSON lines to an importer in small pieces and commit"""
+        from services.ndjson import NDJSONImporter
+        importer = NDJSONImporter(upsert=upsert, **options)
+        data = b"".join(json.dumps(line).encode() + b"\n" for line in lines)
+        for start in range(0, len(data), 7):
+            importer.feed(data[start:start + 7])
+            if importer.ready:
+                importer.flush(db_session)
+        importer.close()
+        importer.flush(db_session)
+        return importer
+    
+    def test_export_round_trip(self, project_service, db_session):
+        """Re-importing an export into an empty database restores it"""
+        project_id = project_service.create_project(name="source", preferences={"lang": "pt"})["project_id"]
+        project_service.save_phases(project_id, [
+            {"phase_number": 1, "title": "A", "specs": {"instructions": "a" * 2000}},
+            {"phase_number": 2, "title": "B", "specs": {}},
+        ])
+        project_service.update_progress(project_id, 1, "completed", {"notes": "done"})
+        from services.ndjson import export_header
+        lines = [export_header(), *project_service.export_records()]
+        clear_db()
+        
+        importer = self._import(db_session, lines, chunk_size=2, transaction_rows=2)
+        
+        assert importer.committed == {"projects": 1, "phases": 2}
+        assert importer.transactions == 2
+        assert list(project_service.export_records())[1:] == lines[2:]
+        status = project_service.get_project_status(project_id)
+        assert (status["total_phases"], status["phases_completed"]) == (2, 1)
+    
+    def test_no_transaction_open_between_flushes(self, db_session):
+        """Rows are buffered until a transaction is full, then written and committed at once"""
+        from services.ndjson import NDJSONImporter
+        importer = NDJSONImporter(chunk_size=1, transaction_rows=2)
+        records = [
+            {"type": "export", "version": 1},
+            {"type": "project", "project_id": "p", "name": "buffered"},
+            {"type": "phase", "project_id": "p", "phase_number": 1, "title": "A", "specs": {}},
+            {"type": "phase", "project_id": "p", "phase_number": 2, "title": "B", "specs": {}},
+        ]
+        importer.feed(b"".join(json.dumps(record).encode() + b"\n" for record in records[:2]))
+        assert not importer.ready
+        importer.feed(json.dumps(records[2]).encode() + b"\n")
+        assert importer.ready
+        
+        importer.flush(db_session)
+        # A slow upload now waits with no write transaction (and lock) held
+        assert not db_session.in_transaction()
+        assert importer.committed == {"projects": 1, "phases": 1}
+        
+        importer.feed(json.dumps(records[3]).encode())
+        importer.close()
+        importer.flush(db_session)
+        assert importer.committed == {"projects": 1, "phases": 2}
+        assert importer.transactions == 2
+
+    def test_upsert_updates_existing_phases(self, project_service, db_session):
+        """With upsert, phases are matched on (project_id, phase_number)"""
+        project_id = project_service.create_project(name="target")["project_id"]
+        project_service.save_phase(project_id, 1, "Old", {})
+        header = {"type": "export", "version": 1}
+        project = {"type": "project", "project_id": project_id, "name": "renamed"}
+        phase = {"type": "phase", "project_id": project_id, "phase_number": 1, "title": "New",
+                 "specs": {"v": 2}, "status": "completed"}
+        
+        with pytest.raises(ValueError, match="Lines 2-3"):
+            self._import(db_session, [header, project, phase])
+        self._import(db_session, [header, project, phase], upsert=True)
+        
+        assert project_service.get_project_details(project_id)["name"] == "renamed"
+        assert project_service.get_phase(project_id, 1)["title"] == "New"
+        assert project_service.get_project_status(project_id)["phases_completed"] == 1
+    
+    def test_versions_survive_round_trip(self, project_service, db_session):
+        """Exported versions are restored, and never move backwards on upsert"""
+        from services.ndjson import export_header
+        project_id = project_service.create_project(name="versioned")["project_id"]
+        project_service.save_phase(project_id, 1, "A", {})
+        project_service.update_progress(project_id, 1, "in_progress")
+        project_version = project_service.get_project_version(project_id)
+        lines = [export_header(), *project_service.export_records()]
+        assert (lines[1]["version"], lines[2]["version"]) == (project_version, 2)
+        clear_db()
+        
+        self._import(db_session, lines)
+        assert project_service.get_phase(project_id, 1)["version"] == 2
+        assert project_service.get_project_version(project_id) > project_version
+        assert project_service.update_progress(project_id, 1, "completed", expected_version=2)["version"] == 3
+        
+        # Re-importing the older export keeps the newer versions
+        self._import(db_session, lines, upsert=True)
+        assert project_service.get_phase(project_id, 1)["version"] == 4
+        
+        with pytest.raises(ValueError, match="Line 2: version must be a positive integer"):
+            self._import(db_session, [lines[0], {**lines[1], "version": 0}], upsert=True)
+    
+    def test_invalid_line_reports_line_number(self, db_session):
+        """Bad records fail with their line number and nothing is written"""
+        header = {"type": "export", "version": 1}
+        
+        with pytest.raises(ValueError, match="Line 2: phase record without 'title'"):
+            self._import(db_session, [header, {"type": "phase", "project_id": "p", "phase_number": 1}])
+        with pytest.raises(ValueError, match="Line 1: unsupported export version"):
+            self._import(db_session, [{"type": "export", "version": 99}])
+        with pytest.raises(ValueError, match="Project missing not found"):
+            self._import(db_session, [header, {"type": "phase", "project_id": "missing",
+                                               "phase_number": 1, "title": "A", "specs": {}}])
+        
+        assert db_session.query(Phase).count() == 0
+
+
+class TestOptimisticConcurrency:
+    """Test phase versions and expected_version compare-and-swap writes"""
+    
+    def test_every_phase_write_bumps_its_version(self, project_service):
+        """save_phase, save_phases and update_progress each increment the version"""
+        project_id = project_service.create_project(name="versioned")["project_id"]
+        
+        assert project_service.save_phase(project_id, 1, "A", {})["version"] == 1
+        assert project_service.save_phase(project_id, 1, "A2", {})["version"] == 2
+        saved = project_service.save_phases(project_id, [
+            {"phase_number": 1, "title": "A3", "specs": {}},
+            {"phase_number": 2, "title": "B", "specs": {}},
+        ])
+        assert [p["version"] for p in saved["phases"]] == [3, 1]
+        assert project_service.update_progress(project_id, 1, "in_progress")["version"] == 4
+        
+        assert project_service.get_phase(project_id, 1)["version"] == 4
+        assert [p["version"] for p in project_service.list_project_phases(project_id)] == [4, 1]
+        assert project_service.get_current_phase(project_id)["version"] == 4
+    
+    def test_expected_version_on_missing_project_is_not_found(self, project_service):
+        """A missing project is reported as such, not as a version conflict"""
+        with pytest.raises(ValueError, match="Project missing not found"):
+            project_service.save_phase("missing", 1, "A", {}, expected_version=1)
+        with pytest.raises(ValueError, match="Project missing not found"):
+            project_service.save_phase("missing", 1, "A", {}, expected_version=0)
+    
+    def test_save_phase_with_stale_version_conflicts(self, project_service):
+        """A write based on an old version fails and leaves the phase untouched"""
+        from services.project_service import VersionConflict
+        project_id = project_service.create_project(name="cas-save")["project_id"]
+        project_service.save_phase(project_id, 1, "A", {}, expected_version=0)
+        project_service.save_phase(project_id, 1, "Mine", {}, expected_version=1)
+        
+        with pytest.raises(VersionConflict) as conflict:
+            project_service.save_phase(project_id, 1, "Theirs", {}, expected_version=1)
+        assert (conflict.value.expected_version, conflict.value.current_version) == (1, 2)
+        with pytest.raises(VersionConflict):
+            project_service.save_phase(project_id, 1, "Again", {}, expected_version=0)
+        with pytest.raises(VersionConflict) as missing:
+            project_service.save_phase(project_id, 2, "Never created", {}, expected_version=1)
+        assert missing.value.current_version == 0
+        
+        phases = project_service.list_project_phases(project_id)
+        assert [(p["title"], p["version"]) for p in phases] == [("Mine", 2)]
+    
+    def test_update_progress_with_stale_version_keeps_progress(self, project_service):
+        """Concurrent progress updates cannot overwrite each other's progress_data"""
+        from services.project_service import VersionConflict
+        project_id = project_service.create_project(name="cas-progress")["project_id"]
+        version = project_service.save_phase(project_id, 1, "A", {})["version"]
+        
+        project_service.update_progress(project_id, 1, "in_progress", {"notes": "first"}, expected_version=version)
+        with pytest.raises(VersionConflict):
+            project_service.update_progress(project_id, 1, "completed", {"notes": "second"}, expected_version=version)
+        with pytest.raises(ValueError, match="not found"):
+            project_service.update_progress(project_id, 9, "completed", expected_version=1)
+        
+        phase = project_service.get_phase(project_id, 1)
+        assert (phase["status"], phase["progress_data"], phase["version"]) == ("in_progress", {"notes": "first"}, 2)
+
+
+class TestPhaseSearch:
+    """Test the full-text search index over phases"""
+    
+    def _plan(self, project_service):
+        """Create a project with three phases to search"""
+        project_id = project_service.create_project(
+            name="Loja", description="Backend da loja com Redis"
+        )["project_id"]
+        project_service.save_phases(project_id, [
+            {"phase_number": 1, "title": "Auth module", "specs": {
+                "instructions": "Implementar autenticação JWT",
+                "files_to_create": ["src/auth/login_view.py"]
+            }},
+            {"phase_number": 2, "title": "Cache", "specs": {"instructions": "Cache de sessões"}},
+            {"phase_number": 3, "title": "Deploy", "specs": {"instructions": "Rotate authentication keys"}},
+        ])
+        return project_id
+    
+    def test_search_matches_indexed_fields(self, project_service):
+        """Title, instructions, file paths and project text are searchable"""
+        project_id = self._plan(project_service)
+        search = lambda query: [r["phase_number"] for r in project_service.search_phases(query)["results"]]
+        
+        assert search("auth") == [1, 3]  # Title match ranks first; prefixes match
+        assert search("autenticacao jwt") == [1]  # Accents are ignored
+        assert search("login") == [1]
+        assert sorted(search("redis")) == [1, 2, 3]
+        assert search("auth") == search("AUTH!")
+        assert project_service.search_phases("cache", project_id="other")["results"] == []
+        with pytest.raises(ValueError):
+            project_service.search_phases("   ")
+    
+    def test_search_pages(self, project_service):
+        """Results are paginated with a cursor tied to the query"""
+        self._plan(project_service)
+        
+        first = project_service.search_phases("loja", limit=2)
+        second = project_service.search_phases("loja", limit=2, cursor=first["next_cursor"])
+        
+        assert len(first["results"]) == 2 and len(second["results"]) == 1
+        assert second["next_cursor"] is None
+        numbers = {r["phase_number"] for r in first["results"] + second["results"]}
+        assert numbers == {1, 2, 3}
+        with pytest.raises(ValueError):
+            project_service.search_phases("cache", cursor=first["next_cursor"])
+    
+    def test_index_follows_writes(self, project_service):
+        """Updated phases are reindexed in the same transaction"""
+        project_id = self._plan(project_service)
+        
+        project_service.save_phase(project_id, 2, "Redis cluster", {"instructions": "Sharding"})
+        
+        assert project_service.search_phases("sessoes")["results"] == []
+        assert [r["phase_number"] for r in project_service.search_phases("sharding")["results"]] == [2]
+
+
+class TestChangeEvents:
+    """Test the change feed published by ProjectService writes"""
+    
+    @pytest.fixture
+    def broker(self):
+        from services.events import EventBroker
+        return EventBroker(buffer_size=3)
+    
+    @pytest.fixture
+    def service(self, db_session, broker):
+        return ProjectService(db_session, events=broker)
+    
+    async def _drain(self, subscription):
+        """Items already queued on a subscription"""
+        await asyncio.sleep(0)  # Run pending call_soon_threadsafe deliveries
+        items = []
+        while not subscription.queue.empty():
+            items.append(subscription.queue.get_nowait())
+        return items
+    
+    async def test_writes_publish_after_commit(self, service, broker):
+        """Phase writes publish created/updated events with the project version"""
+        project_id = service.create_project(name="watched")["project_id"]
+        subscription = broker.subscribe(project_id)
+        others = broker.subscribe("other-project")
+        
+        service.save_phase(project_id, 1, "A", {})
+        service.save_phase(project_id, 1, "A2", {})
+        service.update_progress(project_id, 1, "completed")
+        with pytest.raises(ValueError):
+            with service.transaction():
+                service.save_phase(project_id, 2, "B", {})
+                raise ValueError("rolled back")
+        
+        events = await self._drain(subscription)
+        assert [(e.type, e.data["status"], e.data["version"]) for e in events] == [
+            ("phase.created", "planned", 2),
+            ("phase.updated", "planned", 3),
+            ("phase.updated", "completed", 4),
+        ]
+        assert await self._drain(others) == []
+    
+    async def test_resume_from_last_event_id(self, service, broker):
+        """Buffered events are replayed; lost ones turn into a reset"""
+        from services.events import RESET
+        project_id = service.create_project(name="resumed")["project_id"]
+        first = broker.last_event_id
+        service.save_phase(project_id, 1, "A", {})
+        service.save_phase(project_id, 2, "B", {})
+        
+        replayed = await self._drain(broker.subscribe(project_id, last_event_id=first))
+        assert [e.data["phase_number"] for e in replayed] == [1, 2]
+        assert await self._drain(broker.subscribe(project_id, last_event_id="old-epoch-1")) == [RESET]
+        
+        service.save_phase(project_id, 3, "C", {})
+        service.save_phase(project_id, 4, "D", {})  # Buffer of 3 drops phase 1's event
+        assert await self._drain(broker.subscribe(project_id, last_event_id=first)) == [RESET]
+    
+    async def test_sse_frames(self, service, broker):
+        """The stream sends a retry hint, events and keepalives"""
+        from services.events import sse_stream
+        project_id = service.create_project(name="framed")["project_id"]
+        stream = sse_stream(broker, project_id, keepalive=0.01)
+        # Nothing is subscribed until the body is sent
+        assert broker.stats()["subscribers"] == 0
+        
+        assert await stream.__anext__() == b"retry: 3000\n\n"
+        assert await stream.__anext__() == b": keepalive\n\n"
+        service.save_phase(project_id, 1, "A", {})
+        frame = await stream.__anext__()
+        await stream.aclose()
+        
+        lines = frame.decode().splitlines()
+        assert lines[1] == "event: phase.created"
+        assert json.loads(lines[2][len("data: "):])["project_id"] == project_id
+        assert broker.stats()["subscribers"] == 0
+    
+    async def test_long_poll_parks_until_version_changes(self, db_session):
+        """wait_since returns once a write moves the version past it, or at the timeout"""
+        from mcp.protocol import AsyncMCPProtocol
+        service = ProjectService(db_session)
+        project_id = service.create_project(name="polled")["project_id"]
+        protocol = AsyncMCPProtocol(db_session)
+        arguments = {"project_id": project_id, "wait_since": 1, "timeout": 5}
+        
+        poll = asyncio.create_task(protocol.execute_tool("get_project_status", arguments))
+        await asyncio.sleep(0.1)
+        assert not poll.done()
+        service.save_phase(project_id, 1, "A", {})
+        result = await asyncio.wait_for(poll, 5)
+        assert (result["data"]["version"], result["data"]["total_phases"]) == (2, 1)
+        
+        timed_out = await protocol.execute_tool("get_current_phase", {**arguments, "wait_since": 2, "timeout": 0.05})
+        assert timed_out["data"]["version"] == 2
+        assert timed_out["data"]["current_phase"]["phase_number"] == 1
+        
+        # Already newer: answered without parking
+        current = await asyncio.wait_for(
+            protocol.execute_tool("get_current_phase", {**arguments, "wait_since": 0, "timeout": 60}), 1
+        )
+        assert current["data"]["version"] == 2
+
+
+class TestSingleWriter:
+    """Test the write queue and change feed mirroring of single-writer mode"""
+    
+    async def test_group_commit_and_replay(self, project_service):
+        """Queued calls commit together; a failing call is replayed alone"""
+        from services.writer import WriteQueue
+        project_id = project_service.create_project(name="queued")["project_id"]
+        queue = WriteQueue()
+        runner = asyncio.create_task(queue.run())
+        try:
+            results = await asyncio.gather(
+                queue.execute_tool("save_phase", {"project_id": project_id, "phase_number": 1, "title": "A", "specs": {}}),
+                queue.execute_tool("save_phase", {"project_id": "missing", "phase_number": 1, "title": "B", "specs": {}}),
+                queue.execute_tool("save_phase", {"project_id": project_id, "phase_number": 2, "title": "C", "specs": {}}),
+            )
+            assert [result["success"] for result in results] == [True, False, True]
+            assert "not found" in results[1]["error"]
+            assert queue.stats()["replays"] == 1
+            
+            results = await asyncio.gather(*[
+                queue.execute_tool("update_progress", {"project_id": project_id, "phase_number": n, "status": "completed"})
+                for n in (1, 2)
+            ])
+            assert all(result["success"] for result in results)
+        finally:
+            runner.cancel()
+        
+        stats = queue.stats()
+        assert (stats["calls"], stats["commits"], stats["largest_group"]) == (5, 4, 3)
+        status = ProjectService(next(get_db()), cache=None).get_project_status(project_id)
+        assert status["phases_completed"] == 2
+    
+    async def test_exclusive_turn_holds_off_the_queue(self, project_service):
+        """Calls queued during an exclusive turn run once it ends"""
+        from services.writer import WriteQueue
+        project_id = project_service.create_project(name="imported")["project_id"]
+        queue = WriteQueue()
+        runner = asyncio.create_task(queue.run())
+        try:
+            async with queue.exclusive():
+                call = asyncio.create_task(queue.execute_tool(
+                    "save_phase", {"project_id": project_id, "phase_number": 1, "title": "A", "specs": {}}
+                ))
+                await asyncio.sleep(0.05)
+                assert not call.done()
+                assert queue.stats()["pending"] == 1
+            result = await asyncio.wait_for(call, 5)
+        finally:
+            runner.cancel()
+        
+        assert result["success"] is True
+    
+    async def test_writer_events_are_mirrored(self):
+        """Frames of the writer's feed invalidate the cache and are republished"""
+        from services.cache import ReadCache
+        from services.events import RESET, EventBroker
+        from services.writer import apply_writer_event, sse_frames
+        
+        async def lines():
+            for line in [
+                "retry: 3000", "",
+                ": keepalive", "",
+                "id: e-1", "event: phase.updated", 'data: {"project_id":"p","phase_number":1,"version":3}', "",
+                "id: e-2", "event: reset", "data: {}", "",
+            ]:
+                yield line
+        
+        frames = [frame async for frame in sse_frames(lines())]
+        assert frames == [
+            ("e-1", "phase.updated", {"project_id": "p", "phase_number": 1, "version": 3}),
+            ("e-2", "reset", {}),
+        ]
+        
+        cache, broker = ReadCache(), EventBroker()
+        cache.set(("phase", "p", 1), "old", cache.generation("p"))
+        cache.set(("phase", "p", 2), "kept", cache.generation("p"))
+        subscription = broker.subscribe("p")
+        
+        apply_writer_event(*frames[0][1:], cache=cache, broker=broker)
+        assert cache.stats()["size"] == 1
+        event = await subscription.next(1)
+        assert (event.type, event.project_id, event.data) == ("phase.updated", "p", {"phase_number": 1, "version": 3})
+        
+        apply_writer_event(*frames[1][1:], cache=cache, broker=broker)
+        assert cache.stats()["size"] == 0
+        assert await subscription.next(1) is RESET
+        subscription.close()
@@ -24,9 +24,9 @@ def mcp_tools():
 
 
 @pytest.fixture
-def mcp_protocol():
+def mcp_protocol(test_database_url):
     """Provide MCPProtocol instance with database"""
-    init_db(":memory:")
+    init_db(test_database_url)
     db = next(get_db())
     yield MCPProtocol(db)
     clear_db()
@@ -123,6 +123,52 @@ class TestMCPToolDefinitions:
             assert schema["type"] == "object"
             assert "properties" in schema
             assert isinstance(schema["properties"], dict)
+    
+    def test_registry_is_built_once(self, mcp_tools):
+        """Instances share definitions, validators and serialized JSON"""
+        other = MCPTools()
+        
+        assert other.get_tool("save_phase") is mcp_tools.get_tool("save_phase")
+        assert json.loads(mcp_tools.tools_json()) == {"tools": mcp_tools.get_all_tools()}
+        assert json.loads(mcp_tools.tool_json("get_phase")) == mcp_tools.get_tool("get_phase")
+        assert mcp_tools.tool_json("nonexistent_tool") is None
+        for name in mcp_tools.get_tool_names():
+            assert mcp_tools.get_validator(name) is other.get_validator(name)
+    
+    def test_compiled_validator_reports_first_error(self, mcp_tools):
+        """Validators check required parameters, then top-level types"""
+        validate = mcp_tools.get_validator("get_phase")
+        
+        assert validate({"project_id": "p", "phase_number": 1}) is None
+        assert str(validate({"project_id": "p"})) == "Missing required parameter: phase_number"
+        assert str(validate({"project_id": "p", "phase_number": "1"})) == "Invalid type for 'phase_number': expected integer"
+    
+    def test_validator_checks_nested_values(self, mcp_tools):
+        """enum, nested properties and array items are validated with a path"""
+        update = mcp_tools.get_validator("update_progress")
+        save = mcp_tools.get_validator("save_phase")
+        plan = mcp_tools.get_validator("save_phases")
+        base = {"project_id": "p", "phase_number": 1}
+        
+        error = update({**base, "status": "done"})
+        assert error.path == ["status"]
+        assert "expected one of in_progress, completed" in str(error)
+        
+        error = update({**base, "status": "completed", "progress_data": {"tests_passed": "3"}})
+        assert error.path == ["progress_data", "tests_passed"]
+        assert str(error) == "Invalid type for 'progress_data.tests_passed': expected integer"
+        
+        error = save({**base, "title": "t", "specs": {"files_to_create": ["a.py", 7]}})
+        assert error.path == ["specs", "files_to_create", 1]
+        assert str(error) == "Invalid type for 'specs.files_to_create[1]': expected string"
+        
+        error = plan({"project_id": "p", "phases": [{"phase_number": 1, "title": "t"}]})
+        assert str(error) == "Missing required parameter: phases[0].specs"
+        
+        assert str(save({**base, "phase_number": True, "title": "t", "specs": {}})) == (
+            "Invalid type for 'phase_number': expected integer"
+        )
+        assert save({**base, "title": "t", "specs": {"files_to_create": ["a.py"], "extra": 1}}) is None
 
 
 class TestMCPProtocolExecution:
@@ -263,6 +309,139 @@ class TestMCPProtocolExecution:
         assert "error" in result
 
 
+    def test_execute_list_project_phases_paginated(self, mcp_protocol):
+        """list_project_phases should honour limit and return next_cursor"""
+        project_result = mcp_protocol.execute_tool(
+            "create_project",
+            {"name": "paged-phases"}
+        )
+        project_id = project_result["data"]["project_id"]
+        for number in (1, 2, 3):
+            mcp_protocol.execute_tool(
+                "save_phase",
+                {"project_id": project_id, "phase_number": number, "title": f"P{number}", "specs": {}}
+            )
+        
+        first = mcp_protocol.execute_tool(
+            "list_project_phases",
+            {"project_id": project_id, "limit": 2}
+        )
+        second = mcp_protocol.execute_tool(
+            "list_project_phases",
+            {"project_id": project_id, "limit": 2, "cursor": first["data"]["next_cursor"]}
+        )
+        
+        assert [p["phase_number"] for p in first["data"]["phases"]] == [1, 2]
+        assert [p["phase_number"] for p in second["data"]["phases"]] == [3]
+        assert second["data"]["next_cursor"] is None
+
+    
+    def test_execute_save_phases(self, mcp_protocol):
+        """save_phases should write the whole plan"""
+        project_id = mcp_protocol.execute_tool("create_project", {"name": "plan"})["data"]["project_id"]
+        
+        result = mcp_protocol.execute_tool(
+            "save_phases",
+            {"project_id": project_id, "phases": [
+                {"phase_number": n, "title": f"Phase {n}", "specs": {}} for n in (1, 2)
+            ]}
+        )
+        
+        assert result["success"] is True
+        assert [p["phase_number"] for p in result["data"]["phases"]] == [1, 2]
+        status = mcp_protocol.execute_tool("get_project_status", {"project_id": project_id})
+        assert status["data"]["total_phases"] == 2
+    
+    def test_execute_rejects_malformed_specs(self, mcp_protocol):
+        """Invalid nested specs should fail before anything is stored"""
+        project_id = mcp_protocol.execute_tool("create_project", {"name": "strict"})["data"]["project_id"]
+        
+        result = mcp_protocol.execute_tool(
+            "save_phase",
+            {"project_id": project_id, "phase_number": 1, "title": "t", "specs": {"instructions": ["not", "a", "string"]}}
+        )
+        
+        assert result["success"] is False
+        assert result["error_path"] == ["specs", "instructions"]
+        assert mcp_protocol.service.list_project_phases(project_id) == []
+    
+    def test_execute_version_conflict_reports_current_version(self, mcp_protocol):
+        """A stale expected_version fails with the phase's current version"""
+        project_id = mcp_protocol.execute_tool("create_project", {"name": "cas"})["data"]["project_id"]
+        mcp_protocol.execute_tool("save_phase", {"project_id": project_id, "phase_number": 1, "title": "A", "specs": {}})
+        arguments = {"project_id": project_id, "phase_number": 1, "status": "in_progress", "expected_version": 1}
+        
+        first = mcp_protocol.execute_tool("update_progress", arguments)
+        second = mcp_protocol.execute_tool("update_progress", arguments)
+        
+        assert first["data"]["version"] == 2
+        assert second["success"] is False
+        assert "Version conflict" in second["error"]
+        assert second["data"]["current_version"] == 2
+
+
+class TestMCPBatchExecution:
+    """Test batch execution of tool calls"""
+    
+    def test_batch_resolves_references_to_earlier_results(self, mcp_protocol):
+        """"$0.project_id" should be replaced by the first call's data"""
+        result = mcp_protocol.execute_batch([
+            {"tool": "create_project", "arguments": {"name": "batch"}},
+            {"tool": "save_phase", "arguments": {
+                "project_id": "$0.project_id", "phase_number": 1, "title": "Setup", "specs": {}
+            }},
+            {"tool": "get_phase", "arguments": {"project_id": "$0.project_id", "phase_number": 1}},
+        ], transactional=True)
+        
+        assert result["success"] is True
+        project_id = result["results"][0]["data"]["project_id"]
+        assert result["results"][2]["data"]["project_id"] == project_id
+        assert result["results"][2]["data"]["title"] == "Setup"
+    
+    def test_transactional_batch_rolls_back_on_failure(self, mcp_protocol):
+        """A failing call should undo every earlier call in the batch"""
+        result = mcp_protocol.execute_batch([
+            {"tool": "create_project", "arguments": {"name": "rolled-back"}},
+            {"tool": "save_phase", "arguments": {
+                "project_id": "$0.project_id", "phase_number": 1, "title": "Setup", "specs": {}
+            }},
+            {"tool": "get_phase", "arguments": {"project_id": "$0.project_id", "phase_number": 9}},
+            {"tool": "get_phase", "arguments": {"project_id": "$0.project_id", "phase_number": 1}},
+        ], transactional=True)
+        
+        assert result["success"] is False
+        assert [r["success"] for r in result["results"]] == [False, False, False, False]
+        assert result["results"][0]["error"].startswith("Rolled back")
+        assert "not found" in result["results"][2]["error"]
+        assert result["results"][3]["error"].startswith("Skipped")
+        assert mcp_protocol.service.list_projects() == []
+    
+    def test_independent_batch_keeps_successful_calls(self, mcp_protocol):
+        """Without a transaction, each call commits on its own"""
+        result = mcp_protocol.execute_batch([
+            {"tool": "create_project", "arguments": {"name": "kept"}},
+            {"tool": "get_phase", "arguments": {"project_id": "$0.project_id", "phase_number": 9}},
+            {"tool": "save_phase", "arguments": {
+                "project_id": "$0.project_id", "phase_number": 1, "title": "Setup", "specs": {}
+            }},
+        ])
+        
+        assert result["success"] is False
+        assert [r["success"] for r in result["results"]] == [True, False, True]
+        projects = mcp_protocol.service.list_projects()
+        assert [p["name"] for p in projects] == ["kept"]
+        assert projects[0]["phases_count"] == 1
+    
+    def test_batch_reference_to_failed_call_is_an_error(self, mcp_protocol):
+        """References to calls without data should fail that call"""
+        result = mcp_protocol.execute_batch([
+            {"tool": "unknown_tool", "arguments": {}},
+            {"tool": "get_project_status", "arguments": {"project_id": "$0.project_id"}},
+        ])
+        
+        assert "Invalid reference" in result["results"][1]["error"]
+
+
 class TestMCPRequestResponse:
     """Test MCP request/response formatting"""
     